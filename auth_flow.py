@@ -11,10 +11,13 @@ def wait_for_login(
     poll_seconds: int = 5,
     use_light_mode: bool = True,
     on_progress: Optional[Callable[[int], None]] = None,
+    restore_session: Optional[Callable[[], bool]] = None,
 ) -> bool:
     """
     Generic login flow helper.
 
+    - If restore_session is provided and returns True (snapshot restored and validated
+      by a cheap check), return True without any heavy navigation.
     - First, run light/normal check (depending on use_light_mode). If logged in, return True.
     - If auto_login is provided, try it once. If still not logged in, proceed to manual wait.
     - Optionally call navigate_login_once() a single time before waiting (e.g., to open sign-in page from blank tab).
@@ -31,6 +34,14 @@ def wait_for_login(
             except Exception:
                 pass
 
+    # Restore a saved session snapshot
+    if restore_session is not None:
+        try:
+            if restore_session():
+                return True
+        except Exception:
+            pass
+
     # Initial check
     is_logged = light_check() if use_light_mode else heavy_check()
     if is_logged:
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmarks for the extraction and parsing hot paths.
+
+    python benchmarks/run_benchmarks.py                  # run and compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline  # store the current numbers as baseline
+    python benchmarks/run_benchmarks.py --no-browser --scale 0.2   # quick run, not compared
+
+Pure-Python suites (normalization, hotel matching, lxml extraction) run on
+synthetic inputs. The browser suite serves the Booking-like fixtures from a
+local HTTP server to headless Chrome and measures page-to-results latency
+and per-card extraction time; it is skipped when Chrome is not available.
+Nothing touches the network. A run is only compared with a baseline recorded
+at the same --scale.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import synthetic  # noqa: E402  (benchmarks/ is sys.path[0] when run as a script)
+from fixture_server import FixtureServer  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _median_seconds(fn, repeat):
+    """Median wall time of fn() over `repeat` runs (after one warm-up run)."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def _metric(value, unit, better):
+    return {'value': round(value, 3), 'unit': unit, 'better': better}
+
+
+def bench_normalization(scale, repeat):
+    from normalization import parse_price, parse_rating, parse_stay_dates, normalize_results
+
+    n = max(100, int(50000 * scale))
+    results = synthetic.search_results(n)
+    reservations = synthetic.reservations_for(results, n)
+    prices = [r['price'] for r in results]
+    ratings = [r['rating'] for r in results]
+    stays = [r['date_range'] for r in reservations]
+
+    metrics = {}
+    t = _median_seconds(lambda: [parse_price(p) for p in prices], repeat)
+    metrics['parse_price.throughput'] = _metric(n / t, 'items/s', 'higher')
+    t = _median_seconds(lambda: [parse_rating(r) for r in ratings], repeat)
+    metrics['parse_rating.throughput'] = _metric(n / t, 'items/s', 'higher')
+    t = _median_seconds(lambda: [parse_stay_dates(s) for s in stays], repeat)
+    metrics['parse_stay_dates.throughput'] = _metric(n / t, 'items/s', 'higher')
+    t = _median_seconds(lambda: normalize_results(results), repeat)
+    metrics['normalize_results.throughput'] = _metric(n / t, 'items/s', 'higher')
+    return metrics
+
+
+def bench_matching(scale, repeat):
+    from hotel_matcher import HotelMatcher, get_matcher
+
+    n_results = max(50, int(500 * scale))
+    results = synthetic.search_results(n_results, seed=7)
+    reservations = synthetic.reservations_for(results, max(50, int(2000 * scale)), seed=8)
+
+    metrics = {}
+    t = _median_seconds(lambda: HotelMatcher(results), repeat)
+    metrics['pick_match.index_build_ms'] = _metric(t * 1000, 'ms', 'lower')
+    matcher = get_matcher(results)
+    t = _median_seconds(lambda: [matcher.match(r) for r in reservations], repeat)
+    metrics['pick_match.per_reservation_us'] = _metric(t / len(reservations) * 1e6, 'us', 'lower')
+    t = _median_seconds(lambda: [get_matcher(results).match(r) for r in reservations], repeat)
+    metrics['pick_match.cached_lookup_us'] = _metric(t / len(reservations) * 1e6, 'us', 'lower')
+    return metrics
+
+
+def bench_http_extract(scale, repeat):
+    try:
+        from http_backend import HttpSearchBackend
+        backend = HttpSearchBackend()
+    except Exception as e:
+        print(f"  skipped: {e}")
+        return {}
+    from ota_crawler import BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS
+
+    n = max(25, int(500 * scale))
+    html = synthetic.results_page(n)
+    metrics = {}
+    t = _median_seconds(lambda: backend.extract(html, BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS), repeat)
+    metrics['http_extract.per_card_us'] = _metric(t / n * 1e6, 'us', 'lower')
+
+    with FixtureServer({'/searchresults.html': html}) as server:
+        url = server.url('/searchresults.html')
+        t = _median_seconds(
+            lambda: backend.extract(backend.fetch(url), BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS), repeat)
+    metrics['http_extract.page_to_results_ms'] = _metric(t * 1000, 'ms', 'lower')
+    backend.close()
+    return metrics
+
+
+def bench_browser(scale, repeat):
+    try:
+        from ota_crawler import OTACrawler, BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS
+        from search_cache import SearchCache
+        crawler = OTACrawler(headless=True, timeout=10, cache=SearchCache(':memory:', enabled=False))
+    except Exception as e:
+        print(f"  skipped: {e}")
+        return {}
+
+    n = max(10, int(100 * scale))
+    metrics = {}
+    try:
+        with FixtureServer({
+            '/searchresults.html': synthetic.results_page(n),
+            '/myreservations.html': synthetic.reservations_page(n),
+        }) as server:
+            results_url = server.url('/searchresults.html')
+            reservations_url = server.url('/myreservations.html')
+
+            def page_to_results():
+                crawler.driver.get(results_url)
+                crawler.waits.document_ready()
+                found = crawler._extract_results_booking(max_results=n)
+                assert len(found) == n, f"expected {n} results, got {len(found)}"
+
+            t = _median_seconds(page_to_results, repeat)
+            metrics['browser.search.page_to_results_ms'] = _metric(t * 1000, 'ms', 'lower')
+            t = _median_seconds(lambda: crawler._bulk_extract(BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS), repeat)
+            metrics['browser.search.per_card_extract_us'] = _metric(t / n * 1e6, 'us', 'lower')
+
+            selectors = {'reservations_page_url': reservations_url}
+            t = _median_seconds(lambda: crawler.fetch_booking_reservations(selectors), repeat)
+            metrics['browser.reservations.page_to_results_ms'] = _metric(t * 1000, 'ms', 'lower')
+
+            from selenium.webdriver.common.by import By
+            cards = crawler.driver.find_elements(By.CSS_SELECTOR, '[data-testid="booking-card"]')
+            t = _median_seconds(lambda: [crawler._parse_booking_reservation_card(c, selectors) for c in cards], repeat)
+            metrics['browser.reservations.per_card_parse_us'] = _metric(t / max(1, len(cards)) * 1e6, 'us', 'lower')
+    finally:
+        crawler.close()
+    return metrics
+
+
+SUITES = {
+    'normalization': bench_normalization,
+    'matching': bench_matching,
+    'http': bench_http_extract,
+    'browser': bench_browser,
+}
+
+
+def compare(metrics, baseline, tolerance):
+    """Print metrics next to the baseline; return the names of regressed metrics."""
+    regressions = []
+    print(f"\n{'metric':45} {'value':>14} {'baseline':>14} {'change':>9}")
+    print("-" * 86)
+    for name, metric in sorted(metrics.items()):
+        base = (baseline.get(name) or {}).get('value')
+        change = ''
+        if base:
+            ratio = metric['value'] / base
+            # Positive change = better
+            delta = ratio - 1 if metric['better'] == 'higher' else 1 - ratio
+            change = f"{delta:+.1%}"
+            if delta < -tolerance:
+                regressions.append(name)
+                change += " !"
+        base_text = f"{base:,.3f}" if base else '-'
+        print(f"{name:45} {metric['value']:>14,.3f} {base_text:>14} {change:>9}  {metric['unit']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for extraction and parsing hot paths.")
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help="Run only these suites (repeatable)")
+    parser.add_argument('--no-browser', action='store_true', help="Skip the headless Chrome suite")
+    parser.add_argument('--scale', type=float, default=1.0, help="Input size multiplier (e.g. 0.1 for a quick run)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark (median is reported)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a metric is flagged")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 when a metric regressed")
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or [s for s in SUITES if not (s == 'browser' and args.no_browser)]
+    metrics = {}
+    for name in suites:
+        print(f"Running {name} benchmarks...")
+        metrics.update(SUITES[name](args.scale, max(1, args.repeat)))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        baseline = saved.get('metrics', {})
+        baseline_scale = float(saved.get('scale', 1.0))
+        if baseline_scale != args.scale:
+            # Per-item numbers still depend on input sizes (caches, index sizes): not comparable
+            print(f"\nBaseline was recorded at --scale {baseline_scale:g}, this run uses --scale {args.scale:g}; "
+                  f"not comparing (rerun with --scale {baseline_scale:g})")
+            baseline = {}
+    regressions = compare(metrics, baseline, args.tolerance)
+
+    report = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'scale': args.scale, 'metrics': metrics}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        # Keep baseline entries of suites that were not run this time (same scale only)
+        merged = dict(baseline)
+        merged.update(metrics)
+        report['metrics'] = merged
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
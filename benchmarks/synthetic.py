@@ -0,0 +1,130 @@
+"""
+Deterministic synthetic inputs for the benchmark suite.
+
+Pages are assembled from the saved Booking-like fixtures in fixtures/ by
+repeating their card markup with generated names, prices, ratings and dates.
+"""
+
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+_PREFIXES = ['Grand', 'Royal', 'The', 'Hotel', 'Park', 'Central', 'Boutique', 'Riverside', 'Old Town', 'Casa']
+_CORES = ['Savoy', 'Plaza', 'Continental', 'Majestic', 'Astoria', 'Belvedere', 'Metropole', 'Regina', 'Imperial', 'Bristol']
+_SUFFIXES = ['', ' Hotel', ' & Spa', ' Suites', ' by Marriott', ' Residences', ' Inn', ' Apartments']
+_CITIES = ['Paris', 'Rome', 'Lisbon', 'Berlin', 'Prague', 'Vienna', 'Madrid', 'Tokyo', 'London', 'Warsaw']
+_ROOMS = ['Double Room', 'Deluxe King Room', 'Superior Twin Room', 'Junior Suite', 'Standard Double Room', 'Studio']
+_LABELS = ['Exceptional', 'Superb', 'Fabulous', 'Very Good', 'Good', 'Pleasant']
+_PRICE_FORMATS = ['€ {:,.0f}', 'US${:,.2f}', '£{:,.0f}', '{:,.0f} zł', 'JPY {:,.0f}', '€ {:,.2f}']
+
+
+def _load(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _fill(template: str, values: Dict[str, Any]) -> str:
+    out = template
+    for key, value in values.items():
+        out = out.replace('{' + key + '}', str(value))
+    return out
+
+
+def hotel_name(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(_PREFIXES)} {rng.choice(_CORES)} {_CITIES[i % len(_CITIES)]}{rng.choice(_SUFFIXES)} {i}"
+
+
+def price_text(rng: random.Random) -> str:
+    amount = rng.uniform(40, 2500)
+    text = rng.choice(_PRICE_FORMATS).format(amount)
+    if rng.random() < 0.3:
+        # Original and discounted price in one block
+        text = rng.choice(_PRICE_FORMATS).format(amount * 1.2) + "\n" + text
+    return text
+
+
+def rating_text(rng: random.Random) -> str:
+    score = round(rng.uniform(6.0, 9.9), 1)
+    return f"Scored {score}\n{score}\n{rng.choice(_LABELS)}\n{rng.randint(3, 12000):,} reviews"
+
+
+def stay_text(rng: random.Random) -> str:
+    start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 300))
+    end = start + timedelta(days=rng.randint(1, 7))
+    style = rng.randint(0, 2)
+    if style == 0:
+        return f"{start:%a %d %b %Y} — {end:%a %d %b %Y}"
+    if style == 1:
+        return f"{start:%d %B %Y} - {end:%d %B %Y}"
+    return f"{start:%b %d} – {end:%b %d, %Y}"
+
+
+def search_results(n: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            'name': hotel_name(rng, i),
+            'price': price_text(rng),
+            'rating': rating_text(rng),
+            'location': f"{rng.choice(['1st', '5th', 'Old Town', 'Centre'])} district, {_CITIES[i % len(_CITIES)]}",
+            'room_type': rng.choice(_ROOMS),
+        }
+        for i in range(n)
+    ]
+
+
+def reservations_for(results: List[Dict[str, Any]], n: int, seed: int = 2) -> List[Dict[str, Any]]:
+    """Reservations whose hotel names are slightly reworded versions of result names."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        item = rng.choice(results)
+        name = item['name'].replace(' Hotel', '').replace('The ', '')
+        if rng.random() < 0.5:
+            name = name.upper()
+        out.append({
+            'hotel_name': name,
+            'room_type': item['room_type'],
+            'location': item['location'],
+            'date_range': stay_text(rng),
+            'price_total': price_text(rng),
+        })
+    return out
+
+
+def results_page(n: int, seed: int = 1) -> str:
+    card = _load('booking_result_card.html')
+    rng = random.Random(seed)
+    cards = []
+    for i, item in enumerate(search_results(n, seed)):
+        score = round(rng.uniform(6.0, 9.9), 1)
+        cards.append(_fill(card, {
+            'slug': f"hotel-{i}",
+            'name': item['name'],
+            'location': item['location'],
+            'score': score,
+            'label': rng.choice(_LABELS),
+            'reviews': f"{rng.randint(3, 12000):,}",
+            'room_type': item['room_type'],
+            'price': item['price'].replace("\n", " "),
+        }))
+    return _load('booking_results_page.html').replace('<!-- CARDS -->', "\n".join(cards))
+
+
+def reservations_page(n: int, seed: int = 3) -> str:
+    card = _load('reservation_card.html')
+    rng = random.Random(seed)
+    cards = []
+    for i in range(n):
+        cards.append(_fill(card, {
+            'name': hotel_name(rng, i),
+            'room_type': rng.choice(_ROOMS),
+            'location': f"Centre, {_CITIES[i % len(_CITIES)]}",
+            'date_range': stay_text(rng),
+            'price': price_text(rng).split("\n")[-1],
+            'cancellation': "Free cancellation until 12 March 2026" if rng.random() < 0.6 else "Non-refundable",
+        }))
+    return _load('reservations_page.html').replace('<!-- CARDS -->', "\n".join(cards))
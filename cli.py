@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unified command line for the OTA crawler.
+
+    python cli.py search [run_search.py options]     # single search or --grid
+    python cli.py monitor [--daemon] [--interval N]  # reservation price-drop monitor
+    python cli.py notify-test [--email] [--sms]      # send a test notification
+    python cli.py cache stats|purge|clear            # search result cache
+    python cli.py bench [run_benchmarks.py options]  # offline benchmarks
+
+Only the modules a subcommand needs are imported (Selenium, Twilio and the
+providers are loaded lazily), so non-browser commands start in milliseconds.
+Add --timing to print startup and total time.
+"""
+
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+
+def cmd_search(args):
+    import run_search
+    run_search.main(args.rest)
+
+
+def cmd_monitor(args):
+    import run_monitor
+    run_monitor.main(args.rest)
+
+
+def cmd_notify_test(args):
+    import config
+    from run_monitor import send_notifications
+
+    site = config.RESERVATION_SITE.lower()
+    sample = [{
+        'hotel_name': 'Test Hotel',
+        'room_type': 'Double Room',
+        'check_in': '2030-01-01',
+        'check_out': '2030-01-03',
+        'old_price': 200.0,
+        'new_price': 150.0,
+        'delta': 50.0,
+    }]
+    # Limit the test to the requested channels (default: every enabled channel)
+    overrides = {}
+    if args.email or args.sms:
+        overrides = {'ENABLE_EMAIL': args.email and config.ENABLE_EMAIL, 'ENABLE_SMS': args.sms and config.ENABLE_SMS}
+    saved = {name: getattr(config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        if not (config.ENABLE_EMAIL or config.ENABLE_SMS):
+            print("No notification channel enabled (set ENABLE_EMAIL / ENABLE_SMS in config.py)")
+            return 1
+        send_notifications(site, sample)
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+    return 0
+
+
+def cmd_cache(args):
+    import config
+    from search_cache import cache_from_config
+
+    cache = cache_from_config(config)
+    if not cache.enabled:
+        print("Search cache is disabled (SEARCH_CACHE_ENABLED = False)")
+        return 0
+    if args.action == 'purge':
+        print(f"Removed {cache.purge_expired()} expired entries")
+    elif args.action == 'clear':
+        cache.clear()
+        print("Search cache cleared")
+    stats = cache.stats()
+    print(f"Entries: {stats['entries']} (max {stats['max_entries']}), TTL {stats['ttl_seconds']}s, "
+          f"oldest {stats['oldest_age_seconds']:.0f}s, path {stats['path']}")
+    return 0
+
+
+def cmd_bench(args):
+    bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+    sys.path.insert(0, bench_dir)
+    import run_benchmarks
+    return run_benchmarks.main(args.rest)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="OTA crawler command line.")
+    parser.add_argument('--timing', action='store_true', help="Print startup and total run time")
+    sub = parser.add_subparsers(dest='command', metavar='command')
+    sub.required = True
+
+    p = sub.add_parser('search', help="Search hotels (options of run_search.py, e.g. --grid)", add_help=False)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('monitor', help="Monitor reservations for price drops (options of run_monitor.py)", add_help=False)
+    p.set_defaults(func=cmd_monitor)
+
+    p = sub.add_parser('notify-test', help="Send a sample price-drop notification")
+    p.add_argument('--email', action='store_true', help="Only test email")
+    p.add_argument('--sms', action='store_true', help="Only test SMS")
+    p.set_defaults(func=cmd_notify_test)
+
+    p = sub.add_parser('cache', help="Inspect or clean the search result cache")
+    p.add_argument('action', nargs='?', choices=['stats', 'purge', 'clear'], default='stats')
+    p.set_defaults(func=cmd_cache)
+
+    p = sub.add_parser('bench', help="Run the offline benchmarks (options of benchmarks/run_benchmarks.py)", add_help=False)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+# Subcommands whose remaining options are passed through to the wrapped script
+_PASSTHROUGH = {'search', 'monitor', 'bench'}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and args.command not in _PASSTHROUGH:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    args.rest = rest
+    startup = time.perf_counter() - _STARTED
+    try:
+        status = args.func(args)
+    finally:
+        if args.timing:
+            print(f"[timing] startup {startup * 1000:.1f} ms, total {(time.perf_counter() - _STARTED) * 1000:.1f} ms",
+                  file=sys.stderr)
+    return status or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
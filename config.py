@@ -7,6 +7,12 @@ CHECK_IN_DATE = "2025-12-01"  # Format: YYYY-MM-DD
 CHECK_OUT_DATE = "2025-12-05"  # Format: YYYY-MM-DD
 NUM_ADULTS = 2
 NUM_ROOMS = 1
+NUM_CHILDREN = 0
+
+# Booking.com search mode: 'url' opens the results page directly (falls back
+# to the form if it finds nothing), 'form' always fills the homepage form.
+# Searches with NUM_CHILDREN use the URL either way (the form needs child ages).
+BOOKING_SEARCH_MODE = "url"
 
 # Crawler Settings
 HEADLESS_MODE = False  # Set to True to run without browser window
@@ -15,9 +21,70 @@ TIMEOUT = 15  # Seconds to wait for elements
 # Optional: persist Chrome session to keep login state
 CHROME_USER_DATA_DIR = ""  # e.g. "/Users/asks/Library/Application Support/Google/Chrome/Profile 1"
 
+# Lean browser mode per provider ('booking', 'agoda', 'custom'): eager page
+# loads, a small fixed window, fewer Chrome features, and images/fonts/media
+# plus tracker URLs blocked through DevTools. Pages render without pictures.
+LEAN_MODE_PROVIDERS = []  # e.g. ["booking"]
+LEAN_BLOCKED_RESOURCE_TYPES = ["image", "font", "media"]
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*bat.bing.com*", "*criteo.*",
+    "*taboola.com*", "*outbrain.com*", "*scorecardresearch.com*", "*newrelic.com*", "*nr-data.net*",
+]
+LEAN_WINDOW_SIZE = (1280, 900)
+
+# Network-response capture: read search results / reservations from the site's
+# JSON/GraphQL responses (Chrome performance log + DevTools) instead of waiting
+# for and scraping the rendered cards. Falls back to the page when no data
+# response arrives within NETWORK_CAPTURE_TIMEOUT seconds.
+NETWORK_CAPTURE_PROVIDERS = []  # e.g. ["booking"]
+NETWORK_CAPTURE_TIMEOUT = 8
+# Once the page has finished loading, wait at most this long for the data
+# response (pages rendered on the server do not fetch their listings)
+NETWORK_CAPTURE_READY_TIMEOUT = 1
+
+# Popup / cookie-banner close buttons per provider ('booking', 'agoda', 'custom';
+# 'default' for the rest). All are checked and clicked with one injected script.
+# Generic close buttons are scoped to cookie/consent containers: the auto-dismiss
+# observer would otherwise also close the date picker or occupancy dialogs.
+_CONSENT_CONTAINERS = ":is([id*='cookie' i], [class*='cookie' i], [id*='consent' i], [class*='consent' i])"
+POPUP_SELECTORS = {
+    "booking": [
+        "button[aria-label='Dismiss sign-in info.']",
+        "button#onetrust-accept-btn-handler",
+        "button.fc-button.fc-cta-consent",
+        f"{_CONSENT_CONTAINERS} button[aria-label='Close']",
+    ],
+    "default": [
+        "button[aria-label='Dismiss sign-in info.']",
+        "button.fc-button.fc-cta-consent",
+        "button#onetrust-accept-btn-handler",
+        f"{_CONSENT_CONTAINERS} [aria-label='Close']",
+        f"{_CONSENT_CONTAINERS} .modal-close",
+    ],
+}
+# Providers whose popups are also dismissed in-page as soon as they appear
+# (a DOM observer injected into every page), e.g. ["booking"]
+POPUP_AUTO_DISMISS = []
+
 # Output Settings
 OUTPUT_FILE = "search_results.json"
 
+# Search grid (python run_search.py --grid grid.json): worker processes, each
+# running its own browser; finished searches are checkpointed so a re-run resumes
+GRID_WORKERS = 2
+GRID_CHECKPOINT_FILE = "grid_checkpoint.jsonl"
+GRID_OUTPUT_FILE = "grid_results.json"
+
+# Result file format: "json" writes OUTPUT_FILE / GRID_OUTPUT_FILE (overwritten
+# every run); "ndjson" streams one JSON record per line to timestamped files in
+# RESULTS_DIR, rotated by size or age (read them back with result_sink.read_records)
+RESULTS_FORMAT = "json"
+RESULTS_DIR = "results"
+RESULTS_ROTATE_BYTES = 64 * 1024 * 1024
+RESULTS_ROTATE_SECONDS = 3600
+RESULTS_COMPRESS = False  # gzip the NDJSON files
+
 # OTA Website Selection
 OTA_SITE = "booking"  # Options: 'booking', 'custom'
 
@@ -34,6 +101,13 @@ CUSTOM_SELECTORS = {
 }
 
 CUSTOM_OTA_URL = "https://flight.qunar.com/"
+# A results-page template such as "https://example-ota.com/search?q={destination}&in={check_in}&out={check_out}"
+# skips the search form and lets the HTTP backend fetch it directly.
+
+# Search backend: 'selenium' drives Chrome for every search; 'http' fetches
+# server-rendered result pages with requests + lxml and only starts Chrome
+# when a page needs JavaScript.
+SEARCH_BACKEND = "selenium"
 
 # Reservation Monitoring Settings
 RESERVATION_SITE = "booking"  # Currently supported: 'booking'
@@ -76,6 +150,7 @@ BOOKING_SELECTORS = {
     'reservation_card_alt': '[data-testid*="booking"]',
     'hotel_name': '[data-testid="property-name"]',
     'room_type': '[data-testid="room-type"]',
+    'property_address': '[data-testid="property-address"]',
     'date_range': '[data-testid="stay-dates"]',
     'price_total': '[data-testid="total-price"]',
     'cancellation_policy': '[data-testid="cancellation-policy"]',
@@ -86,6 +161,7 @@ BOOKING_SELECTORS = {
 ONLY_CHECK_CANCELLABLE = True
 LOOKAHEAD_DAYS = 365  # Only consider reservations within this many days
 PRICE_DROP_THRESHOLD = 1.0  # Notify if new total is lower by at least this amount (in same currency units)
+MATCH_MIN_CONFIDENCE = 0.6  # Minimum fuzzy match score (0..1) for a search result to count as the reserved hotel
 
 # Agoda placeholders (for future provider implementation)
 AGODA_SELECTORS = {
@@ -99,3 +175,107 @@ AGODA_SELECTORS = {
 MONITOR_LOGIN_WAIT_SECONDS = 300
 MONITOR_LOGIN_POLL_SECONDS = 5  # Check login status every N seconds while waiting
 MONITOR_LIGHT_LOGIN_CHECK = True  # During manual login wait, do not navigate; check DOM/URL only
+
+# Parallel monitoring: number of browser workers used for comparable searches.
+# Extra workers start their own Chrome and reuse the primary session's cookies.
+MONITOR_WORKERS = 1
+
+# Multi-provider comparison: also search every reservation on these providers
+# (each with its own browsers) and report the cheapest offer with its source.
+# The reservation site is always included; [] compares on it alone.
+COMPARE_PROVIDERS = []  # e.g. ["booking", "agoda"]
+COMPARE_TIMEOUT_SECONDS = 120  # per provider and reservation
+COMPARE_PROVIDER_TIMEOUTS = {}  # e.g. {"agoda": 60}
+
+# Per-domain rate limiting of every navigation and HTTP page fetch, shared by
+# all crawlers of a process (grid worker processes split the rates between them).
+# rate: requests/second, burst: back-to-back requests, max_concurrency: requests
+# in flight. Failures and bot-check pages back off exponentially (with jitter)
+# and lower the rate; failure_threshold consecutive failures pause the domain
+# for cooldown seconds (searches on it fail fast until then).
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_DEFAULT = {
+    'rate': 0.5,
+    'burst': 3,
+    'max_concurrency': 2,
+    'min_rate': 0.05,
+    'backoff_base': 2.0,
+    'backoff_max': 60.0,
+    'failure_threshold': 5,
+    'cooldown': 300.0,
+}
+RATE_LIMIT_DOMAINS = {
+    'booking.com': {'rate': 1.0, 'burst': 4, 'max_concurrency': 4},
+    'agoda.com': {'rate': 0.5, 'burst': 2, 'max_concurrency': 2},
+}
+
+# Condition-driven waits: maximum seconds per step. Each wait returns as soon as
+# the page is ready, so these only bound the worst case.
+WAIT_TIMEOUTS = {
+    'page_load': 10,
+    'element': 10,
+    'autocomplete': 3,
+    'calendar': 3,
+    'results': 15,
+    'results_stable': 5,
+    'lazy_load': 3,
+    'login_step': 10,
+    'login_redirect': 10,
+}
+
+# Search result cache (SQLite). Repeated searches for the same provider,
+# destination/hotel, dates and occupancy within the TTL skip the browser.
+SEARCH_CACHE_ENABLED = True
+SEARCH_CACHE_PATH = "search_cache.sqlite3"  # Relative paths are resolved next to the source files
+SEARCH_CACHE_TTL_SECONDS = 3600
+SEARCH_CACHE_MAX_ENTRIES = 5000
+SEARCH_CACHE_BYPASS = False  # True: providers always search live and skip the cache
+
+# Incremental monitoring: remember reservations between runs and only
+# re-search those that are new, changed, or not checked for MONITOR_STALE_SECONDS
+MONITOR_INCREMENTAL = True
+MONITOR_STATE_PATH = "monitor_state.sqlite3"
+MONITOR_STALE_SECONDS = 3600
+
+# Daemon mode (python run_monitor.py --daemon): keep Chrome and the login
+# session warm and run a monitoring cycle every MONITOR_INTERVAL_SECONDS
+MONITOR_DAEMON = False
+MONITOR_INTERVAL_SECONDS = 1800
+
+# Session snapshots: after a successful login, cookies and localStorage are
+# saved per provider and restored on the next start (validated with a cheap
+# check) to skip login detection. Snapshot files hold live session cookies.
+SESSION_SNAPSHOT_ENABLED = True
+SESSION_DIR = "sessions"
+SESSION_SNAPSHOT_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+# Result pagination: searches follow "load more", lazy loading and next-page
+# links until SEARCH_MAX_RESULTS results (None = no limit) or SEARCH_MAX_PAGES batches
+SEARCH_MAX_RESULTS = 25
+SEARCH_MAX_PAGES = 5
+
+# Price history: every observed comparable price is stored and drops are
+# detected for all reservations in one batch (requires numpy).
+PRICE_HISTORY_ENABLED = True
+PRICE_HISTORY_PATH = "price_history.sqlite3"
+PRICE_HISTORY_WINDOW_SECONDS = 30 * 24 * 3600
+PRICE_DROP_RELATIVE_THRESHOLD = 0.0  # e.g. 0.05 = also require the price to be at least 5% below the booked price
+PRICE_DROP_REQUIRE_NEW_LOW = False  # True = only alert when the price is below every earlier price in the window
+
+# Locale of the scraped pages (e.g. "en-gb", "de"); parsed date formats are remembered per locale
+PARSE_LOCALE = "en-gb"
+
+# Step timing metrics: every run writes a JSON summary (durations, counts and
+# errors per crawler step) to METRICS_DIR; set METRICS_PROMETHEUS_FILE to also
+# write a Prometheus textfile (e.g. for node_exporter's textfile collector)
+METRICS_ENABLED = True
+METRICS_DIR = "metrics"
+METRICS_PROMETHEUS_FILE = ""  # e.g. "/var/lib/node_exporter/textfile_collector/ota_crawler.prom"
+
+# Session record/replay (debugging and offline regression runs).
+# RECORD_SESSION_DIR: every crawler saves visited pages, JSON responses and a
+# step timeline into a new bundle under this directory.
+# REPLAY_SESSION_DIR: a recorded bundle served from a local server instead of
+# the live sites (the search cache is skipped). Both also: run_search.py --record / --replay
+RECORD_SESSION_DIR = ""  # e.g. "recordings"
+REPLAY_SESSION_DIR = ""  # e.g. "recordings/20260310_101500_1234"
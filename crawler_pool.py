@@ -0,0 +1,171 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+
+class CrawlerPool:
+    """
+    Bounded pool of OTACrawler instances that can be leased and returned.
+
+    - Crawlers are created lazily through `factory(worker_id)` up to `size`.
+    - `seed` crawlers (e.g. the one that already went through login) are
+      added as-is and count towards `size`. Their owner keeps using them, so
+      discard() never closes a seed.
+    - `on_create(crawler)` runs once for every crawler the pool creates,
+      e.g. to copy the logged-in session from the seed crawler.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[int], Any],
+        size: int = 1,
+        seed: Optional[Sequence[Any]] = None,
+        on_create: Optional[Callable[[Any], None]] = None,
+    ):
+        self.factory = factory
+        self.size = max(1, int(size), len(seed or []))
+        self.on_create = on_create
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._all: List[Any] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # Worker ids are never reused, even after discard() (profiles, log and metric labels)
+        self._worker_ids = itertools.count(len(seed or []))
+        self._seeds: List[Any] = list(seed or [])
+        # Discarded seeds whose lease is still out (see discard())
+        self._quarantined: List[Any] = []
+        for crawler in seed or []:
+            self._all.append(crawler)
+            self._idle.put(crawler)
+
+    def _try_create(self) -> Optional[Any]:
+        with self._lock:
+            if self._closed or len(self._all) >= self.size:
+                return None
+            worker_id = next(self._worker_ids)
+            # Reserve the slot before releasing the lock; Chrome startup is slow
+            self._all.append(None)
+        crawler = None
+        try:
+            crawler = self.factory(worker_id)
+            if self.on_create is not None:
+                try:
+                    self.on_create(crawler)
+                except Exception as e:
+                    print(f"Worker {worker_id} setup failed: {str(e)}")
+        finally:
+            with self._lock:
+                if crawler is None:
+                    self._all.remove(None)
+                else:
+                    self._all[self._all.index(None)] = crawler
+        return crawler
+
+    def acquire(self) -> Any:
+        """
+        Return an idle crawler, creating a new one if the pool is not full yet.
+        Raises the factory's error when a crawler cannot be created, and
+        RuntimeError when the pool has no crawler to wait for.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            crawler = self._try_create()
+            if crawler is not None:
+                return crawler
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Crawler pool is closed")
+                if not self._all:
+                    # Every creation failed: nothing will ever be released
+                    raise RuntimeError("No crawler available")
+            try:
+                # Re-check periodically: a creation in progress may still fail
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def release(self, crawler: Any) -> None:
+        with self._lock:
+            if crawler in self._quarantined:
+                # A discarded seed is back: rejoin the pool if its slot is still free
+                self._quarantined.remove(crawler)
+                if not self._closed and len(self._all) < self.size:
+                    self._all.append(crawler)
+                    self._idle.put(crawler)
+                return
+            if self._closed or crawler not in self._all:
+                return  # closed pool or discarded crawler
+        self._idle.put(crawler)
+
+    def discard(self, crawler: Any) -> None:
+        """
+        Remove a crawler from the pool and close it (e.g. one stuck in a search
+        that was given up on). Its slot is free again for a new crawler; the
+        lease holding it no longer returns it to the pool.
+
+        Seed crawlers are not closed: they are only taken out of the pool
+        until their lease is released.
+        """
+        with self._lock:
+            if crawler not in self._all:
+                return
+            self._all.remove(crawler)
+            if crawler in self._seeds:
+                self._quarantined.append(crawler)
+                return
+        try:
+            crawler.close()
+        except Exception as e:
+            print(f"Failed to close crawler: {str(e)}")
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        crawler = self.acquire()
+        try:
+            yield crawler
+        finally:
+            self.release(crawler)
+
+    def map(self, fn: Callable[[Any, Any], Any], items: Sequence[Any], default: Any = None) -> List[Any]:
+        """
+        Run fn(crawler, item) for every item across the pool.
+
+        Results are returned in the order of `items`. A failing item yields
+        `default` and does not affect the other workers.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def run(idx_item):
+            idx, item = idx_item
+            try:
+                with self.lease() as crawler:
+                    return fn(crawler, item)
+            except Exception as e:
+                print(f"Worker task {idx} failed: {str(e)}")
+                return default
+
+        workers = min(self.size, len(items))
+        if workers == 1:
+            return [run(pair) for pair in enumerate(items)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, enumerate(items)))
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            crawlers = [c for c in self._all + self._quarantined if c is not None]
+            self._all = []
+            self._quarantined = []
+        for crawler in crawlers:
+            try:
+                crawler.close()
+            except Exception as e:
+                print(f"Failed to close crawler: {str(e)}")
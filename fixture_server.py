@@ -0,0 +1,113 @@
+"""
+Local HTTP server for offline fixtures.
+
+Serves in-memory pages (registered with add()), files from a directory, or
+whatever a resolver callable returns, on 127.0.0.1 in a background thread.
+Used by the benchmark suite and by session replay.
+"""
+
+import mimetypes
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class FixtureServer:
+    """
+    - `routes`: {path (optionally with ?query): body or (content_type, body)}
+    - `directory`: files served for paths not in `routes`
+    - `resolver(path_with_query)`: returns a Response or None, tried last
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, object]] = None,
+        directory: Optional[str] = None,
+        resolver: Optional[Callable[[str], Optional[Response]]] = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+    ):
+        self.directory = directory
+        self.resolver = resolver
+        self.host = host
+        self.port = port
+        self._routes: Dict[str, Response] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        for path, body in (routes or {}).items():
+            if isinstance(body, tuple):
+                self.add(path, body[1], body[0])
+            else:
+                self.add(path, body)
+
+    def add(self, path: str, body, content_type: str = 'text/html; charset=utf-8', status: int = 200,
+            headers: Optional[Dict[str, str]] = None) -> None:
+        data = body.encode('utf-8') if isinstance(body, str) else bytes(body)
+        all_headers = {'Content-Type': content_type}
+        all_headers.update(headers or {})
+        self._routes[path] = (status, all_headers, data)
+
+    def url(self, path: str = '/') -> str:
+        return f"http://{self.host}:{self.port}{path if path.startswith('/') else '/' + path}"
+
+    def _lookup(self, raw_path: str) -> Optional[Response]:
+        path = urlsplit(raw_path).path
+        for key in (raw_path, path):
+            if key in self._routes:
+                return self._routes[key]
+        if self.directory:
+            file_path = os.path.normpath(os.path.join(self.directory, path.lstrip('/') or 'index.html'))
+            if file_path.startswith(os.path.abspath(self.directory)) and os.path.isfile(file_path):
+                with open(file_path, 'rb') as f:
+                    content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+                    return 200, {'Content-Type': content_type}, f.read()
+        if self.resolver is not None:
+            return self.resolver(raw_path)
+        return None
+
+    def start(self) -> 'FixtureServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                response = server._lookup(self.path)
+                status, headers, body = response or (404, {'Content-Type': 'text/plain'}, b'not found')
+                self.send_response(status)
+                for name, value in headers.items():
+                    if name.lower() not in ('content-length', 'transfer-encoding', 'content-encoding', 'connection'):
+                        self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_POST = do_GET
+
+            def log_message(self, format, *args):
+                pass
+
+        if self.directory:
+            self.directory = os.path.abspath(self.directory)
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
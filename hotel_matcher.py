@@ -0,0 +1,125 @@
+"""
+Indexed fuzzy matching of a reservation against search results.
+
+A HotelMatcher normalizes every result once (tokens + character trigrams)
+and keeps an inverted trigram index, so matching a reservation only touches
+results that share trigrams with it. get_matcher() reuses the index for
+every reservation that gets the same result set.
+"""
+
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+
+# Words that carry no identity in hotel names
+_STOPWORDS = frozenset({
+    'hotel', 'hotels', 'the', 'and', 'by', 'at', 'of', 'a', 'an', 'de', 'la', 'le', 'el', 'il',
+    'inn', 'resort', 'suites', 'apartments', 'apartment', 'hostel',
+})
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+# Field weights; fields missing on either side are left out and the rest renormalized
+_WEIGHTS = {'name': 0.75, 'location': 0.1, 'room_type': 0.15}
+# Candidates (by name score) that get the full name/address/room-type score
+_RESCORE_CANDIDATES = 8
+# Reservation field -> result field (BOOKING_RESERVATION_FIELDS / BOOKING_RESULT_FIELDS keys)
+_FIELDS = {'name': ('hotel_name', 'name'), 'location': ('location', 'location'), 'room_type': ('room_type', 'room_type')}
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase, strip accents and punctuation, drop stopwords; returns tokens."""
+    if not text or text == "N/A":
+        return []
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    tokens = [t for t in _NON_WORD_RE.split(text) if t]
+    meaningful = [t for t in tokens if t not in _STOPWORDS]
+    return meaningful or tokens
+
+
+def trigrams(tokens: List[str]) -> FrozenSet[str]:
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Dice coefficient of the trigram sets of two names (0..1)."""
+    ga, gb = trigrams(normalize_text(a)), trigrams(normalize_text(b))
+    if not ga or not gb:
+        return 0.0
+    return 2.0 * len(ga & gb) / (len(ga) + len(gb))
+
+
+class HotelMatcher:
+    def __init__(self, results: List[Dict[str, Any]]):
+        self.results = results
+        self._grams: List[Dict[str, FrozenSet[str]]] = []
+        self._name_sizes: List[int] = []
+        self._index: Dict[str, List[int]] = {}
+        for idx, item in enumerate(results):
+            grams = {field: trigrams(normalize_text(item.get(result_key, ''))) for field, (_, result_key) in _FIELDS.items()}
+            self._grams.append(grams)
+            self._name_sizes.append(len(grams['name']))
+            for gram in grams['name']:
+                self._index.setdefault(gram, []).append(idx)
+
+    def match(self, reservation: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Return (best result, confidence 0..1); (None, 0.0) when nothing shares a trigram."""
+        query = {field: trigrams(normalize_text(reservation.get(res_key, ''))) for field, (res_key, _) in _FIELDS.items()}
+        if not query['name']:
+            return None, 0.0
+
+        # Candidate generation via the inverted index: shared name trigrams per result
+        shared = Counter(chain.from_iterable(self._index.get(gram, ()) for gram in query['name']))
+        if not shared:
+            return None, 0.0
+
+        # Name similarity for every candidate; address/room type only refine the best few
+        qlen = len(query['name'])
+        name_scores = sorted(
+            ((2.0 * common / (qlen + self._name_sizes[idx]), idx) for idx, common in shared.items()),
+            reverse=True,
+        )[:_RESCORE_CANDIDATES]
+
+        best, best_score = None, 0.0
+        for name_score, idx in name_scores:
+            grams = self._grams[idx]
+            scores = {'name': name_score}
+            for field in ('location', 'room_type'):
+                if query[field] and grams[field]:
+                    scores[field] = 2.0 * len(query[field] & grams[field]) / (len(query[field]) + len(grams[field]))
+            total_weight = sum(_WEIGHTS[f] for f in scores)
+            score = sum(_WEIGHTS[f] * s for f, s in scores.items()) / total_weight
+            if score > best_score:
+                best, best_score = idx, score
+        if best is None:
+            return None, 0.0
+        return self.results[best], best_score
+
+
+_CACHE_SIZE = 64
+_cache: "OrderedDict[Tuple, HotelMatcher]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_matcher(results: List[Dict[str, Any]]) -> HotelMatcher:
+    """Return a HotelMatcher for `results`, reusing the index built for an identical result set."""
+    key = tuple((item.get('name', ''), item.get('location', ''), item.get('room_type', '')) for item in results)
+    with _cache_lock:
+        matcher = _cache.get(key)
+        if matcher is not None:
+            _cache.move_to_end(key)
+            return matcher
+    matcher = HotelMatcher(results)
+    with _cache_lock:
+        _cache[key] = matcher
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matcher
@@ -0,0 +1,84 @@
+"""
+Browserless fetch-and-parse backend for server-rendered result pages.
+
+Pages are fetched with a pooled requests.Session (carrying the browser's
+cookies when available) and parsed with lxml using the same CSS selector
+maps as the Selenium extractors. When a page has no matching cards it most
+likely needs JavaScript, and the caller falls back to Selenium.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:
+    requests = None  # requests optional (only needed for the HTTP backend)
+
+try:
+    from lxml import html as lxml_html
+except Exception:
+    lxml_html = None  # lxml + cssselect optional (only needed for the HTTP backend)
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+class HttpSearchBackend:
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 15, pool_size: int = 10):
+        if requests is None or lxml_html is None:
+            raise RuntimeError("HTTP backend needs 'requests', 'lxml' and 'cssselect'. Install them from requirements.txt.")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+
+    def load_cookies(self, cookies: List[Dict[str, Any]]) -> int:
+        """Load cookies in Selenium or DevTools format (e.g. OTACrawler.export_cookies())."""
+        count = 0
+        for cookie in cookies or []:
+            if not cookie.get('name'):
+                continue
+            self.session.cookies.set(
+                cookie['name'],
+                cookie.get('value', ''),
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+            )
+            count += 1
+        return count
+
+    def fetch(self, url: str) -> Optional[str]:
+        """GET a page; returns its HTML or None on a non-200 response."""
+        resp = self.session.get(url, timeout=self.timeout)
+        if resp.status_code != 200:
+            print(f"HTTP backend got {resp.status_code} for {url}")
+            return None
+        return resp.text
+
+    def extract(self, page_html: str, card_css: str, fields: Dict[str, str], limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Optional[str]]]]:
+        """
+        Parse cards from HTML with a {field: selector} map.
+        Returns (total card count, list of {key: text or None}), like OTACrawler._bulk_extract.
+        """
+        if not page_html:
+            return 0, []
+        doc = lxml_html.fromstring(page_html)
+        cards = doc.cssselect(card_css)
+        records = []
+        for card in cards[:limit] if limit is not None else cards:
+            record = {}
+            for key, css in fields.items():
+                found = card.cssselect(css) if css else []
+                record[key] = " ".join(found[0].text_content().split()) if found else None
+            records.append(record)
+        return len(cards), records
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,226 @@
+"""
+Lightweight per-step timing spans and counters.
+
+    from metrics import span, incr
+
+    with span('booking.search'):
+        with span('navigate'):
+            ...
+        with span('results_wait') as s:
+            if not found:
+                s.fail()          # soft failure (no exception)
+
+Nested spans are recorded under their parent's name ("booking.search/navigate").
+Durations, counts and errors (exceptions or fail()) are kept per name in a
+process-wide registry guarded by a lock, so pooled worker threads can share
+it. export_run() writes a JSON summary and, optionally, a Prometheus
+textfile (for node_exporter's textfile collector).
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    __slots__ = ('registry', 'name', 'failed', '_started')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+        self.failed = False
+
+    def fail(self) -> None:
+        """Count this span as an error without raising."""
+        self.failed = True
+
+    def __enter__(self) -> 'Span':
+        stack = self.registry._stack()
+        if stack:
+            self.name = f"{stack[-1]}/{self.name}"
+        stack.append(self.name)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._started
+        self.registry._stack().pop()
+        self.registry.record(self.name, elapsed, error=self.failed or exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    name = ''
+    failed = False
+
+    def fail(self) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._steps: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._listeners: List[Callable[[str, float, bool], None]] = []
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str):
+        return Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            step = self._steps.get(name)
+            if step is None:
+                step = self._steps[name] = {'count': 0, 'errors': 0, 'total': 0.0, 'min': seconds, 'max': seconds}
+            step['count'] += 1
+            step['total'] += seconds
+            if error:
+                step['errors'] += 1
+            if seconds < step['min']:
+                step['min'] = seconds
+            if seconds > step['max']:
+                step['max'] = seconds
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(name, seconds, error)
+            except Exception:
+                pass
+
+    def add_listener(self, listener: Callable[[str, float, bool], None]) -> None:
+        """Call listener(name, seconds, error) for every finished span (e.g. a session timeline)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, float, bool], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._steps.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {
+                name: {
+                    'count': s['count'],
+                    'errors': s['errors'],
+                    'total_seconds': round(s['total'], 6),
+                    'mean_seconds': round(s['total'] / s['count'], 6),
+                    'min_seconds': round(s['min'], 6),
+                    'max_seconds': round(s['max'], 6),
+                }
+                for name, s in sorted(self._steps.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {'started_at': self.started_at, 'updated_at': time.time(), 'steps': steps, 'counters': counters}
+
+    def prometheus_text(self, prefix: str = 'ota_crawler') -> str:
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_step_duration_seconds Time spent in crawler steps.",
+            f"# TYPE {prefix}_step_duration_seconds summary",
+        ]
+        for name, s in summary['steps'].items():
+            label = _label(name)
+            lines.append(f'{prefix}_step_duration_seconds_sum{{step="{label}"}} {s["total_seconds"]}')
+            lines.append(f'{prefix}_step_duration_seconds_count{{step="{label}"}} {s["count"]}')
+        lines += [f"# HELP {prefix}_step_duration_max_seconds Slowest run of each step.",
+                  f"# TYPE {prefix}_step_duration_max_seconds gauge"]
+        for name, s in summary['steps'].items():
+            lines.append(f'{prefix}_step_duration_max_seconds{{step="{_label(name)}"}} {s["max_seconds"]}')
+        lines += [f"# HELP {prefix}_step_errors_total Failed crawler steps.",
+                  f"# TYPE {prefix}_step_errors_total counter"]
+        for name, s in summary['steps'].items():
+            lines.append(f'{prefix}_step_errors_total{{step="{_label(name)}"}} {s["errors"]}')
+        if summary['counters']:
+            lines += [f"# HELP {prefix}_events_total Crawler events (cache hits, ...).",
+                      f"# TYPE {prefix}_events_total counter"]
+            for name, value in summary['counters'].items():
+                lines.append(f'{prefix}_events_total{{event="{_label(name)}"}} {value}')
+        lines.append(f"{prefix}_run_started_timestamp_seconds {summary['started_at']}")
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _atomic_write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def span(name: str):
+    return REGISTRY.span(name)
+
+
+def incr(name: str, value: float = 1) -> None:
+    REGISTRY.incr(name, value)
+
+
+def configure_from_config(config: Any) -> None:
+    REGISTRY.enabled = bool(getattr(config, 'METRICS_ENABLED', True))
+
+
+def export_run(config: Any, run: str, registry: Optional[MetricsRegistry] = None) -> Optional[str]:
+    """
+    Write the JSON summary of this run to METRICS_DIR/<run>_<start time>.json
+    (overwritten on every call, e.g. after each daemon cycle) and, when
+    METRICS_PROMETHEUS_FILE is set, the Prometheus textfile. Returns the JSON path.
+    """
+    registry = registry or REGISTRY
+    if not registry.enabled:
+        return None
+    try:
+        directory = getattr(config, 'METRICS_DIR', '') or 'metrics'
+        if not os.path.isabs(directory):
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+        stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(registry.started_at))
+        path = os.path.join(directory, f"{run}_{stamp}.json")
+        summary = registry.summary()
+        summary['run'] = run
+        _atomic_write(path, json.dumps(summary, indent=2))
+        prom_path = getattr(config, 'METRICS_PROMETHEUS_FILE', '')
+        if prom_path:
+            _atomic_write(prom_path, registry.prometheus_text())
+        return path
+    except Exception as e:
+        print(f"Metrics export failed: {str(e)}")
+        return None
@@ -0,0 +1,220 @@
+"""
+Network-response capture for OTACrawler.
+
+With capture on, Chrome writes every network event to its performance log.
+After a navigation, NetworkCapture reads the log, fetches the body of each
+response whose URL matches a registered mapper (Network.getResponseBody) and
+lets the mapper turn the JSON into records. Listings are therefore available
+as soon as their data response arrives, without waiting for cards to render
+and without card selectors.
+
+Mappers are registered per provider and kind ('search' or 'reservations'):
+
+    register_mapper('agoda', 'search', r"agoda\\.com/graphql/search", agoda_search_records)
+
+A mapper is called as mapper(payload, url) with the decoded JSON body and
+returns a list of records, or None / [] when the response is not the one it
+handles. Records use the same keys as the DOM field maps of the crawler
+(BOOKING_RESULT_FIELDS for 'search', BOOKING_RESERVATION_FIELDS for
+'reservations'), so they are finished exactly like extracted cards.
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+Mapper = Callable[[Any, str], Optional[List[Dict[str, Any]]]]
+
+
+class ResponseMapper:
+    def __init__(self, provider: str, kind: str, url_pattern: str, fn: Mapper, name: Optional[str] = None):
+        self.provider = provider.lower()
+        self.kind = kind
+        self.pattern = re.compile(url_pattern)
+        self.fn = fn
+        self.name = name or getattr(fn, '__name__', 'mapper')
+
+    def matches(self, url: str) -> bool:
+        return bool(self.pattern.search(url))
+
+
+_MAPPERS: Dict[Tuple[str, str], List[ResponseMapper]] = {}
+_MAPPERS_LOCK = threading.Lock()
+
+
+def register_mapper(provider: str, kind: str, url_pattern: str, fn: Mapper, name: Optional[str] = None) -> ResponseMapper:
+    """Register a response-to-records mapper; a mapper with the same name is replaced."""
+    mapper = ResponseMapper(provider, kind, url_pattern, fn, name)
+    with _MAPPERS_LOCK:
+        mappers = _MAPPERS.setdefault((mapper.provider, kind), [])
+        mappers[:] = [m for m in mappers if m.name != mapper.name]
+        mappers.append(mapper)
+    return mapper
+
+
+def unregister_mapper(provider: str, kind: str, name: str) -> None:
+    with _MAPPERS_LOCK:
+        mappers = _MAPPERS.get((provider.lower(), kind), [])
+        mappers[:] = [m for m in mappers if m.name != name]
+
+
+def mappers_for(provider: str, kind: str) -> List[ResponseMapper]:
+    with _MAPPERS_LOCK:
+        return list(_MAPPERS.get((provider.lower(), kind), []))
+
+
+def find_list(payload: Any, predicate: Callable[[Dict[str, Any]], bool], max_depth: int = 12) -> List[Dict[str, Any]]:
+    """First list (depth-first) whose first item is a dict satisfying `predicate`."""
+    stack = [(payload, 0)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, list):
+            if value and isinstance(value[0], dict) and predicate(value[0]):
+                return value
+            children = value
+        elif isinstance(value, dict):
+            children = list(value.values())
+        else:
+            continue
+        if depth < max_depth:
+            stack.extend((child, depth + 1) for child in reversed(children))
+    return []
+
+
+def dig(value: Any, *path: Any, default: Any = None) -> Any:
+    """value[path[0]][path[1]]... or `default` when a step is missing."""
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        if value is None:
+            return default
+    return value
+
+
+class NetworkCapture:
+    """
+    Reads matched responses from the Chrome performance log of `driver`.
+
+    `on_response(url, status, payload)` is called for every JSON XHR/fetch
+    response seen while reading the log (e.g. to record a session).
+    """
+
+    def __init__(self, driver: Any, poll_frequency: float = 0.1,
+                 on_response: Optional[Callable[[str, int, Any], None]] = None):
+        self.driver = driver
+        self.poll_frequency = poll_frequency
+        self.on_response = on_response
+        self._observed: Dict[str, Tuple[str, int]] = {}
+
+    def drain(self) -> None:
+        """
+        Drop logged events, e.g. before navigating, so only new responses are
+        considered (on_response still sees them).
+        """
+        try:
+            for _ in self._events():
+                pass
+        except Exception:
+            pass
+
+    def _events(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get('method', ''), message.get('params') or {}
+            if self.on_response is not None:
+                self._observe(method, params)
+            yield method, params
+
+    def _observe(self, method: str, params: Dict[str, Any]) -> None:
+        request_id = params.get('requestId')
+        if method == 'Network.responseReceived':
+            response = params.get('response') or {}
+            if params.get('type') in ('XHR', 'Fetch') and 'json' in (response.get('mimeType') or ''):
+                self._observed[request_id] = (response.get('url', ''), int(response.get('status') or 0))
+        elif method == 'Network.loadingFinished' and request_id in self._observed:
+            url, status = self._observed.pop(request_id)
+            payload = self._body(request_id)
+            if payload is not None:
+                try:
+                    self.on_response(url, status, payload)
+                except Exception as e:
+                    print(f"Recording response {url} failed: {str(e)}")
+        elif method == 'Network.loadingFailed':
+            self._observed.pop(request_id, None)
+
+    def _body(self, request_id: str) -> Any:
+        """Decoded JSON body of a finished response, or None (evicted, not JSON, ...)."""
+        try:
+            response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            return None
+        body = response.get('body', '')
+        if response.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', 'replace')
+        # Some endpoints prefix JSON with an anti-hijacking guard line
+        body = body.lstrip()
+        if body.startswith(")]}'"):
+            body = body.split("\n", 1)[-1]
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def records(self, mappers: List[ResponseMapper], timeout: float,
+                ready: Optional[Callable[[], bool]] = None, ready_timeout: float = 1.0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Wait up to `timeout` seconds for a response matched by one of `mappers`
+        that maps to at least one record, and return those records.
+        Returns None when no such response arrived.
+
+        Once `ready()` is true (e.g. the document finished loading), at most
+        `ready_timeout` more seconds are waited: a page rendered on the server
+        does not fetch its data afterwards, so it should not cost the full timeout.
+        """
+        if not mappers:
+            return None
+        pending: Dict[str, Tuple[str, ResponseMapper]] = {}
+        deadline = time.monotonic() + timeout
+        settled = ready is None
+        while True:
+            for method, params in self._events():
+                if method == 'Network.responseReceived':
+                    url = dig(params, 'response', 'url', default='')
+                    for mapper in mappers:
+                        if mapper.matches(url):
+                            pending[params.get('requestId')] = (url, mapper)
+                            break
+                elif method == 'Network.loadingFinished' and params.get('requestId') in pending:
+                    url, mapper = pending.pop(params['requestId'])
+                    payload = self._body(params['requestId'])
+                    if payload is None:
+                        continue
+                    try:
+                        records = mapper.fn(payload, url)
+                    except Exception as e:
+                        print(f"Response mapper {mapper.name} failed: {str(e)}")
+                        continue
+                    if records:
+                        return list(records)
+                elif method == 'Network.loadingFailed':
+                    pending.pop(params.get('requestId'), None)
+            now = time.monotonic()
+            if not settled and not pending:
+                try:
+                    settled = bool(ready())
+                except Exception:
+                    settled = True
+                if settled:
+                    deadline = min(deadline, now + ready_timeout)
+            if now >= deadline:
+                return None
+            time.sleep(self.poll_frequency)
@@ -0,0 +1,296 @@
+"""
+Precompiled, locale-aware normalization of scraped OTA text.
+
+- parse_price: "US$1,234.50" / "€ 1.234,50" / "1 234 zł" -> (amount, currency)
+- parse_rating: "Scored 7.4\\n7.4\\nGood\\n2,906 reviews" -> (7.4, 'Good', 2906)
+- parse_date / parse_stay_dates: locale date text -> ISO dates; numeric dates
+  are read day-first or month-first depending on the locale, and the format
+  that worked last is remembered per locale and tried first
+
+`locale` is a code such as "en-gb", "en-us" or "de". It decides the decimal
+separator of numbers and the day/month order of numeric dates; without one,
+numbers are read by the separator heuristics of parse_number() and numeric
+dates day-first.
+- normalize_results / normalize_reservations: batch APIs over result lists
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Longest symbols first so "US$" wins over "$"
+_CURRENCY_SYMBOLS = [
+    ('US$', 'USD'), ('HK$', 'HKD'), ('NZ$', 'NZD'), ('AU$', 'AUD'), ('A$', 'AUD'), ('CA$', 'CAD'),
+    ('C$', 'CAD'), ('S$', 'SGD'), ('R$', 'BRL'), ('MX$', 'MXN'), ('NT$', 'TWD'), ('CN¥', 'CNY'),
+    ('JP¥', 'JPY'), ('RMB', 'CNY'), ('zł', 'PLN'), ('Kč', 'CZK'), ('kr', 'SEK'), ('€', 'EUR'),
+    ('£', 'GBP'), ('¥', 'JPY'), ('￥', 'CNY'), ('₹', 'INR'), ('₩', 'KRW'), ('₽', 'RUB'),
+    ('₺', 'TRY'), ('฿', 'THB'), ('₫', 'VND'), ('₱', 'PHP'), ('元', 'CNY'), ('$', 'USD'),
+]
+_CURRENCY_RE = re.compile(
+    r"\b[A-Z]{3}\b|" + "|".join(re.escape(sym) for sym, _ in _CURRENCY_SYMBOLS)
+)
+_SYMBOL_TO_CODE = dict(_CURRENCY_SYMBOLS)
+_NUMBER_RE = re.compile(r"\d[\d.,'   ]*\d|\d")
+_SPACES_RE = re.compile(r"[   ']")
+_ISO_CODES = {
+    'USD', 'EUR', 'GBP', 'JPY', 'CNY', 'HKD', 'TWD', 'AUD', 'NZD', 'CAD', 'SGD', 'CHF', 'SEK', 'NOK',
+    'DKK', 'PLN', 'CZK', 'HUF', 'INR', 'KRW', 'THB', 'MYR', 'IDR', 'PHP', 'VND', 'BRL', 'MXN', 'TRY',
+    'RUB', 'AED', 'SAR', 'ZAR', 'ILS', 'RON',
+}
+
+_RATING_SCORE_RE = re.compile(r"(?<![\d.,])(10|[0-9](?:[.,][0-9])?)(?![\d.,])")
+_REVIEWS_RE = re.compile(r"([\d][\d.,   ]*)\s*(?:reviews?|评价|條評語|条评语|Bewertungen|avis|recensioni|comentarios)", re.IGNORECASE)
+_RATING_LABEL_RE = re.compile(
+    r"\b(Exceptional|Superb|Fabulous|Wonderful|Excellent|Very good|Very Good|Good|Pleasant|Review score|Okay|Passable|Poor|Disappointing)\b"
+)
+
+_DATE_FORMATS = (
+    "%Y-%m-%d", "%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y", "%a %d %b %Y", "%a %d %B %Y",
+    "%A %d %B %Y", "%a %b %d %Y", "%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d", "%Y年%m月%d日",
+)
+# Numeric dates are month-first in these regions (01/02/2026 = January 2)
+# Formats whose day/month order is ambiguous; they are tried in the locale's
+# order every time and never remembered (01/13/2026 parsing month-first must
+# not make 01/02/2026 month-first too)
+_DAY_MONTH_FORMATS = ("%d/%m/%Y", "%m/%d/%Y")
+_MONTH_FIRST_REGIONS = {'us', 'ph', 'fm', 'mh', 'pw', 'gu', 'pr', 'as', 'vi', 'um'}
+# Languages writing "1.234,50"; other languages use a decimal point
+_COMMA_DECIMAL_LANGUAGES = {
+    'de', 'fr', 'es', 'it', 'pt', 'nl', 'pl', 'cs', 'sk', 'ru', 'uk', 'tr', 'sv', 'da', 'nb', 'no',
+    'fi', 'hu', 'ro', 'bg', 'hr', 'sl', 'sr', 'el', 'lt', 'lv', 'et', 'id', 'vi', 'ca',
+}
+# Regions deviating from their language's decimal separator
+_DECIMAL_OVERRIDES = {'de-ch': '.', 'it-ch': '.', 'es-mx': '.', 'es-us': '.'}
+_DATE_CLEAN_RE = re.compile(r"[, ]|(?<=\d)(st|nd|rd|th)\b")
+_MULTISPACE_RE = re.compile(r"\s+")
+_RANGE_SPLIT_RE = re.compile(r"\s*(?:—|–|-(?!\d{2}\b)|\bto\b|\buntil\b|至|→)\s*")
+# "12–14 December 2025" / "12 - 14 Dec 2025"
+_SHARED_MONTH_RANGE_RE = re.compile(r"^(\d{1,2})\s*[–—-]\s*(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})$")
+# "Dec 12 – 14, 2025"
+_SHARED_MONTH_RANGE_US_RE = re.compile(r"^([A-Za-z]+)\s+(\d{1,2})\s*[–—-]\s*(\d{1,2})\s*,?\s+(\d{4})$")
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# Single dates inside free text, e.g. "Check-in: 12 Dec 2025 Check-out: 14 Dec 2025"
+_DATE_TOKEN_RE = re.compile(
+    r"\d{1,2} [^\W\d_]+\.? \d{4}"          # 12 Dec 2025
+    r"|[^\W\d_]+\.? \d{1,2} \d{4}"         # Dec 12 2025
+    r"|\d{1,2}[./]\d{1,2}[./]\d{4}"          # 12/12/2025, 12.12.2025
+    r"|\d{4}/\d{1,2}/\d{1,2}|\d{4}年\d{1,2}月\d{1,2}日"
+)
+
+# locale -> date format that parsed successfully last time
+_FORMAT_CACHE: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=64)
+def _locale_key(locale: Optional[str]) -> str:
+    """'en_US' / 'EN-us' -> 'en-us'; '' without a locale."""
+    return (locale or '').replace('_', '-').strip().lower()
+
+
+@lru_cache(maxsize=64)
+def _decimal_separator(locale: Optional[str]) -> Optional[str]:
+    """Decimal separator of `locale`, or None when unknown (no locale given)."""
+    key = _locale_key(locale)
+    if not key:
+        return None
+    if key in _DECIMAL_OVERRIDES:
+        return _DECIMAL_OVERRIDES[key]
+    return ',' if key.split('-')[0] in _COMMA_DECIMAL_LANGUAGES else '.'
+
+
+@lru_cache(maxsize=64)
+def _date_formats(locale: Optional[str]) -> Tuple[str, ...]:
+    """_DATE_FORMATS with the numeric day/month order of `locale` first."""
+    region = _locale_key(locale).partition('-')[2]
+    if region not in _MONTH_FIRST_REGIONS:
+        return _DATE_FORMATS
+    day_first, month_first = (_DATE_FORMATS.index(fmt) for fmt in _DAY_MONTH_FORMATS)
+    formats = list(_DATE_FORMATS)
+    formats[day_first], formats[month_first] = formats[month_first], formats[day_first]
+    return tuple(formats)
+
+
+def parse_number(text: str, decimal: Optional[str] = None) -> Optional[float]:
+    """
+    Parse a grouped number such as '1,234.50', '1.234,50' or '1 234'.
+
+    `decimal` is the locale's decimal separator (',' or '.'); the other one
+    groups thousands. Without it, or when the text contradicts it (e.g. the
+    separator appears twice), both conventions are recognized: with two kinds
+    of separator the last one is the decimal point; a lone separator followed
+    by exactly three digits groups thousands (prices never have three
+    decimals), otherwise it is the decimal point.
+    """
+    if not text:
+        return None
+    raw = _SPACES_RE.sub('', text)
+    comma, dot = raw.rfind(','), raw.rfind('.')
+    if decimal is not None and raw.count(decimal) <= 1 and raw.rfind(decimal) >= max(comma, dot):
+        pass
+    elif comma >= 0 and dot >= 0:
+        decimal = ',' if comma > dot else '.'
+    elif comma >= 0 or dot >= 0:
+        sep = ',' if comma >= 0 else '.'
+        tail = len(raw) - raw.rfind(sep) - 1
+        decimal = None if raw.count(sep) > 1 or tail == 3 else sep
+    else:
+        decimal = None
+    if decimal is None:
+        raw = raw.replace(',', '').replace('.', '')
+    else:
+        group = '.' if decimal == ',' else ','
+        raw = raw.replace(group, '').replace(decimal, '.')
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def parse_price(text: str, locale: Optional[str] = None) -> Tuple[float, str]:
+    """
+    Return (amount, ISO currency code or '') from price text. When several
+    amounts are shown (original and discounted), the last one is the current price.
+    """
+    if not text or text == "N/A":
+        return 0.0, ''
+    numbers = _NUMBER_RE.findall(text)
+    amount = parse_number(numbers[-1], _decimal_separator(locale)) if numbers else None
+    currency = ''
+    for match in _CURRENCY_RE.findall(text):
+        code = _SYMBOL_TO_CODE.get(match, match)
+        if code in _ISO_CODES:
+            currency = code
+    return (amount or 0.0), currency
+
+
+def parse_rating(text: str, locale: Optional[str] = None) -> Tuple[Optional[float], str, Optional[int]]:
+    """Return (score, label, review count) from a review-score block."""
+    if not text or text == "N/A":
+        return None, '', None
+    reviews = None
+    rest = text
+    decimal = _decimal_separator(locale)
+    m = _REVIEWS_RE.search(text)
+    if m:
+        count = parse_number(m.group(1), decimal)
+        reviews = int(count) if count is not None else None
+        rest = text[:m.start()] + text[m.end():]
+    score = None
+    m = _RATING_SCORE_RE.search(rest)
+    if m:
+        score = parse_number(m.group(1), decimal)
+    m = _RATING_LABEL_RE.search(rest)
+    label = m.group(1) if m else ''
+    return score, label, reviews
+
+
+def _clean_date_text(text: str) -> str:
+    return _MULTISPACE_RE.sub(' ', _DATE_CLEAN_RE.sub(' ', text)).strip()
+
+
+def parse_date(text: str, locale: Optional[str] = None) -> Optional[date]:
+    """
+    Parse a single date; numeric dates follow the day/month order of `locale`,
+    and the format that worked is remembered per locale (except ambiguous
+    day/month formats, see _DAY_MONTH_FORMATS).
+    """
+    if not text:
+        return None
+    cleaned = _clean_date_text(text)
+    key = _locale_key(locale)
+    cached = _FORMAT_CACHE.get(key)
+    if cached:
+        try:
+            return datetime.strptime(cleaned, cached).date()
+        except ValueError:
+            pass
+    for fmt in _date_formats(locale):
+        if fmt == cached:
+            continue
+        try:
+            parsed = datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+        if fmt not in _DAY_MONTH_FORMATS:
+            _FORMAT_CACHE[key] = fmt
+        return parsed
+    return None
+
+
+def parse_stay_dates(text: str, locale: Optional[str] = None) -> Tuple[str, str]:
+    """Return ('YYYY-MM-DD', 'YYYY-MM-DD') check-in/check-out from a stay date range, or ('', '')."""
+    if not text or text == "N/A":
+        return '', ''
+    iso = _ISO_DATE_RE.findall(text)
+    if len(iso) >= 2:
+        return iso[0], iso[1]
+    cleaned = _clean_date_text(text)
+
+    m = _SHARED_MONTH_RANGE_RE.match(cleaned)
+    if m:
+        first = parse_date(f"{m.group(1)} {m.group(3)} {m.group(4)}", locale)
+        second = parse_date(f"{m.group(2)} {m.group(3)} {m.group(4)}", locale)
+        if first and second:
+            return first.isoformat(), second.isoformat()
+    m = _SHARED_MONTH_RANGE_US_RE.match(cleaned)
+    if m:
+        first = parse_date(f"{m.group(1)} {m.group(2)} {m.group(4)}", locale)
+        second = parse_date(f"{m.group(1)} {m.group(3)} {m.group(4)}", locale)
+        if first and second:
+            return first.isoformat(), second.isoformat()
+
+    parts = [p for p in _RANGE_SPLIT_RE.split(cleaned) if p and not p.isspace()]
+    if len(parts) >= 2:
+        second = parse_date(parts[-1], locale)
+        first = parse_date(parts[0], locale)
+        if first is None and second is not None:
+            # "Dec 12 – Dec 14 2025": the year is only printed once
+            first = parse_date(f"{parts[0]} {second.year}", locale)
+        if first and second:
+            return first.isoformat(), second.isoformat()
+
+    # Labels or trailing text around the dates ("Check-in: ...", "· 2 nights"):
+    # the first two date-like tokens
+    found = []
+    pos = 0
+    while len(found) < 2:
+        m = _DATE_TOKEN_RE.search(cleaned, pos)
+        if m is None:
+            break
+        parsed = parse_date(m.group(0), locale)
+        if parsed is None:
+            # e.g. "nights 12 2025": retry from the next word
+            pos = m.start() + 1
+            continue
+        found.append(parsed)
+        pos = m.end()
+    if len(found) == 2:
+        return found[0].isoformat(), found[1].isoformat()
+    return '', ''
+
+
+def normalize_result(item: Dict[str, Any], locale: Optional[str] = None) -> Dict[str, Any]:
+    """Copy one search result adding price_value, currency, rating_value, rating_label and review_count."""
+    out = dict(item)
+    out['price_value'], out['currency'] = parse_price(item.get('price', ''), locale)
+    out['rating_value'], out['rating_label'], out['review_count'] = parse_rating(item.get('rating', ''), locale)
+    return out
+
+
+def normalize_results(results: List[Dict[str, Any]], locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """normalize_result() for every search result."""
+    return [normalize_result(item, locale) for item in results]
+
+
+def normalize_reservations(reservations: List[Dict[str, Any]], locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Copy reservations adding price_value and currency (and ISO dates when missing)."""
+    normalized = []
+    for res in reservations:
+        out = dict(res)
+        out['price_value'], out['currency'] = parse_price(res.get('price_total', ''), locale)
+        if not out.get('check_in') or not out.get('check_out'):
+            out['check_in'], out['check_out'] = parse_stay_dates(res.get('date_range', ''), locale)
+        normalized.append(out)
+    return normalized
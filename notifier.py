@@ -3,10 +3,14 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import List, Optional
 
-try:
-    from twilio.rest import Client as TwilioClient
-except Exception:
-    TwilioClient = None  # Twilio optional
+
+def _twilio_client_class():
+    """Import Twilio only when an SMS is actually sent (it is slow to import)."""
+    try:
+        from twilio.rest import Client
+    except Exception:
+        return None  # Twilio optional
+    return Client
 
 
 def send_email(
@@ -41,6 +45,7 @@ def send_sms(
     to_numbers: List[str],
     body: str,
 ):
+    TwilioClient = _twilio_client_class()
     if TwilioClient is None:
         raise RuntimeError("Twilio is not installed. Install 'twilio' package.")
 
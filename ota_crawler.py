@@ -3,7 +3,6 @@ OTA Web Crawler using Selenium
 This crawler visits OTA websites and searches for available rooms based on given dates.
 """
 
-import time
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -15,6 +14,391 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
 import json
 import re
+from functools import wraps
+from inspect import isgeneratorfunction
+from itertools import islice
+from urllib.parse import urlencode, quote_plus, urlparse, parse_qsl
+from page_waits import PageWaiter
+from search_cache import make_cache_key
+from normalization import parse_price, parse_stay_dates
+from metrics import span, incr
+from rate_limiter import get_limiter, RateLimitError
+from network_capture import NetworkCapture, register_mapper, mappers_for, find_list, dig
+
+
+# Lean mode: resource types blocked through DevTools (mapped to URL patterns,
+# since Network.setBlockedURLs matches URLs) and Chrome features turned off.
+# Tracker URLs to block come from config.LEAN_BLOCKED_URL_PATTERNS.
+LEAN_RESOURCE_EXTENSIONS = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'm3u8', 'mp3'),
+}
+# "*.ico" and "*.ico?*": the extension must end the path ("/a.icons.css" is not an image)
+LEAN_RESOURCE_PATTERNS = {
+    resource_type: [pattern for ext in extensions for pattern in (f'*.{ext}', f'*.{ext}?*')]
+    for resource_type, extensions in LEAN_RESOURCE_EXTENSIONS.items()
+}
+LEAN_DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media')
+LEAN_CHROME_ARGS = (
+    '--disable-extensions', '--disable-sync', '--disable-background-networking',
+    '--disable-default-apps', '--disable-component-update', '--disable-notifications',
+    '--disable-translate', '--mute-audio', '--no-first-run', '--metrics-recording-only',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+)
+LEAN_DEFAULT_WINDOW_SIZE = (1280, 900)
+
+
+def _provider_listed(setting, provider):
+    try:
+        import config as _cfg
+        providers = getattr(_cfg, setting, ()) or ()
+    except Exception:
+        return False
+    return provider.lower() in {p.lower() for p in providers}
+
+
+def lean_mode_enabled(provider):
+    """True when config.LEAN_MODE_PROVIDERS lists `provider` (e.g. 'booking')."""
+    return _provider_listed('LEAN_MODE_PROVIDERS', provider)
+
+
+def capture_mode_enabled(provider):
+    """True when config.NETWORK_CAPTURE_PROVIDERS lists `provider` (e.g. 'booking')."""
+    return _provider_listed('NETWORK_CAPTURE_PROVIDERS', provider)
+
+
+# Booking.com search result card and the fields read from it
+BOOKING_RESULT_CARD = "[data-testid='property-card']"
+BOOKING_RESULT_FIELDS = {
+    'name': "[data-testid='title']",
+    'price': "[data-testid='price-and-discounted-price']",
+    'rating': "[data-testid='review-score']",
+    'location': "[data-testid='address']",
+    'room_type': "[data-testid='recommended-units']",
+}
+
+BOOKING_SEARCH_RESULTS_URL = "https://www.booking.com/searchresults.html"
+
+# Occupancy popover of the homepage search form: ids of the inputs whose -/+
+# buttons set each count (named like the results-URL parameters)
+BOOKING_OCCUPANCY_INPUTS = {
+    'adults': 'group_adults',
+    'rooms': 'no_rooms',
+}
+
+
+def build_booking_search_url(destination, check_in, check_out, adults=2, rooms=1, children=0, child_ages=None):
+    """
+    Build a Booking.com search-results URL so a search can skip the form.
+
+    Args:
+        destination (str): City or hotel name (sent as the free-text `ss` query)
+        check_in (str): Check-in date in format 'YYYY-MM-DD'
+        check_out (str): Check-out date in format 'YYYY-MM-DD'
+        adults (int): Number of adults
+        rooms (int): Number of rooms
+        children (int): Number of children
+        child_ages (list): Optional age per child (Booking prices children by age)
+    """
+    params = [
+        ('ss', destination),
+        ('checkin', check_in),
+        ('checkout', check_out),
+        ('group_adults', int(adults)),
+        ('no_rooms', int(rooms)),
+        ('group_children', int(children)),
+    ]
+    for age in (child_ages or [])[:int(children)]:
+        params.append(('age', int(age)))
+    return f"{BOOKING_SEARCH_RESULTS_URL}?{urlencode(params)}"
+
+
+# Results-page query parameters that describe the stay dates or the current page
+_STAY_DATE_PARAMS = {
+    'checkin', 'checkout', 'checkin_year', 'checkin_month', 'checkin_monthday',
+    'checkout_year', 'checkout_month', 'checkout_monthday', 'offset', 'page',
+}
+
+
+def with_stay_dates(url, check_in, check_out):
+    """Return a results-page URL with only its check-in/check-out dates replaced (and paging reset)."""
+    parts = urlparse(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _STAY_DATE_PARAMS]
+    params += [('checkin', check_in), ('checkout', check_out)]
+    return parts._replace(query=urlencode(params)).geturl()
+
+
+def flexible_stays(check_in, check_out, days_around=0, stay_lengths=None, today=None):
+    """
+    Unique (check_in, check_out) pairs around a base stay.
+
+    Args:
+        check_in (str): Base check-in date 'YYYY-MM-DD'
+        check_out (str): Base check-out date 'YYYY-MM-DD'
+        days_around (int): Shift check-in by -N..+N days
+        stay_lengths (list): Nights per stay (default: the base stay length)
+        today (date): Check-ins before this date are skipped (default: today)
+    """
+    base_in = datetime.strptime(check_in, "%Y-%m-%d").date()
+    base_out = datetime.strptime(check_out, "%Y-%m-%d").date()
+    today = today or datetime.now().date()
+    lengths = stay_lengths or [(base_out - base_in).days]
+    stays = []
+    for shift in range(-int(days_around), int(days_around) + 1):
+        start = base_in + timedelta(days=shift)
+        if start < today:
+            continue
+        for nights in lengths:
+            if int(nights) < 1:
+                continue
+            stay = (start.isoformat(), (start + timedelta(days=int(nights))).isoformat())
+            if stay not in stays:
+                stays.append(stay)
+    return stays
+
+
+def price_matrix(results_by_stay, locale=None):
+    """
+    Build a stay x property price matrix from {(check_in, check_out): results}.
+
+    Returns:
+        dict: 'stays' (list of [check_in, check_out]), 'properties' (names in order
+        of first appearance), 'prices' (one row per stay, one column per property;
+        None where the property was not listed), 'currency' and 'cheapest'
+        ({'check_in', 'check_out', 'name', 'price'} or None)
+    """
+    properties, column = [], {}
+    for results in results_by_stay.values():
+        for item in results:
+            name = item.get('name', 'N/A')
+            if name not in column:
+                column[name] = len(properties)
+                properties.append(name)
+    rows, currency, cheapest = [], '', None
+    for (check_in, check_out), results in results_by_stay.items():
+        row = [None] * len(properties)
+        for item in results:
+            amount, code = parse_price(item.get('price', ''), locale)
+            if not amount:
+                continue
+            idx = column[item.get('name', 'N/A')]
+            if row[idx] is None or amount < row[idx]:
+                row[idx] = amount
+            currency = currency or code
+            if cheapest is None or amount < cheapest['price']:
+                cheapest = {'check_in': check_in, 'check_out': check_out, 'name': item.get('name', 'N/A'), 'price': amount}
+        rows.append(row)
+    return {
+        'stays': [list(stay) for stay in results_by_stay],
+        'properties': properties,
+        'prices': rows,
+        'currency': currency,
+        'cheapest': cheapest,
+    }
+
+
+_CANCELLABLE_UNTIL_RE = re.compile(r"until\s+([^.,;]+)", re.IGNORECASE)
+
+# Reservation record key -> (BOOKING_SELECTORS key, default selector)
+BOOKING_RESERVATION_FIELDS = {
+    'hotel_name': ('hotel_name', '[data-testid="property-name"]'),
+    'room_type': ('room_type', '[data-testid="room-type"]'),
+    'location': ('property_address', '[data-testid="property-address"]'),
+    'date_range': ('date_range', '[data-testid="stay-dates"]'),
+    'price_total': ('price_total', '[data-testid="total-price"]'),
+    'cancellation_policy': ('cancellation_policy', '[data-testid="cancellation-policy"]'),
+    'status': ('reservation_status', '[data-testid="reservation-status"]'),
+}
+
+# Title/URL of a bot-check or throttling page served instead of the requested one
+_BLOCKED_PAGE_RE = re.compile(
+    r"captcha|are you a robot|access denied|too many requests|unusual traffic|verify you are human|/challenge",
+    re.IGNORECASE,
+)
+_PAGE_TITLE_URL_JS = "return [document.title || '', location.href || ''];"
+
+# Booking.com data responses (network capture mode). Search results arrive from the
+# GraphQL endpoint; the reservations list from GraphQL or the trips/reservations APIs.
+# Every GraphQL call uses the same URL, so the mappers check the payload shape too.
+BOOKING_SEARCH_RESPONSE_PATTERN = r"booking\.com/dml/graphql"
+BOOKING_RESERVATIONS_RESPONSE_PATTERN = r"booking\.com/(dml/graphql|.*(trips|reservations?)[^/]*/?(\?|$))"
+
+
+def _text(*values):
+    """First value that is not empty, as text (None when all are empty)."""
+    for value in values:
+        if value not in (None, '', [], {}):
+            return str(value)
+    return None
+
+
+def booking_search_response_records(payload, url=None):
+    """
+    Map a Booking.com search GraphQL response (data.searchQueries.search.results)
+    to BOOKING_RESULT_FIELDS records; other GraphQL responses map to [].
+    """
+    search = dig(payload, 'data', 'searchQueries', 'search')
+    if not isinstance(search, dict):
+        return []
+    properties = find_list(search, lambda item: 'basicPropertyData' in item)
+    records = []
+    for prop in properties:
+        price = dig(prop, 'priceDisplayInfoIrene', 'displayPrice', 'amountPerStay') or {}
+        amount = _text(price.get('amountUnformatted'), price.get('amount'))
+        currency = price.get('currency') or ''
+        score = dig(prop, 'basicPropertyData', 'reviewScore') or {}
+        rating = None
+        if score.get('score'):
+            label = dig(score, 'totalScoreTextTag', 'translation', default='')
+            rating = f"Scored {score['score']}\n{score['score']}\n{label}\n{score.get('reviewCount') or 0} reviews"
+        records.append({
+            'name': _text(dig(prop, 'displayName', 'text'), dig(prop, 'basicPropertyData', 'name')),
+            'price': f"{currency} {amount}".strip() if amount else None,
+            'rating': rating,
+            'location': _text(dig(prop, 'location', 'displayLocation'),
+                              dig(prop, 'basicPropertyData', 'location', 'address'),
+                              dig(prop, 'basicPropertyData', 'location', 'city')),
+            'room_type': _text(dig(prop, 'matchingUnitConfigurations', 'commonConfiguration', 'name')),
+        })
+    return [record for record in records if record['name']]
+
+
+def booking_reservations_response_records(payload, url=None):
+    """Map a Booking.com reservations/trips response to BOOKING_RESERVATION_FIELDS records."""
+    name_keys = ('propertyName', 'hotelName', 'accommodationName')
+    date_keys = ('checkin', 'checkIn', 'startDate')
+    # A stay needs a property and dates; other GraphQL lists (e.g. recent searches) do not match
+    trips = find_list(payload, lambda item: (any(key in item for key in name_keys)
+                                             or isinstance(item.get('property'), dict))
+                      and any(key in item for key in date_keys))
+    records = []
+    for trip in trips:
+        prop = trip.get('property') if isinstance(trip.get('property'), dict) else {}
+        check_in = _text(trip.get('checkin'), trip.get('checkIn'), trip.get('startDate'))
+        check_out = _text(trip.get('checkout'), trip.get('checkOut'), trip.get('endDate'))
+        price = trip.get('price') if isinstance(trip.get('price'), dict) else {}
+        amount = _text(price.get('amount'), price.get('value'), trip.get('totalPrice'))
+        records.append({
+            'hotel_name': _text(*(trip.get(key) for key in name_keys), prop.get('name')),
+            'room_type': _text(trip.get('roomName'), trip.get('roomType'), dig(trip, 'rooms', 0, 'name')),
+            'location': _text(prop.get('address'), dig(prop, 'location', 'address'), prop.get('city'), trip.get('city')),
+            'date_range': f"{check_in} - {check_out}" if check_in and check_out else None,
+            'price_total': f"{price.get('currency') or ''} {amount}".strip() if amount else None,
+            'cancellation_policy': _text(trip.get('cancellationPolicy'), dig(trip, 'policies', 'cancellation')),
+            'status': _text(trip.get('status'), trip.get('reservationStatus')),
+        })
+    return [record for record in records if record['hotel_name']]
+
+
+register_mapper('booking', 'search', BOOKING_SEARCH_RESPONSE_PATTERN, booking_search_response_records)
+register_mapper('booking', 'reservations', BOOKING_RESERVATIONS_RESPONSE_PATTERN, booking_reservations_response_records)
+
+# "Load more" button and next-page link on Booking.com search results
+BOOKING_PAGINATION = {
+    'load_more': "[data-testid='pagination-load-more'] button, button[data-testid='load-more-results']",
+    'next_page': "button[aria-label='Next page']",
+}
+
+# Keys of a generic selector map that control pagination instead of naming result fields
+GENERIC_CONTROL_KEYS = ('result_card', 'load_more', 'next_page')
+
+# Reads every card and every field in a single WebDriver round trip.
+# arguments: root element (or null for document), card selector (or null to
+# treat root itself as the only card), {field: selector}, max cards (or null),
+# index of the first card to read (for cards appended by lazy loading).
+# Missing fields come back as null instead of raising NoSuchElementException.
+_BULK_EXTRACT_JS = """
+var root = arguments[0] || document, cardCss = arguments[1], fields = arguments[2], limit = arguments[3];
+var start = arguments[4] || 0;
+var cards = cardCss ? root.querySelectorAll(cardCss) : [root];
+var n = (limit === null || limit === undefined) ? cards.length : Math.min(start + limit, cards.length);
+var records = [];
+for (var i = start; i < n; i++) {
+  var rec = {};
+  for (var key in fields) {
+    var el = fields[key] ? cards[i].querySelector(fields[key]) : null;
+    rec[key] = el ? (el.innerText || el.textContent || '').trim() : null;
+  }
+  records.push(rec);
+}
+return {count: cards.length, records: records};
+"""
+
+
+_READ_LOCAL_STORAGE_JS = """
+var out = {};
+for (var i = 0; i < localStorage.length; i++) { var k = localStorage.key(i); out[k] = localStorage.getItem(k); }
+return out;
+"""
+
+# Runs before page scripts on every navigation; only fills keys the page does not have yet
+_RESTORE_LOCAL_STORAGE_JS = """
+(function (saved) {
+  var items = saved[location.origin];
+  if (!items) return;
+  try {
+    for (var k in items) { if (localStorage.getItem(k) === null) localStorage.setItem(k, items[k]); }
+  } catch (e) {}
+})(%s);
+"""
+
+# Clicks the first visible match of every selector in one round trip; returns the selectors clicked
+_DISMISS_POPUPS_JS = """
+var selectors = arguments[0], clicked = [];
+for (var i = 0; i < selectors.length; i++) {
+  var found = document.querySelectorAll(selectors[i]);
+  for (var j = 0; j < found.length; j++) {
+    var el = found[j];
+    if (!el.getClientRects().length) continue;
+    try { el.click(); clicked.push(selectors[i]); } catch (e) {}
+    break;
+  }
+}
+return clicked;
+"""
+
+# Installed before page scripts: dismisses popups as they are added to the DOM
+_AUTO_DISMISS_POPUPS_JS = """
+(function (selectors) {
+  var clicks = 0, pending = false;
+  function sweep() {
+    pending = false;
+    for (var i = 0; i < selectors.length && clicks < 50; i++) {
+      var found = document.querySelectorAll(selectors[i]);
+      for (var j = 0; j < found.length; j++) {
+        if (!found[j].getClientRects().length) continue;
+        try { found[j].click(); clicks++; } catch (e) {}
+        break;
+      }
+    }
+  }
+  function schedule() { if (!pending) { pending = true; setTimeout(sweep, 100); } }
+  new MutationObserver(schedule).observe(document, {childList: true, subtree: true});
+  schedule();
+})(%s);
+"""
+
+
+def _recorded(method):
+    """Record the steps of a crawler operation into its session bundle (record mode)."""
+    if isgeneratorfunction(method):
+        @wraps(method)
+        def generator(self, *args, **kwargs):
+            if self._recorder is None:
+                yield from method(self, *args, **kwargs)
+                return
+            with self._recorder.active():
+                yield from method(self, *args, **kwargs)
+        return generator
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._recorder is None:
+            return method(self, *args, **kwargs)
+        with self._recorder.active():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class OTACrawler:
@@ -23,17 +407,179 @@ class OTACrawler:
     Supports searching for hotel rooms with customizable parameters.
     """
     
-    def __init__(self, headless=False, timeout=10):
+    def __init__(self, headless=False, timeout=10, worker_id=None, backend=None, cache=None, lean=False,
+                 capture=False, record=None, replay=None):
         """
         Initialize the crawler with browser settings.
         
         Args:
             headless (bool): Run browser in headless mode (no GUI)
             timeout (int): Default timeout for element waits in seconds
+            worker_id (int): Worker number when running inside a CrawlerPool.
+                Pooled workers do not share CHROME_USER_DATA_DIR (Chrome locks
+                the profile) and get their own screenshot file names.
+            backend (str): 'selenium' (default) or 'http'. The HTTP backend
+                fetches and parses search pages without a browser; Chrome is
+                then only started when a page needs JavaScript.
+                Defaults to config.SEARCH_BACKEND.
+            cache (SearchCache): Search result cache consulted before opening
+                a results page. Defaults to the SEARCH_CACHE_* config settings.
+            lean (bool): Lean browser profile: eager page loads, images/fonts/
+                media and tracker URLs blocked through DevTools (LEAN_* config),
+                a small fixed window and unneeded Chrome features disabled.
+                See lean_mode_enabled() for the per-provider switch.
+            capture (bool): Network-response capture: Chrome performance logging
+                is turned on and listings are read from the site's JSON/GraphQL
+                responses (registered mappers, see network_capture) as soon as
+                they arrive, falling back to the rendered cards when no data
+                response is captured; results beyond the first data response
+                are read from the page. See capture_mode_enabled().
+            record (str): Record this session into a new bundle under this
+                directory: page HTML, JSON responses and a step timeline
+                (see session_recording). Defaults to config.RECORD_SESSION_DIR.
+            replay (str): Replay a recorded bundle: navigations are served from
+                a local server instead of the live site, and the search cache
+                and network capture are not used (recorded pages have no
+                scripts, see session_recording). Defaults to config.REPLAY_SESSION_DIR.
         """
         self.timeout = timeout
-        self.driver = self._setup_driver(headless)
-        self.wait = WebDriverWait(self.driver, timeout)
+        self.lean = lean
+        self.capture = capture
+        self.worker_id = worker_id
+        self.headless = headless
+        self.backend = (backend or self._config_value('SEARCH_BACKEND', 'selenium') or 'selenium').lower()
+        self._driver = None
+        self._closed = False
+        self._http = None
+        self._pending_cookies = None
+        self._popup_observers = {}
+        self._capture = None
+        self._recorder = None
+        self._replay = None
+        # Error of the last search_* call (None when it succeeded). Searches
+        # return [] on errors, this tells a failed search from an empty one.
+        self.last_search_error = None
+        record = record if record is not None else self._config_value('RECORD_SESSION_DIR', '')
+        replay = replay if replay is not None else self._config_value('REPLAY_SESSION_DIR', '')
+        if replay:
+            from session_recording import SessionReplay
+            self._replay = SessionReplay(self._local_path(replay)).start()
+        elif record:
+            from session_recording import SessionRecorder, new_bundle_dir
+            self._recorder = SessionRecorder(new_bundle_dir(self._local_path(record), worker_id))
+        if self._replay is not None:
+            # Replays must run the crawler code, not return cached results
+            self.cache = None
+            if self.capture:
+                # Recorded pages have no scripts: no data response would ever arrive
+                print("Network capture is off while replaying a session")
+                self.capture = False
+        else:
+            self.cache = cache if cache is not None else self._cache_from_config()
+        if self.backend != 'http':
+            self._start_driver()
+
+    def _start_driver(self):
+        if self._closed:
+            # e.g. a search abandoned by ProviderComparison: do not start a new browser
+            raise RuntimeError("Crawler is closed")
+        self._driver = self._setup_driver(self.headless)
+        self._popup_observers = {}
+        if self.capture or self._recorder is not None:
+            on_response = self._recorder.response if self._recorder is not None else None
+            self._capture = NetworkCapture(self._driver, on_response=on_response)
+        else:
+            self._capture = None
+        self._wait = WebDriverWait(self._driver, self.timeout)
+        self._waits = PageWaiter(self._driver, self._load_wait_timeouts())
+        if self._pending_cookies:
+            self.import_cookies(self._pending_cookies)
+            self._pending_cookies = None
+
+    @property
+    def driver(self):
+        """The Chrome WebDriver, started on first use when the HTTP backend is active."""
+        if self._driver is None:
+            self._start_driver()
+        return self._driver
+
+    @property
+    def wait(self):
+        if self._driver is None:
+            self._start_driver()
+        return self._wait
+
+    @property
+    def waits(self):
+        if self._driver is None:
+            self._start_driver()
+        return self._waits
+
+    def _http_backend(self):
+        """Return the HTTP backend, creating it with the browser's cookies if a browser is running."""
+        if self._http is None:
+            from http_backend import HttpSearchBackend
+            self._http = HttpSearchBackend(timeout=self.timeout)
+            if self._pending_cookies:
+                self._http.load_cookies(self._pending_cookies)
+        if self._driver is not None:
+            self._http.load_cookies(self.export_cookies())
+        return self._http
+
+    def _local_path(self, path):
+        """Relative paths are resolved next to the source files."""
+        return path if os.path.isabs(path) else os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+    def _config_value(self, name, default=None):
+        """Read an optional setting from config.py."""
+        try:
+            import config as _cfg
+            return getattr(_cfg, name, default)
+        except Exception:
+            return default
+
+    def _cache_from_config(self):
+        try:
+            import config as _cfg
+            from search_cache import cache_from_config
+            return cache_from_config(_cfg)
+        except Exception as e:
+            print(f"Search cache disabled: {str(e)}")
+            return None
+
+    def _cached_search(self, key, provider, search, use_cache=True, cacheable=None, partial_key=None):
+        """
+        Return cached results for `key` (or `partial_key`), or run search() and
+        cache non-empty results. Results that cacheable() says are partial (a stop
+        predicate ended the search) are cached under `partial_key` only, and not
+        at all without one.
+        """
+        if not (use_cache and self.cache is not None and self.cache.enabled):
+            return search()
+        for lookup_key in (key, partial_key):
+            if lookup_key is None:
+                continue
+            try:
+                cached = self.cache.get(lookup_key)
+                if cached is not None:
+                    incr(f"cache.{provider}.hit")
+                    print(f"Using cached results ({len(cached)} items)")
+                    return cached
+            except Exception as e:
+                print(f"Search cache read failed: {str(e)}")
+        incr(f"cache.{provider}.miss")
+        results = search()
+        store_key = key if (cacheable is None or cacheable()) else partial_key
+        if results and store_key is not None:
+            try:
+                self.cache.put(store_key, provider, results)
+            except Exception as e:
+                print(f"Search cache write failed: {str(e)}")
+        return results
+
+    def _load_wait_timeouts(self):
+        """Per-step wait maximums from config.WAIT_TIMEOUTS (missing steps use defaults)."""
+        return dict(self._config_value('WAIT_TIMEOUTS', {}) or {})
         
     def _setup_driver(self, headless):
         """Configure Chrome WebDriver."""
@@ -45,121 +591,264 @@ class OTACrawler:
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-        # Allow persistent user profile if configured
+        # Allow persistent user profile if configured (primary crawler only)
         try:
             import config as _cfg
-            if getattr(_cfg, 'CHROME_USER_DATA_DIR', ''):
+            if self.worker_id is None and getattr(_cfg, 'CHROME_USER_DATA_DIR', ''):
                 chrome_options.add_argument(f"--user-data-dir={getattr(_cfg, 'CHROME_USER_DATA_DIR')}")
         except Exception:
             pass
         
+        if self.lean:
+            self._apply_lean_options(chrome_options)
+        if self.capture or self._recorder is not None:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
         # ✨ 让 Selenium 自动处理 ChromeDriver（Selenium 4.6+）
         print("Setting up ChromeDriver...")
         driver = webdriver.Chrome(options=chrome_options)
-        driver.maximize_window()
+        if self.lean:
+            self._block_lean_urls(driver)
+        else:
+            driver.maximize_window()
+        if self.capture or self._recorder is not None:
+            try:
+                # Keeps response bodies available to Network.getResponseBody
+                driver.execute_cdp_cmd('Network.enable', {})
+            except Exception as e:
+                print(f"⚠ Could not enable network capture: {e}")
         print("✓ ChromeDriver ready!")
         return driver
+
+    def _lean_blocked_types(self):
+        return [t for t in self._config_value('LEAN_BLOCKED_RESOURCE_TYPES', LEAN_DEFAULT_BLOCKED_TYPES) or ()]
+
+    def _apply_lean_options(self, chrome_options):
+        """Eager page loads, fixed small window and fewer background Chrome features."""
+        chrome_options.page_load_strategy = 'eager'
+        width, height = self._config_value('LEAN_WINDOW_SIZE', LEAN_DEFAULT_WINDOW_SIZE) or LEAN_DEFAULT_WINDOW_SIZE
+        chrome_options.add_argument(f'--window-size={width},{height}')
+        for arg in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        if 'image' in self._lean_blocked_types():
+            # Also skip image decoding for images the URL patterns miss (e.g. extensionless CDN URLs)
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    def _block_lean_urls(self, driver):
+        """Block configured resource types and URL patterns through DevTools network blocking."""
+        patterns = []
+        for resource_type in self._lean_blocked_types():
+            patterns.extend(LEAN_RESOURCE_PATTERNS.get(resource_type, []))
+        patterns.extend(self._config_value('LEAN_BLOCKED_URL_PATTERNS', ()) or ())
+        if not patterns:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except Exception as e:
+            print(f"⚠ Could not enable network blocking: {e}")
+
+    def export_cookies(self):
+        """Return all browser cookies (every domain) in DevTools format."""
+        try:
+            return self.driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception:
+            # Only cookies of the current document are reachable without DevTools
+            return self.driver.get_cookies()
+
+    def import_cookies(self, cookies):
+        """
+        Load cookies produced by export_cookies() into this browser, e.g. to
+        share a logged-in session with pooled workers.
+        """
+        if self._http is not None:
+            self._http.load_cookies(cookies)
+        if self._driver is None:
+            # Browser not started yet (HTTP backend): apply when it starts
+            self._pending_cookies = list(cookies or [])
+            return len(self._pending_cookies)
+        allowed = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+        params = []
+        for cookie in cookies or []:
+            param = {k: v for k, v in cookie.items() if k in allowed}
+            if 'expiry' in cookie and 'expires' not in param:
+                param['expires'] = cookie['expiry']
+            if param.get('expires', 0) is None or param.get('expires', 0) < 0:
+                param.pop('expires', None)
+            params.append(param)
+        if not params:
+            return 0
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+            return len(params)
+        except Exception as e:
+            print(f"Failed to import cookies: {str(e)}")
+            return 0
     
+    def save_session_snapshot(self, provider):
+        """Save cookies and the current origin's localStorage so the next start can skip login."""
+        try:
+            import config as _cfg
+            from session_store import save_snapshot, session_dir_from_config
+            local_storage = {}
+            origin = self.driver.execute_script("return location.origin")
+            if origin and origin.startswith('http'):
+                local_storage[origin] = self.driver.execute_script(_READ_LOCAL_STORAGE_JS) or {}
+            path = save_snapshot(session_dir_from_config(_cfg), provider, {
+                'cookies': self.export_cookies(),
+                'local_storage': local_storage,
+            })
+            print(f"Session snapshot saved: {path}")
+            return True
+        except Exception as e:
+            print(f"Failed to save session snapshot: {str(e)}")
+            return False
+
+    def restore_session_snapshot(self, provider):
+        """
+        Load a saved session snapshot without navigating. Cookies are set through
+        DevTools; localStorage is re-applied by a script on the next page load of
+        each saved origin. Returns True if a snapshot was restored.
+        """
+        try:
+            import config as _cfg
+            from session_store import load_snapshot, session_dir_from_config
+            snapshot = load_snapshot(
+                session_dir_from_config(_cfg), provider,
+                max_age_seconds=self._config_value('SESSION_SNAPSHOT_MAX_AGE_SECONDS', None),
+            )
+            if not snapshot:
+                return False
+            self.import_cookies(snapshot['cookies'])
+            if snapshot.get('local_storage') and self._driver is not None:
+                self._driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                    'source': _RESTORE_LOCAL_STORAGE_JS % json.dumps(snapshot['local_storage']),
+                })
+            print(f"Restored {provider} session snapshot ({len(snapshot['cookies'])} cookies)")
+            return True
+        except Exception as e:
+            print(f"Failed to restore session snapshot: {str(e)}")
+            return False
+
+    @_recorded
     def login_booking(self, email, password, selectors=None):
         """
         Log into Booking.com account.
         """
-        try:
-            self.driver.get((selectors or {}).get('login_page_url', 'https://account.booking.com/sign-in'))
-            time.sleep(2)
-            self._handle_popups()
+        with span('booking.login') as login_span:
+            try:
+                self._navigate((selectors or {}).get('login_page_url', 'https://account.booking.com/sign-in'))
+                self._handle_popups('booking')
 
-            email_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, (selectors or {}).get('email_input', 'input[type="email"]')))
-            )
-            email_input.clear()
-            email_input.send_keys(email)
+                with span('email_step'):
+                    email_input = self.wait.until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, (selectors or {}).get('email_input', 'input[type="email"]')))
+                    )
+                    email_input.clear()
+                    email_input.send_keys(email)
 
-            cont_btn = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, (selectors or {}).get('continue_button', 'button[type="submit"]')))
-            )
-            cont_btn.click()
-            time.sleep(1.5)
+                    cont_btn = self.wait.until(
+                        EC.element_to_be_clickable((By.CSS_SELECTOR, (selectors or {}).get('continue_button', 'button[type="submit"]')))
+                    )
+                    cont_btn.click()
 
-            pwd_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, (selectors or {}).get('password_input', 'input[type="password"]')))
-            )
-            pwd_input.clear()
-            pwd_input.send_keys(password)
+                with span('password_step'):
+                    pwd_input = self.waits.element((selectors or {}).get('password_input', 'input[type="password"]'), step='login_step')
+                    if pwd_input is None:
+                        raise TimeoutException("Password step did not appear")
+                    pwd_input.clear()
+                    pwd_input.send_keys(password)
 
-            submit_btn = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, (selectors or {}).get('continue_button', 'button[type="submit"]')))
-            )
-            submit_btn.click()
-            time.sleep(3)
-            return True
-        except Exception as e:
-            print(f"Booking login failed: {str(e)}")
-            self._take_screenshot("booking_login_error")
-            return False
+                    submit_btn = self.wait.until(
+                        EC.element_to_be_clickable((By.CSS_SELECTOR, (selectors or {}).get('continue_button', 'button[type="submit"]')))
+                    )
+
+                with span('redirect') as redirect_span:
+                    sign_in_url = self.driver.current_url
+                    submit_btn.click()
+                    if not self.waits.url_changes(sign_in_url):
+                        redirect_span.fail()
+                return True
+            except Exception as e:
+                login_span.fail()
+                print(f"Booking login failed: {str(e)}")
+                self._take_screenshot("booking_login_error")
+                return False
 
+    @_recorded
     def is_booking_logged_in(self, selectors=None):
         """Return True if the current session appears logged in to Booking.com."""
-        try:
-            reservations_url = (selectors or {}).get('reservations_page_url', 'https://secure.booking.com/myreservations.html')
-            trips_url = (selectors or {}).get('trips_page_url', 'https://secure.booking.com/mytrips.html')
+        with span('booking.logged_in_check'):
+            try:
+                reservations_url = (selectors or {}).get('reservations_page_url', 'https://secure.booking.com/myreservations.html')
+                trips_url = (selectors or {}).get('trips_page_url', 'https://secure.booking.com/mytrips.html')
+
+                def find_cards_on_current_page():
+                    css_candidates = [
+                        (selectors or {}).get('reservation_card', '[data-testid="booking-card"]'),
+                        (selectors or {}).get('reservation_card_alt', '[data-testid*="booking"]'),
+                    ]
+                    for css in css_candidates:
+                        try:
+                            found = self.driver.find_elements(By.CSS_SELECTOR, css)
+                            if found:
+                                return found
+                        except Exception:
+                            continue
+                    return []
 
-            def find_cards_on_current_page():
-                css_candidates = [
+                # Any of these means the page has decided between "logged in" and "sign in"
+                decisive = [
                     (selectors or {}).get('reservation_card', '[data-testid="booking-card"]'),
                     (selectors or {}).get('reservation_card_alt', '[data-testid*="booking"]'),
+                    (selectors or {}).get('email_input', 'input[type="email"]'),
+                    (selectors or {}).get('password_input', 'input[type="password"]'),
+                    '[data-testid="header-myaccount-menu"]',
                 ]
-                for css in css_candidates:
-                    try:
-                        found = self.driver.find_elements(By.CSS_SELECTOR, css)
-                        if found:
-                            return found
-                    except Exception:
-                        continue
-                return []
-
-            cards = []
-            for url in (reservations_url, trips_url):
-                self.driver.get(url)
-                time.sleep(3)
-                self._handle_popups()
-                cards = find_cards_on_current_page()
-                if cards:
-                    break
 
-            # If reservation cards are present, we are logged in
-            if len(cards) > 0:
-                return True
+                cards = []
+                for url in (reservations_url, trips_url):
+                    self._navigate(url)
+                    self.waits.any_element(decisive, step='page_load')
+                    self._handle_popups('booking')
+                    cards = find_cards_on_current_page()
+                    if cards:
+                        break
 
-            # If login form is visible, not logged in
-            email_inputs = self.driver.find_elements(By.CSS_SELECTOR, (selectors or {}).get('email_input', 'input[type="email"]'))
-            pwd_inputs = self.driver.find_elements(By.CSS_SELECTOR, (selectors or {}).get('password_input', 'input[type="password"]'))
-            if email_inputs or pwd_inputs:
-                return False
+                # If reservation cards are present, we are logged in
+                if len(cards) > 0:
+                    return True
 
-            # Heuristic: presence of account menu might indicate logged-in
-            try:
-                self.driver.find_element(By.CSS_SELECTOR, '[data-testid="header-myaccount-menu"]')
-                return True
-            except Exception:
-                pass
+                # If login form is visible, not logged in
+                email_inputs = self.driver.find_elements(By.CSS_SELECTOR, (selectors or {}).get('email_input', 'input[type="email"]'))
+                pwd_inputs = self.driver.find_elements(By.CSS_SELECTOR, (selectors or {}).get('password_input', 'input[type="password"]'))
+                if email_inputs or pwd_inputs:
+                    return False
 
-            # Try trips page as alternative
-            trips_url = (selectors or {}).get('trips_page_url', 'https://secure.booking.com/mytrips.html')
-            self.driver.get(trips_url)
-            time.sleep(2)
-            self._handle_popups()
-            # If account menu is visible on trips page, treat as logged in
-            try:
-                self.driver.find_element(By.CSS_SELECTOR, '[data-testid="header-myaccount-menu"]')
-                return True
-            except Exception:
-                pass
+                # Heuristic: presence of account menu might indicate logged-in
+                try:
+                    self.driver.find_element(By.CSS_SELECTOR, '[data-testid="header-myaccount-menu"]')
+                    return True
+                except Exception:
+                    pass
 
-        except Exception as e:
-            print(f"Error detecting login status: {str(e)}")
-        return False
+                # Try trips page as alternative
+                trips_url = (selectors or {}).get('trips_page_url', 'https://secure.booking.com/mytrips.html')
+                self._navigate(trips_url)
+                self.waits.element('[data-testid="header-myaccount-menu"]', step='page_load')
+                self._handle_popups('booking')
+                # If account menu is visible on trips page, treat as logged in
+                try:
+                    self.driver.find_element(By.CSS_SELECTOR, '[data-testid="header-myaccount-menu"]')
+                    return True
+                except Exception:
+                    pass
+
+            except Exception as e:
+                print(f"Error detecting login status: {str(e)}")
+            return False
 
+    @_recorded
     def is_booking_logged_in_light(self, selectors=None):
         """
         Lightweight login check: do NOT navigate or refresh.
@@ -202,69 +891,96 @@ class OTACrawler:
             print(f"Light login check error: {str(e)}")
         return False
 
+    @_recorded
     def fetch_booking_reservations(self, selectors=None):
         """
         Fetch reservations from Booking.com 'My Reservations' page.
         Returns a list of dictionaries per reservation.
         """
-        results = []
-        try:
-            self.driver.get((selectors or {}).get('reservations_page_url', 'https://secure.booking.com/myreservations.html'))
-            time.sleep(3)
-            self._handle_popups()
+        with span('booking.reservations') as reservations_span:
+            results = []
+            try:
+                card_css = (selectors or {}).get('reservation_card', '[data-testid="booking-card"]')
+                self._navigate((selectors or {}).get('reservations_page_url', 'https://secure.booking.com/myreservations.html'))
+                self._handle_popups('booking')
+                captured = self._captured_records('booking', 'reservations')
+                if captured is not None:
+                    print(f"Found {len(captured)} reservations (network)")
+                    return [self._build_reservation_record(texts) for texts in captured]
+                with span('results_wait') as wait_span:
+                    if self.waits.element(card_css, step='results'):
+                        self.waits.count_stable(card_css)
+                    else:
+                        wait_span.fail()
+                self._record_page('reservations')
 
-            cards = self.driver.find_elements(
-                By.CSS_SELECTOR,
-                (selectors or {}).get('reservation_card', '[data-testid="booking-card"]')
-            )
-            print(f"Found {len(cards)} reservations")
+                fields = self._reservation_field_selectors(selectors or {})
+                count, records = self._bulk_extract(card_css, fields)
+                print(f"Found {count} reservations")
 
-            for idx, card in enumerate(cards):
-                try:
-                    res = self._parse_booking_reservation_card(card, selectors or {})
-                    results.append(res)
-                except Exception as e:
-                    print(f"Failed to parse reservation card {idx}: {str(e)}")
-                    continue
+                with span('parse') as parse_span:
+                    for idx, texts in enumerate(records):
+                        try:
+                            results.append(self._build_reservation_record(texts))
+                        except Exception as e:
+                            parse_span.fail()
+                            print(f"Failed to parse reservation card {idx}: {str(e)}")
+                            continue
 
-        except Exception as e:
-            print(f"Error fetching reservations: {str(e)}")
-            self._take_screenshot("reservations_error")
+            except Exception as e:
+                reservations_span.fail()
+                print(f"Error fetching reservations: {str(e)}")
+                self._take_screenshot("reservations_error")
 
-        return results
+            return results
+
+    def _bulk_extract(self, card_css, fields, limit=None, root=None, start=0):
+        """
+        Read `fields` ({key: css}) from every card matching `card_css` (from index
+        `start`) with one execute_script call.
+        Returns (total card count, list of {key: text or None}).
+        """
+        with span('extract'):
+            data = self.driver.execute_script(_BULK_EXTRACT_JS, root, card_css, fields, limit, start) or {}
+        return data.get('count', 0), data.get('records', [])
+
+    def _reservation_field_selectors(self, selectors):
+        return {key: selectors.get(sel_key, default) for key, (sel_key, default) in BOOKING_RESERVATION_FIELDS.items()}
 
     def _parse_booking_reservation_card(self, card, selectors):
         """Parse a single reservation card element into structured data."""
-        def text_or_default(css, default="N/A"):
-            try:
-                return card.find_element(By.CSS_SELECTOR, css).text.strip()
-            except Exception:
-                return default
+        _, records = self._bulk_extract(None, self._reservation_field_selectors(selectors), root=card)
+        return self._build_reservation_record(records[0] if records else {})
+
+    def _build_reservation_record(self, texts):
+        """Turn the raw field texts of one reservation card into a reservation dict."""
+        def text_or_default(key, default="N/A"):
+            value = texts.get(key)
+            return value if value is not None else default
 
-        hotel_name = text_or_default(selectors.get('hotel_name', '[data-testid="property-name"]'))
-        room_type = text_or_default(selectors.get('room_type', '[data-testid="room-type"]'))
-        date_range = text_or_default(selectors.get('date_range', '[data-testid="stay-dates"]'))
-        price_total = text_or_default(selectors.get('price_total', '[data-testid="total-price"]'))
-        cancellation_policy = text_or_default(selectors.get('cancellation_policy', '[data-testid="cancellation-policy"]'))
-        reservation_status = text_or_default(selectors.get('reservation_status', '[data-testid="reservation-status"]'))
+        hotel_name = text_or_default('hotel_name')
+        room_type = text_or_default('room_type')
+        location = text_or_default('location')
+        date_range = text_or_default('date_range')
+        price_total = text_or_default('price_total')
+        cancellation_policy = text_or_default('cancellation_policy')
+        reservation_status = text_or_default('status')
 
-        check_in = ""
-        check_out = ""
-        m = re.findall(r"(\d{1,2}\s\w+\s\d{4})", date_range)
-        if len(m) >= 2:
-            check_in, check_out = m[0], m[1]
+        # ISO dates, so they can be passed straight to search_booking_com
+        check_in, check_out = parse_stay_dates(date_range, self._config_value('PARSE_LOCALE', None))
 
         is_cancellable = False
         cancellable_until = ""
         if cancellation_policy and ('free cancellation' in cancellation_policy.lower() or '取消' in cancellation_policy):
             is_cancellable = True
-            m2 = re.search(r"until\s+([^.,;]+)", cancellation_policy, re.IGNORECASE)
+            m2 = _CANCELLABLE_UNTIL_RE.search(cancellation_policy)
             if m2:
                 cancellable_until = m2.group(1).strip()
 
         return {
             'hotel_name': hotel_name,
             'room_type': room_type,
+            'location': location,
             'date_range': date_range,
             'check_in': check_in,
             'check_out': check_out,
@@ -275,7 +991,9 @@ class OTACrawler:
             'status': reservation_status,
         }
     
-    def search_booking_com(self, destination, check_in, check_out, adults=2, rooms=1):
+    @_recorded
+    def search_booking_com(self, destination, check_in, check_out, adults=2, rooms=1, children=0, mode=None, use_cache=True,
+                           max_results=None, stop=None, stop_key=None):
         """
         Search for available rooms on Booking.com
         
@@ -285,122 +1003,405 @@ class OTACrawler:
             check_out (str): Check-out date in format 'YYYY-MM-DD'
             adults (int): Number of adults
             rooms (int): Number of rooms
+            children (int): Number of children
+            mode (str): 'url' opens the results URL directly, 'form' fills the
+                homepage search form. Defaults to config.BOOKING_SEARCH_MODE.
+                URL mode falls back to the form when it finds no results.
+                Searches with children always use the URL (the form would
+                need every child's age).
+            use_cache (bool): Consult the search cache first (False bypasses it)
+            max_results (int): Stop after this many results, following "load more"
+                and pagination as needed. Defaults to config.SEARCH_MAX_RESULTS.
+            stop (callable): stop(result) -> bool; stop right after a result
+                for which it returns True (e.g. the hotel being looked for)
+            stop_key (str): Identifies `stop` (e.g. the hotel name). Results of a
+                search it ended early are cached under this key, so the next
+                search for the same hotel is served from the cache.
             
         Returns:
             list: List of available rooms with details
         """
         print(f"Searching Booking.com for {destination}")
         print(f"Check-in: {check_in}, Check-out: {check_out}")
+        self.last_search_error = None
+        max_results = self._max_results(max_results)
+        key = self._booking_cache_key(destination, check_in, check_out, adults, rooms, children, max_results)
+        stop, stopped = self._tracking_stop(stop)
+        with span('booking.search'):
+            return self._cached_search(
+                key, 'booking',
+                lambda: self._search_booking_uncached(destination, check_in, check_out, adults, rooms, children, mode, max_results, stop),
+                use_cache,
+                cacheable=lambda: not stopped['early'],
+                partial_key=self._stop_cache_key(key, stop, stop_key),
+            )
+    
+    @_recorded
+    def search_booking_flexible(self, destination, check_in, check_out, days_around=3, stay_lengths=None,
+                                adults=2, rooms=1, children=0, max_results=None, use_cache=True):
+        """
+        Search a range of stays around a base date range on Booking.com.
+        
+        The first uncached stay runs a normal search. Every further stay opens
+        the results URL that search ended on with only its check-in/check-out
+        parameters changed. That skips the homepage and form flow, but it is
+        still one results-page load per stay, about the cost of a URL-mode
+        search. Identical stays are searched once, and cached stays are not
+        searched at all.
+        
+        Args:
+            destination (str): City or hotel name to search
+            check_in (str): Base check-in date in format 'YYYY-MM-DD'
+            check_out (str): Base check-out date in format 'YYYY-MM-DD'
+            days_around (int): Also try check-ins up to N days before/after
+            stay_lengths (list): Nights per stay, e.g. [2, 3, 4] (default: base length)
+            adults (int): Number of adults
+            rooms (int): Number of rooms
+            children (int): Number of children
+            max_results (int): Results per stay. Defaults to config.SEARCH_MAX_RESULTS.
+            use_cache (bool): Consult the search cache first (False bypasses it)
+            
+        Returns:
+            dict: Stay x property price matrix, see price_matrix()
+        """
+        self.last_search_error = None
+        max_results = self._max_results(max_results)
+        stays = flexible_stays(check_in, check_out, days_around, stay_lengths)
+        print(f"Flexible search for {destination}: {len(stays)} stays")
+        results_by_stay = {}
+        page = {'url': None}
+        
+        for stay_in, stay_out in stays:
+            def search(stay_in=stay_in, stay_out=stay_out):
+                print(f"Check-in: {stay_in}, Check-out: {stay_out}")
+                if page['url'] is None:
+                    results = self._search_booking_uncached(destination, stay_in, stay_out, adults, rooms, children, None, max_results)
+                    # Results page the browser ended up on (None when the HTTP backend answered)
+                    if self._driver is not None and 'searchresults' in (self._driver.current_url or ''):
+                        page['url'] = self._driver.current_url
+                    return results
+                try:
+                    return self._open_booking_results(with_stay_dates(page['url'], stay_in, stay_out), max_results)
+                except RateLimitError as e:
+                    # Every further stay would be refused too
+                    self.last_search_error = str(e)
+                    raise
+                except Exception as e:
+                    print(f"Error during search: {str(e)}")
+                    self.last_search_error = str(e)
+                    return []
+            
+            key = self._booking_cache_key(destination, stay_in, stay_out, adults, rooms, children, max_results)
+            results_by_stay[(stay_in, stay_out)] = self._cached_search(key, 'booking', search, use_cache)
+        
+        return price_matrix(results_by_stay, self._config_value('PARSE_LOCALE', None))
+    
+    def _booking_cache_key(self, destination, check_in, check_out, adults, rooms, children, max_results):
+        key = make_cache_key('booking', destination, check_in, check_out, adults, rooms)
+        if children:
+            key += f"|children={int(children)}"
+        if max_results is not None:
+            key += f"|max={max_results}"
+        return key
+    
+    def _stop_cache_key(self, key, stop, stop_key):
+        """Cache key for results of a search that `stop` ended early (None: do not cache them)."""
+        if stop is None or not stop_key:
+            return None
+        return f"{key}|stop={str(stop_key).strip().lower()}"
+    
+    def _max_results(self, max_results):
+        if max_results is None:
+            max_results = self._config_value('SEARCH_MAX_RESULTS', None)
+        return int(max_results) if max_results else None
+    
+    def _tracking_stop(self, stop):
+        """Wrap a stop predicate so callers can tell whether it ended a search early."""
+        stopped = {'early': False}
+        if stop is None:
+            return None, stopped
+        
+        def tracked(item):
+            if stop(item):
+                stopped['early'] = True
+                return True
+            return False
+        
+        return tracked, stopped
+    
+    def _search_booking_uncached(self, destination, check_in, check_out, adults, rooms, children, mode, max_results=None, stop=None):
+        mode = self._booking_search_mode(mode, children)
         
         try:
-            # Navigate to Booking.com
-            self.driver.get("https://www.booking.com")
-            time.sleep(2)
+            if self.backend == 'http':
+                results = self._search_booking_http(destination, check_in, check_out, adults, rooms, children, max_results, stop)
+                if results:
+                    return results
+                print("No listings in server-rendered HTML, using the browser")
+            
+            if mode == 'url':
+                results = self._search_booking_by_url(destination, check_in, check_out, adults, rooms, children, max_results, stop)
+                if results or children:
+                    if not results:
+                        print("Direct URL search found nothing (no form fallback with children)")
+                    return results
+                print("Direct URL search found nothing, falling back to the search form")
             
-            # Close any popup/cookie banner
-            self._handle_popups()
+            return self._search_booking_by_form(destination, check_in, check_out, adults, rooms, max_results, stop)
             
+        except RateLimitError as e:
+            # The domain is paused: no result, but not an empty one either
+            self.last_search_error = str(e)
+            raise
+        except Exception as e:
+            incr('booking.search.errors')
+            print(f"Error during search: {str(e)}")
+            self.last_search_error = str(e)
+            self._take_screenshot("error_screenshot")
+            return []
+    
+    def _booking_search_mode(self, mode, children):
+        """
+        'url' or 'form'. A search with children always uses the results URL: the
+        form cannot set the same occupancy (it asks for every child's age).
+        """
+        mode = (mode or self._config_value('BOOKING_SEARCH_MODE', 'url') or 'url').lower()
+        if mode == 'form' and children:
+            print("Searching by URL: the search form cannot be used with children")
+            return 'url'
+        return mode
+    
+    def _search_booking_http(self, destination, check_in, check_out, adults, rooms, children, max_results=None, stop=None):
+        """Fetch and parse search-results pages without a browser."""
+        results = []
+        try:
+            url = build_booking_search_url(destination, check_in, check_out, adults, rooms, children)
+            with span('http_fetch'):
+                for item in self._iter_http_pages(url, BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS, 'offset'):
+                    results.append(item)
+                    if max_results is not None and len(results) >= max_results:
+                        break
+                    if stop is not None and stop(item):
+                        break
+            print(f"Found {len(results)} properties (HTTP)")
+        except RateLimitError:
+            raise  # the browser would hit the same paused domain
+        except Exception as e:
+            print(f"HTTP backend error: {str(e)}")
+        return results
+    
+    def _iter_http_pages(self, url, card_css, fields, offset_param=None):
+        """
+        Yield cards from a results URL over HTTP. With `offset_param`, further pages
+        are requested as url&<offset_param>=<cards seen so far> until a page is empty.
+        """
+        backend = self._http_backend()
+        max_pages = int(self._config_value('SEARCH_MAX_PAGES', 20) or 1)
+        offset = 0
+        for _ in range(max_pages if offset_param else 1):
+            page_url = url if not offset else f"{url}&{urlencode({offset_param: offset})}"
+            if self._replay is not None:
+                page_url = self._replay.rewrite(page_url)
+            with get_limiter().request(page_url) as slot:
+                page_html = backend.fetch(page_url)
+                if page_html is None:
+                    slot.fail()
+            if self._recorder is not None and page_html is not None:
+                self._recorder.page(page_url, page_html, step='http_fetch')
+            _, records = backend.extract(page_html, card_css, fields)
+            if not records:
+                return
+            for record in records:
+                yield {key: (value if value is not None else "N/A") for key, value in record.items()}
+            offset += len(records)
+    
+    def _search_booking_by_url(self, destination, check_in, check_out, adults, rooms, children, max_results=None, stop=None):
+        """Open the search-results page directly with all parameters in the URL."""
+        return self._open_booking_results(
+            build_booking_search_url(destination, check_in, check_out, adults, rooms, children), max_results, stop)
+    
+    def _open_booking_results(self, url, max_results=None, stop=None):
+        """Load a Booking.com results URL in the browser and extract its cards."""
+        self._navigate(url)
+        self._handle_popups('booking')
+        
+        print("Waiting for search results...")
+        return self._extract_results_booking(max_results, stop)
+    
+    def _search_booking_by_form(self, destination, check_in, check_out, adults, rooms, max_results=None, stop=None):
+        """Search through the homepage form (destination, calendar, occupancy)."""
+        self._submit_booking_form(destination, check_in, check_out, adults, rooms)
+        
+        print("Waiting for search results...")
+        
+        # Extract room results
+        return self._extract_results_booking(max_results, stop)
+    
+    def _submit_booking_form(self, destination, check_in, check_out, adults, rooms):
+        """Fill in and submit the homepage search form; the results page loads next."""
+        # Navigate to Booking.com
+        self._navigate("https://www.booking.com")
+        
+        # Close any popup/cookie banner
+        self._handle_popups('booking')
+        
+        with span('autocomplete') as autocomplete_span:
             # Enter destination
             destination_input = self.wait.until(
                 EC.presence_of_element_located((By.NAME, "ss"))
             )
             destination_input.clear()
             destination_input.send_keys(destination)
-            time.sleep(1)
             
             # Click first autocomplete suggestion
+            first_result = self.waits.clickable("li[data-i='0']", step='autocomplete')
             try:
-                first_result = self.wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "li[data-i='0']"))
-                )
+                if first_result is None:
+                    raise TimeoutException("No autocomplete suggestion")
                 first_result.click()
             except:
+                autocomplete_span.fail()
                 destination_input.send_keys(Keys.ENTER)
-            
-            time.sleep(1)
-            
-            # Select dates
+        
+        # Select dates
+        with span('dates'):
             self._select_dates_booking(check_in, check_out)
-            
-            # Configure guests and rooms
+        
+        # Configure guests and rooms
+        with span('occupancy'):
             self._configure_occupancy_booking(adults, rooms)
-            
-            # Click search button
+        
+        # Click search button (submitting loads the results page: rate limited like a navigation)
+        with span('submit'):
             search_button = self.wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
             )
-            search_button.click()
-            
-            print("Waiting for search results...")
-            time.sleep(5)
-            
-            # Extract room results
-            results = self._extract_results_booking()
-            
-            return results
-            
-        except Exception as e:
-            print(f"Error during search: {str(e)}")
-            self._take_screenshot("error_screenshot")
-            return []
+            with get_limiter().request(self.driver.current_url):
+                search_button.click()
     
-    def search_generic_ota(self, url, selectors, destination, check_in, check_out):
+    @_recorded
+    def search_generic_ota(self, url, selectors, destination, check_in, check_out, use_cache=True,
+                           max_results=None, stop=None, stop_key=None):
         """
         Generic search function for other OTA websites.
         
         Args:
-            url (str): OTA website URL
-            selectors (dict): CSS selectors for different elements
+            url (str): OTA website URL. A results-page template containing
+                {destination}, {check_in} and {check_out} skips the search form
+                (and is the only kind of URL the HTTP backend can handle).
+            selectors (dict): CSS selectors for different elements. Optional
+                'load_more' / 'next_page' selectors enable pagination.
             destination (str): Search destination
             check_in (str): Check-in date
             check_out (str): Check-out date
+            use_cache (bool): Consult the search cache first (False bypasses it)
+            max_results (int): Stop after this many results (default: config.SEARCH_MAX_RESULTS)
+            stop (callable): stop(result) -> bool; stop right after a matching result
+            stop_key (str): Identifies `stop`; results of a search it ended early
+                are cached under this key (see search_booking_com)
             
         Returns:
             list: Search results
         """
         print(f"Searching {url} for {destination}")
+        self.last_search_error = None
+        max_results = self._max_results(max_results)
+        provider = urlparse(url).netloc or url
+        key = make_cache_key(provider, destination, check_in, check_out, 0, 0)
+        if max_results is not None:
+            key += f"|max={max_results}"
+        stop, stopped = self._tracking_stop(stop)
+        with span('generic.search'):
+            return self._cached_search(
+                key, provider,
+                lambda: self._search_generic_uncached(url, selectors, destination, check_in, check_out, max_results, stop),
+                use_cache,
+                cacheable=lambda: not stopped['early'],
+                partial_key=self._stop_cache_key(key, stop, stop_key),
+            )
+    
+    def _generic_search_url(self, url, destination, check_in, check_out):
+        """(url, is_results_url): a results-page template filled in, other URLs unchanged."""
+        is_results_url = '{destination}' in url
+        if is_results_url:
+            url = url.format(
+                destination=quote_plus(destination),
+                check_in=quote_plus(check_in),
+                check_out=quote_plus(check_out),
+            )
+        return url, is_results_url
+    
+    def _search_generic_uncached(self, url, selectors, destination, check_in, check_out, max_results=None, stop=None):
+        url, is_results_url = self._generic_search_url(url, destination, check_in, check_out)
         
         try:
-            self.driver.get(url)
-            time.sleep(2)
-            
-            self._handle_popups()
-            
-            # Enter destination
-            if 'destination' in selectors:
-                dest_input = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selectors['destination']))
-                )
-                dest_input.clear()
-                dest_input.send_keys(destination)
-                time.sleep(1)
-            
-            # Handle dates (implementation depends on site structure)
-            # This is a template - customize based on specific OTA
-            
-            # Click search
-            if 'search_button' in selectors:
-                search_btn = self.wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selectors['search_button']))
-                )
-                search_btn.click()
+            if self.backend == 'http' and is_results_url and 'result_card' in selectors:
+                results = self._search_generic_http(url, selectors, max_results, stop)
+                if results:
+                    return results
+                print("No listings in server-rendered HTML, using the browser")
             
-            time.sleep(5)
+            self._open_generic_search(url, selectors, destination, is_results_url)
             
             # Extract results based on provided selectors
-            return self._extract_generic_results(selectors)
+            return self._extract_generic_results(selectors, max_results, stop)
             
+        except RateLimitError as e:
+            self.last_search_error = str(e)
+            raise
         except Exception as e:
             print(f"Error: {str(e)}")
+            self.last_search_error = str(e)
             return []
     
+    def _open_generic_search(self, url, selectors, destination, is_results_url):
+        """Open a generic OTA page; unless it is a results URL, fill in and submit its search form."""
+        self._navigate(url)
+        
+        self._handle_popups('custom')
+        
+        # Enter destination
+        if 'destination' in selectors and not is_results_url:
+            dest_input = self.wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selectors['destination']))
+            )
+            dest_input.clear()
+            dest_input.send_keys(destination)
+        
+        # Handle dates (implementation depends on site structure)
+        # This is a template - customize based on specific OTA
+        
+        # Click search
+        if 'search_button' in selectors and not is_results_url:
+            search_btn = self.wait.until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, selectors['search_button']))
+            )
+            with get_limiter().request(self.driver.current_url):
+                search_btn.click()
+    
+    def _search_generic_http(self, url, selectors, max_results=None, stop=None):
+        """Fetch and parse a generic OTA results page without a browser."""
+        results = []
+        try:
+            fields = {key: css for key, css in selectors.items() if key not in GENERIC_CONTROL_KEYS}
+            for item in self._iter_http_pages(url, selectors['result_card'], fields):
+                results.append(item)
+                if max_results is not None and len(results) >= max_results:
+                    break
+                if stop is not None and stop(item):
+                    break
+        except RateLimitError:
+            raise  # the browser would hit the same paused domain
+        except Exception as e:
+            print(f"HTTP backend error: {str(e)}")
+        return results
+    
     def _select_dates_booking(self, check_in, check_out):
         """Select check-in and check-out dates on Booking.com"""
         try:
             # Click on date input to open calendar
             date_button = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='date-display-field-start']")
             date_button.click()
-            time.sleep(1)
             
             # Parse dates
             checkin_date = datetime.strptime(check_in, '%Y-%m-%d')
@@ -408,150 +1409,438 @@ class OTACrawler:
             
             # Select check-in date
             checkin_selector = f"span[data-date='{check_in}']"
-            checkin_element = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, checkin_selector))
-            )
+            checkin_element = self.waits.clickable(checkin_selector, step='calendar')
+            if checkin_element is None:
+                raise TimeoutException(f"Calendar day {check_in} not available")
             checkin_element.click()
-            time.sleep(0.5)
             
             # Select check-out date
             checkout_selector = f"span[data-date='{check_out}']"
-            checkout_element = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, checkout_selector))
-            )
+            checkout_element = self.waits.clickable(checkout_selector, step='calendar')
+            if checkout_element is None:
+                raise TimeoutException(f"Calendar day {check_out} not available")
             checkout_element.click()
-            time.sleep(0.5)
             
         except Exception as e:
             print(f"Error selecting dates: {str(e)}")
     
     def _configure_occupancy_booking(self, adults, rooms):
-        """Configure number of adults and rooms on Booking.com"""
+        """
+        Configure number of adults and rooms on Booking.com.
+        
+        Raises when a count cannot be set, so the search fails instead of
+        returning prices for another occupancy than the URL search would.
+        """
+        # Click occupancy selector
+        occupancy_button = self.driver.find_element(
+            By.CSS_SELECTOR, "[data-testid='occupancy-config']"
+        )
+        occupancy_button.click()
+        
+        for key, target in (('adults', adults), ('rooms', rooms)):
+            self._set_occupancy_count(BOOKING_OCCUPANCY_INPUTS[key], int(target))
+    
+    def _set_occupancy_count(self, input_id, target):
+        """Click the -/+ buttons next to an occupancy input until its value is `target`."""
+        field = self.driver.find_element(By.ID, input_id)
+        buttons = field.find_element(By.XPATH, '..').find_elements(By.TAG_NAME, 'button')
+        if len(buttons) < 2:
+            raise NoSuchElementException(f"No -/+ buttons next to #{input_id}")
+        decrease, increase = buttons[0], buttons[-1]
+        
+        current = int(field.get_attribute('value') or 0)
+        while current != target:
+            (increase if current < target else decrease).click()
+            value = int(field.get_attribute('value') or 0)
+            if value == current:
+                raise ValueError(f"Cannot set #{input_id} to {target}, it stays at {current}")
+            current = value
+    
+    def _extract_results_booking(self, max_results=None, stop=None):
+        """
+        Extract hotel results from Booking.com search results page.
+        In capture mode the data response provides the first page; further
+        results are read from the page (skipping the captured properties).
+        """
+        results = []
+        
+        def done(item):
+            return (max_results is not None and len(results) >= max_results) or (stop is not None and stop(item))
+        
+        with span('results') as results_span:
+            try:
+                captured_names = set()
+                for record in self._captured_records('booking', 'search') or []:
+                    item = {key: (value if value is not None else "N/A") for key, value in record.items()}
+                    results.append(item)
+                    captured_names.add(item['name'].strip().lower())
+                    if done(item):
+                        print(f"Extracted {len(results)} properties (network)")
+                        return results
+                if captured_names:
+                    print(f"Extracted {len(results)} properties (network), reading more from the page")
+                for item in self.iter_booking_results():
+                    if captured_names and (item.get('name') or '').strip().lower() in captured_names:
+                        continue
+                    results.append(item)
+                    if done(item):
+                        break
+                print(f"Extracted {len(results)} properties")
+                self._record_page('results')
+            except RateLimitError:
+                raise
+            except Exception as e:
+                results_span.fail()
+                print(f"Error extracting results: {str(e)}")
+        
+        return results
+    
+    def _extract_generic_results(self, selectors, max_results=None, stop=None):
+        """Extract results using custom selectors"""
+        results = []
+        
         try:
-            # Click occupancy selector
-            occupancy_button = self.driver.find_element(
-                By.CSS_SELECTOR, "[data-testid='occupancy-config']"
-            )
-            occupancy_button.click()
-            time.sleep(1)
-            
-            # This is a simplified version - actual implementation may need
-            # to handle adding/removing adults and rooms with +/- buttons
-            
-            time.sleep(0.5)
-            
+            for item in self.iter_generic_results(selectors, max_results, stop):
+                results.append(item)
+            self._record_page('results')
+        except RateLimitError:
+            raise
         except Exception as e:
-            print(f"Error configuring occupancy: {str(e)}")
+            print(f"Error extracting generic results: {str(e)}")
+        
+        return results
     
-    def _extract_results_booking(self):
-        """Extract hotel results from Booking.com search results page"""
-        results = []
+    @_recorded
+    def iter_booking_search(self, destination, check_in, check_out, adults=2, rooms=1, children=0, mode=None,
+                            max_results=None):
+        """
+        Run a Booking.com search and yield its results batch by batch as they are
+        read, without collecting them (e.g. to stream a large search to an NDJSON
+        sink). Backends and the URL-to-form fallback are those of
+        search_booking_com; the search cache and network capture are not used.
+        An error ends the iteration and is left in last_search_error, except
+        RateLimitError, which is raised.
         
+        Args:
+            destination (str): City or hotel name to search
+            check_in (str): Check-in date in format 'YYYY-MM-DD'
+            check_out (str): Check-out date in format 'YYYY-MM-DD'
+            adults (int): Number of adults
+            rooms (int): Number of rooms
+            children (int): Number of children
+            mode (str): 'url' or 'form', see search_booking_com
+            max_results (int): Stop after this many results. Defaults to config.SEARCH_MAX_RESULTS.
+            
+        Yields:
+            dict: One search result
+        """
+        print(f"Searching Booking.com for {destination}")
+        print(f"Check-in: {check_in}, Check-out: {check_out}")
+        self.last_search_error = None
+        max_results = self._max_results(max_results)
+        mode = self._booking_search_mode(mode, children)
+        url = build_booking_search_url(destination, check_in, check_out, adults, rooms, children)
+        yielded = 0
         try:
-            # Wait for results to load
-            self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='property-card']"))
-            )
+            if self.backend == 'http':
+                for item in self._iter_http_search(url, BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS, 'offset', max_results):
+                    yielded += 1
+                    yield item
+                if yielded:
+                    return
+                print("No listings in server-rendered HTML, using the browser")
             
-            # Find all property cards
-            property_cards = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='property-card']")
+            if mode == 'url':
+                self._navigate(url)
+                self._handle_popups('booking')
+                for item in self.iter_booking_results(max_results):
+                    yielded += 1
+                    yield item
+                if yielded or children:
+                    if not yielded:
+                        print("Direct URL search found nothing (no form fallback with children)")
+                    return
+                print("Direct URL search found nothing, falling back to the search form")
             
-            print(f"Found {len(property_cards)} properties")
+            self._submit_booking_form(destination, check_in, check_out, adults, rooms)
+            yield from self.iter_booking_results(max_results)
+        except RateLimitError as e:
+            self.last_search_error = str(e)
+            raise
+        except Exception as e:
+            incr('booking.search.errors')
+            print(f"Error during search: {str(e)}")
+            self.last_search_error = str(e)
+            self._take_screenshot("error_screenshot")
+    
+    @_recorded
+    def iter_generic_search(self, url, selectors, destination, check_in, check_out, max_results=None):
+        """
+        search_generic_ota yielding its results batch by batch as they are read,
+        without collecting them; see iter_booking_search.
+        
+        Args:
+            url (str): OTA website URL or results-page template, see search_generic_ota
+            selectors (dict): CSS selectors, see search_generic_ota
+            destination (str): Search destination
+            check_in (str): Check-in date
+            check_out (str): Check-out date
+            max_results (int): Stop after this many results (default: config.SEARCH_MAX_RESULTS)
             
-            for idx, card in enumerate(property_cards[:10]):  # Limit to first 10
-                try:
-                    result = {}
-                    
-                    # Extract hotel name
-                    try:
-                        name_element = card.find_element(By.CSS_SELECTOR, "[data-testid='title']")
-                        result['name'] = name_element.text
-                    except:
-                        result['name'] = "N/A"
-                    
-                    # Extract price
-                    try:
-                        price_element = card.find_element(By.CSS_SELECTOR, "[data-testid='price-and-discounted-price']")
-                        result['price'] = price_element.text
-                    except:
-                        result['price'] = "N/A"
-                    
-                    # Extract rating
-                    try:
-                        rating_element = card.find_element(By.CSS_SELECTOR, "[data-testid='review-score']")
-                        result['rating'] = rating_element.text
-                    except:
-                        result['rating'] = "N/A"
-                    
-                    # Extract location
-                    try:
-                        location_element = card.find_element(By.CSS_SELECTOR, "[data-testid='address']")
-                        result['location'] = location_element.text
-                    except:
-                        result['location'] = "N/A"
-                    
-                    results.append(result)
-                    
-                except Exception as e:
-                    print(f"Error extracting data from card {idx}: {str(e)}")
-                    continue
+        Yields:
+            dict: One search result
+        """
+        print(f"Searching {url} for {destination}")
+        self.last_search_error = None
+        max_results = self._max_results(max_results)
+        url, is_results_url = self._generic_search_url(url, destination, check_in, check_out)
+        try:
+            if self.backend == 'http' and is_results_url and 'result_card' in selectors:
+                fields = {key: css for key, css in selectors.items() if key not in GENERIC_CONTROL_KEYS}
+                yielded = 0
+                for item in self._iter_http_search(url, selectors['result_card'], fields, None, max_results):
+                    yielded += 1
+                    yield item
+                if yielded:
+                    return
+                print("No listings in server-rendered HTML, using the browser")
             
-        except TimeoutException:
-            print("Timeout waiting for results to load")
+            self._open_generic_search(url, selectors, destination, is_results_url)
+            yield from self.iter_generic_results(selectors, max_results)
+        except RateLimitError as e:
+            self.last_search_error = str(e)
+            raise
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            self.last_search_error = str(e)
+    
+    def _iter_http_search(self, url, card_css, fields, offset_param=None, max_results=None):
+        """_iter_http_pages() up to `max_results`; a backend error just ends it (callers fall back to the browser)."""
+        try:
+            yield from islice(self._iter_http_pages(url, card_css, fields, offset_param), max_results)
+        except RateLimitError:
+            raise  # the browser would hit the same paused domain
         except Exception as e:
-            print(f"Error extracting results: {str(e)}")
+            print(f"HTTP backend error: {str(e)}")
+    
+    def iter_booking_results(self, max_results=None, stop=None):
+        """
+        Yield result dicts from the Booking.com search results page currently open,
+        batch by batch as cards load. Follows "load more", lazy loading on scroll
+        and next-page links.
         
-        return results
+        Args:
+            max_results (int): Stop after this many results (None: until the last page
+                or config.SEARCH_MAX_PAGES)
+            stop (callable): stop(result) -> bool; stop right after a matching result
+        """
+        return self._iter_cards(BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS, max_results, stop, BOOKING_PAGINATION)
     
-    def _extract_generic_results(self, selectors):
-        """Extract results using custom selectors"""
-        results = []
+    def iter_generic_results(self, selectors, max_results=None, stop=None):
+        """Like iter_booking_results for a generic OTA page described by `selectors`."""
+        if 'result_card' not in selectors:
+            return iter(())
+        fields = {key: css for key, css in selectors.items() if key not in GENERIC_CONTROL_KEYS}
+        pagination = {key: selectors[key] for key in ('load_more', 'next_page') if key in selectors}
+        return self._iter_cards(selectors['result_card'], fields, max_results, stop, pagination)
+    
+    def _iter_cards(self, card_css, fields, max_results=None, stop=None, pagination=None):
+        # Wait for results to load and the card count to settle
+        with span('results_wait') as wait_span:
+            loaded = self.waits.element(card_css, step='results') is not None
+            if loaded:
+                self.waits.count_stable(card_css)
+            else:
+                wait_span.fail()
+        if not loaded:
+            print("Timeout waiting for results to load")
+            return
         
+        max_pages = int(self._config_value('SEARCH_MAX_PAGES', 20) or 1)
+        yielded = 0
+        seen = 0
+        for _ in range(max_pages):
+            # Only read cards that were not yielded yet (lazy loading appends)
+            count, records = self._bulk_extract(card_css, fields, start=seen)
+            if seen == 0:
+                print(f"Found {count} cards")
+            for record in records:
+                item = {key: (value if value is not None else "N/A") for key, value in record.items()}
+                yield item
+                yielded += 1
+                if max_results is not None and yielded >= max_results:
+                    return
+                if stop is not None and stop(item):
+                    return
+            seen += len(records)
+            
+            advanced = self._advance_results(card_css, seen, pagination or {})
+            if advanced is None:
+                return
+            if advanced == 'page':
+                seen = 0
+    
+    def _advance_results(self, card_css, seen, pagination):
+        """
+        Bring more result cards into the page. Returns 'more' when cards were
+        appended, 'page' when a new page replaced the old one, None when done.
+        """
         try:
-            if 'result_card' in selectors:
-                cards = self.driver.find_elements(By.CSS_SELECTOR, selectors['result_card'])
-                
-                for card in cards[:10]:
-                    result = {}
-                    
-                    for key, selector in selectors.items():
-                        if key != 'result_card':
-                            try:
-                                element = card.find_element(By.CSS_SELECTOR, selector)
-                                result[key] = element.text
-                            except:
-                                result[key] = "N/A"
-                    
-                    results.append(result)
-        
+            load_more = self._first_displayed(pagination.get('load_more'))
+            if load_more is not None:
+                # Loading more results is a request to the site like a navigation
+                with get_limiter().request(self.driver.current_url):
+                    self.driver.execute_script("arguments[0].click();", load_more)
+                if self.waits.count_above(card_css, seen, step='lazy_load'):
+                    return 'more'
+            
+            # Infinite scroll: lazily loaded cards appear when reaching the bottom
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            if self.waits.count_above(card_css, seen, step='lazy_load'):
+                return 'more'
+            
+            next_page = self._first_displayed(pagination.get('next_page'))
+            if next_page is not None:
+                first_card = self.driver.find_elements(By.CSS_SELECTOR, card_css)[:1]
+                with get_limiter().request(self.driver.current_url):
+                    self.driver.execute_script("arguments[0].click();", next_page)
+                if first_card:
+                    self.waits.stale(first_card[0], step='results')
+                if self.waits.element(card_css, step='results') is not None:
+                    self.waits.count_stable(card_css)
+                    return 'page'
+        except RateLimitError:
+            raise  # partial results must not pass for complete ones
         except Exception as e:
-            print(f"Error extracting generic results: {str(e)}")
-        
-        return results
+            print(f"Pagination stopped: {str(e)}")
+        return None
     
-    def _handle_popups(self):
-        """Close common popups like cookie banners"""
-        popup_selectors = [
-            "button[aria-label='Dismiss sign-in info.']",
-            "button.fc-button.fc-cta-consent",
-            "button#onetrust-accept-btn-handler",
-            "[aria-label='Close']",
-            ".modal-close"
-        ]
-        
-        for selector in popup_selectors:
+    def _first_displayed(self, css):
+        if not css:
+            return None
+        for el in self.driver.find_elements(By.CSS_SELECTOR, css):
             try:
-                popup = self.driver.find_element(By.CSS_SELECTOR, selector)
-                popup.click()
-                time.sleep(0.5)
-                print(f"Closed popup: {selector}")
-            except:
+                if el.is_displayed():
+                    return el
+            except Exception:
                 continue
+        return None
+    
+    def _captured_records(self, provider, kind):
+        """
+        Records mapped from the first matching data response since the last
+        navigation (capture mode), or None when capture is off or nothing
+        arrived within NETWORK_CAPTURE_TIMEOUT seconds (NETWORK_CAPTURE_READY_TIMEOUT
+        once the document has finished loading).
+        """
+        if self._capture is None or not self.capture:
+            return None
+        mappers = mappers_for(provider, kind)
+        if not mappers:
+            return None
+        with span('capture') as capture_span:
+            try:
+                records = self._capture.records(
+                    mappers,
+                    float(self._config_value('NETWORK_CAPTURE_TIMEOUT', 8) or 0),
+                    ready=lambda: self._driver.execute_script("return document.readyState") == 'complete',
+                    ready_timeout=float(self._config_value('NETWORK_CAPTURE_READY_TIMEOUT', 1) or 0),
+                )
+            except Exception as e:
+                print(f"Network capture failed: {str(e)}")
+                records = None
+            if records is None:
+                capture_span.fail()
+                print("No data response captured, reading the page instead")
+        return records
+    
+    def _navigate(self, url):
+        """
+        Open `url` and wait for the document to finish loading (to be parsed
+        in lean mode). Navigations are
+        scheduled per domain by the shared rate limiter; errors and bot-check
+        pages count as failures there (backoff, then a pause of the domain).
+        """
+        requested_url = url
+        if self._replay is not None:
+            url = self._replay.rewrite(url)
+        with span('navigate') as nav_span, get_limiter().request(url) as slot:
+            if self._capture is not None:
+                # Only responses of this navigation should be matched
+                self._capture.drain()
+            if self._recorder is not None:
+                self._recorder.event('navigate', url=url)
+            self.driver.get(url)
+            # Lean mode loads pages eagerly: subresources are not waited for. In
+            # capture mode the data response is awaited by _captured_records().
+            if not self.waits.document_ready(interactive=self.lean or self.capture):
+                nav_span.fail()
+            if self._looks_blocked():
+                nav_span.fail()
+                slot.fail()
+                print(f"⚠ Bot check or throttling page served for {url}")
+        self._record_page('navigate', requested_url)
+    
+    def _record_page(self, step, requested_url=None):
+        """Save the current page into the session bundle (record mode)."""
+        if self._recorder is None or self._driver is None:
+            return
+        try:
+            from session_recording import CAPTURE_PAGE_JS
+            html, current_url, title = self._driver.execute_script(CAPTURE_PAGE_JS)
+            self._recorder.page(current_url, html, title, step, requested_url)
+        except Exception as e:
+            print(f"Recording page failed: {str(e)}")
+    
+    def _looks_blocked(self):
+        try:
+            title, current_url = self.driver.execute_script(_PAGE_TITLE_URL_JS)
+        except Exception:
+            return False
+        return bool(_BLOCKED_PAGE_RE.search(title) or _BLOCKED_PAGE_RE.search(urlparse(current_url).path))
+    
+    def _popup_selectors(self, provider):
+        """Close-button selectors for `provider` from config.POPUP_SELECTORS ('default' for the rest)."""
+        selectors = self._config_value('POPUP_SELECTORS', None) or {}
+        return list(selectors.get(provider) or selectors.get('default') or [])
+
+    def _handle_popups(self, provider='default'):
+        """
+        Close cookie banners and sign-in popups with one injected script (no-op
+        round trip when nothing is showing). With config.POPUP_AUTO_DISMISS
+        listing `provider`, also installs an in-page observer on first use that
+        keeps dismissing popups as they appear on every later page.
+        """
+        with span('popups'):
+            selectors = self._popup_selectors(provider)
+            try:
+                if provider not in self._popup_observers and provider in (self._config_value('POPUP_AUTO_DISMISS', ()) or ()):
+                    self.enable_popup_auto_dismiss(provider)
+                for selector in self.driver.execute_script(_DISMISS_POPUPS_JS, selectors) or []:
+                    print(f"Closed popup: {selector}")
+            except Exception as e:
+                print(f"Popup handling failed: {str(e)}")
+
+    def enable_popup_auto_dismiss(self, provider='default'):
+        """Dismiss `provider`'s popups in-page, as soon as they appear, on every new document."""
+        if provider in self._popup_observers:
+            return
+        source = _AUTO_DISMISS_POPUPS_JS % json.dumps(self._popup_selectors(provider))
+        result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        self._popup_observers[provider] = result.get('identifier')
+
+    def disable_popup_auto_dismiss(self, provider='default'):
+        identifier = self._popup_observers.pop(provider, None)
+        if identifier and self._driver is not None:
+            self._driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': identifier})
     
     def _take_screenshot(self, filename):
-        """Take a screenshot for debugging"""
+        """Take a screenshot for debugging (and save the page HTML when recording)"""
+        self._record_page(f"error:{filename}")
         try:
             base_dir = os.path.dirname(os.path.abspath(__file__))
+            if self.worker_id is not None:
+                filename = f"{filename}_worker{self.worker_id}"
             filepath = os.path.join(base_dir, f"{filename}.png")
             self.driver.save_screenshot(filepath)
             print(f"Screenshot saved: {filepath}")
@@ -569,9 +1858,24 @@ class OTACrawler:
     
     def close(self):
         """Close the browser and clean up"""
-        if self.driver:
-            self.driver.quit()
+        self._closed = True
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self._recorder is not None:
+            if self._capture is not None and self._driver is not None:
+                # Record the responses still in the performance log
+                self._capture.drain()
+            self._recorder.close()
+            print(f"Session recorded to {self._recorder.directory}")
+            self._recorder = None
+        if self._driver:
+            self._driver.quit()
+            self._driver = None
             print("Browser closed")
+        if self._replay is not None:
+            self._replay.stop()
+            self._replay = None
 
 
 def main():
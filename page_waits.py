@@ -0,0 +1,126 @@
+"""
+Condition-driven waits for OTACrawler.
+
+Every wait returns as soon as its condition holds and gives up after a
+per-step maximum (see WAIT_TIMEOUTS in config.py) instead of sleeping for
+a fixed amount of time.
+"""
+
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+
+DEFAULT_WAIT_TIMEOUTS = {
+    'page_load': 10,      # document.readyState == 'complete'
+    'element': 10,        # an element matching a selector is present
+    'autocomplete': 3,    # destination suggestions dropdown
+    'calendar': 3,        # date picker opened
+    'results': 15,        # search result cards rendered
+    'results_stable': 5,  # result card count stops changing
+    'lazy_load': 3,       # more cards appended after "load more" / scrolling
+    'login_step': 10,     # next login form step shown
+    'login_redirect': 10,  # leaving the sign-in page after submit
+}
+
+POLL_FREQUENCY = 0.2
+
+
+class PageWaiter:
+    """Small wait layer on top of WebDriverWait with per-step maximums."""
+
+    def __init__(self, driver, timeouts=None, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.timeouts = dict(DEFAULT_WAIT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.poll_frequency = poll_frequency
+
+    def _until(self, step, condition, timeout=None):
+        """Wait until condition(driver) is truthy; return its value or None on timeout."""
+        limit = self.timeouts.get(step, self.timeouts['element']) if timeout is None else timeout
+        try:
+            return WebDriverWait(self.driver, limit, poll_frequency=self.poll_frequency).until(condition)
+        except TimeoutException:
+            return None
+
+    def document_ready(self, timeout=None, interactive=False):
+        """
+        Wait for document.readyState to be 'complete', or with `interactive`
+        for the DOM to be parsed ('interactive'; matches eager page loads).
+        """
+        ready = ('interactive', 'complete') if interactive else ('complete',)
+        return bool(self._until(
+            'page_load',
+            lambda d: d.execute_script("return document.readyState") in ready,
+            timeout,
+        ))
+
+    def element(self, css, step='element', timeout=None):
+        """Wait for the first element matching `css` and return it (or None)."""
+        def present(d):
+            found = d.find_elements(By.CSS_SELECTOR, css)
+            return found[0] if found else False
+
+        return self._until(step, present, timeout)
+
+    def any_element(self, css_list, step='element', timeout=None):
+        """Wait until any selector in `css_list` matches; return the matching selector."""
+        def present(d):
+            for css in css_list:
+                if css and d.find_elements(By.CSS_SELECTOR, css):
+                    return css
+            return False
+
+        return self._until(step, present, timeout)
+
+    def clickable(self, css, step='element', timeout=None):
+        """Wait for a displayed and enabled element matching `css`."""
+        def ready(d):
+            for el in d.find_elements(By.CSS_SELECTOR, css):
+                try:
+                    if el.is_displayed() and el.is_enabled():
+                        return el
+                except Exception:
+                    continue
+            return False
+
+        return self._until(step, ready, timeout)
+
+    def count_stable(self, css, settle=0.6, step='results_stable', timeout=None):
+        """
+        Wait until the number of elements matching `css` is non-zero and has not
+        changed for `settle` seconds. Returns the final count (0 on timeout).
+        """
+        state = {'count': -1, 'since': time.monotonic()}
+
+        def stable(d):
+            count = len(d.find_elements(By.CSS_SELECTOR, css))
+            now = time.monotonic()
+            if count != state['count']:
+                state['count'] = count
+                state['since'] = now
+                return False
+            return count > 0 and now - state['since'] >= settle
+
+        self._until(step, stable, timeout)
+        return max(0, state['count'])
+
+    def count_above(self, css, count, step='lazy_load', timeout=None):
+        """Wait until more than `count` elements match `css`."""
+        return bool(self._until(step, lambda d: len(d.find_elements(By.CSS_SELECTOR, css)) > count, timeout))
+
+    def stale(self, element, step='element', timeout=None):
+        """Wait until `element` is detached from the DOM (e.g. the page was replaced)."""
+        def detached(d):
+            try:
+                element.is_enabled()
+                return False
+            except StaleElementReferenceException:
+                return True
+
+        return bool(self._until(step, detached, timeout))
+
+    def url_changes(self, previous_url, step='login_redirect', timeout=None):
+        """Wait until the current URL differs from `previous_url`."""
+        return bool(self._until(step, lambda d: d.current_url != previous_url, timeout))
@@ -0,0 +1,136 @@
+"""
+Compare one reservation across several OTA providers at once.
+
+Every provider searches with its own CrawlerPool (its own browsers and
+session). For a reservation, all providers run concurrently and each is
+bounded by its own timeout, so the wall time is that of the slowest provider
+(at most its timeout) rather than the sum of all of them. The matched offers
+are normalized, tagged with their source provider and the cheapest one in
+the reservation's currency is reported.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from normalization import normalize_results, parse_price
+
+
+class ProviderComparison:
+    """
+    - `providers`: {name: (OTAProvider class, CrawlerPool)}
+    - `timeouts`: per-provider timeouts in seconds; others use `default_timeout`
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Tuple[Any, Any]],
+        config: Any,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 120,
+    ):
+        self.providers = dict(providers)
+        self.config = config
+        self.timeouts = {name.lower(): float(t) for name, t in (timeouts or {}).items()}
+        self.default_timeout = float(default_timeout)
+        self.locale = getattr(config, 'PARSE_LOCALE', None)
+        # Reservations compared at the same time: the smallest pool is not oversubscribed
+        self.concurrency = max(1, min((pool.size for _, pool in self.providers.values()), default=1))
+        # Not used as a context manager: a timed-out search is abandoned (its
+        # crawler discarded, see _abandon) and must not block the comparison
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency * max(1, len(self.providers)))
+
+    def _timeout(self, name: str) -> float:
+        return self.timeouts.get(name.lower(), self.default_timeout)
+
+    def _search(self, name: str, reservation: Dict[str, Any], task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Search one provider. `task` is shared with compare(): it holds the leased
+        crawler while the search runs, and 'abandoned' once compare() gave up.
+        """
+        provider_cls, pool = self.providers[name]
+        with pool.lease() as crawler:
+            with task['lock']:
+                if task['abandoned']:
+                    return None
+                task['crawler'] = crawler
+            provider = provider_cls(crawler, self.config)
+            matched = provider.pick_match(reservation, provider.search_comparable(reservation))
+            error = getattr(crawler, 'last_search_error', None)
+            with task['lock']:
+                task['crawler'] = None
+        if error:
+            raise RuntimeError(f"search failed: {error}")
+        if matched is None:
+            return None
+        offer = normalize_results([matched], self.locale)[0]
+        offer['source'] = name
+        return offer
+
+    def compare(self, reservation: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Search `reservation` on every provider concurrently.
+
+        Returns {'offers': matched offers (price_value, currency, source, ...),
+        'cheapest': cheapest offer or None, 'errors': {provider: message}}.
+        """
+        started = time.monotonic()
+        tasks = {name: {'lock': threading.Lock(), 'crawler': None, 'abandoned': False} for name in self.providers}
+        futures = {name: self._executor.submit(self._search, name, reservation, tasks[name]) for name in self.providers}
+        offers: List[Dict[str, Any]] = []
+        errors: Dict[str, str] = {}
+        for name, future in futures.items():
+            remaining = self._timeout(name) - (time.monotonic() - started)
+            try:
+                offer = future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                self._abandon(name, future, tasks[name])
+                errors[name] = f"timed out after {self._timeout(name):g}s"
+                continue
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            if offer is not None:
+                offers.append(offer)
+        for name, message in errors.items():
+            print(f"{name}: comparable search failed for {reservation.get('hotel_name', '')}: {message}")
+        currency = parse_price(reservation.get('price_total', ''), self.locale)[1]
+        return {'offers': offers, 'cheapest': cheapest_offer(offers, currency), 'errors': errors}
+
+    def _abandon(self, name: str, future: Any, task: Dict[str, Any]) -> None:
+        """
+        Give up on a timed-out search: a queued one is cancelled, a running one
+        loses its crawler. That crawler is dropped from the pool, so later
+        reservations do not queue behind it and the pool starts a fresh one when
+        needed. It is closed unless it is a seed of the pool (e.g. run_monitor's
+        logged-in browser), which rejoins the pool once its search returns.
+        """
+        future.cancel()
+        with task['lock']:
+            task['abandoned'] = True
+            crawler = task['crawler']
+        if crawler is not None:
+            print(f"{name}: dropping the browser of the timed-out search from the pool")
+            self.providers[name][1].discard(crawler)
+
+    def compare_many(self, reservations: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """compare() for every reservation, in order."""
+        reservations = list(reservations)
+        if self.concurrency == 1 or len(reservations) < 2:
+            return [self.compare(res) for res in reservations]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(reservations))) as executor:
+            return list(executor.map(self.compare, reservations))
+
+    def close(self) -> None:
+        """Wait for running searches (abandoned ones end once their browser is closed) before the pools are closed."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def cheapest_offer(offers: Sequence[Dict[str, Any]], currency: str = '') -> Optional[Dict[str, Any]]:
+    """Lowest-priced offer; offers in another currency than `currency` (when known) are ignored."""
+    priced = [
+        offer for offer in offers
+        if offer.get('price_value', 0) > 0 and (not currency or not offer.get('currency') or offer['currency'] == currency)
+    ]
+    return min(priced, key=lambda offer: offer['price_value'], default=None)
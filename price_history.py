@@ -0,0 +1,146 @@
+"""
+Price history time-series store with batched drop detection.
+
+Every monitor observation (reservation, provider, timestamp, price, currency)
+is appended to a local SQLite table. Drop detection loads the latest window
+for all requested reservations at once and evaluates the thresholds with
+NumPy array operations instead of a Python loop per reservation.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # NumPy optional (only needed for drop detection)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_observation (
+    reservation_key TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_price_observation_key_ts ON price_observation(reservation_key, ts);
+"""
+
+
+class PriceHistory:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # `with closing(conn), conn:` commits, then closes the connection
+        return sqlite3.connect(self.path, timeout=30)
+
+    def append(self, observations: Iterable[Tuple[str, str, float, Optional[str]]], ts: Optional[float] = None) -> int:
+        """Append (reservation_key, provider, price, currency) rows stamped with `ts` (default: now)."""
+        ts = time.time() if ts is None else ts
+        rows = [(key, provider, ts, float(price), currency or '') for key, provider, price, currency in observations if price]
+        if rows:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT INTO price_observation (reservation_key, provider, ts, price, currency) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def load_window(self, keys: List[str], window_seconds: float, now: Optional[float] = None):
+        """
+        Return (key_index, ts, price, currency) arrays for `keys` within the window,
+        sorted by key then time. key_index refers to positions in `keys`.
+        """
+        now = time.time() if now is None else now
+        index = {key: i for i, key in enumerate(keys)}
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_key (reservation_key TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM wanted_key")
+            conn.executemany("INSERT OR IGNORE INTO wanted_key VALUES (?)", [(k,) for k in keys])
+            rows = conn.execute(
+                "SELECT o.reservation_key, o.ts, o.price, o.currency FROM price_observation o"
+                " JOIN wanted_key w ON w.reservation_key = o.reservation_key"
+                " WHERE o.ts >= ? ORDER BY o.reservation_key, o.ts",
+                (now - window_seconds,),
+            ).fetchall()
+        key_idx = np.fromiter((index[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        ts = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+        price = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+        currency = np.array([r[3] or '' for r in rows], dtype=object)
+        order = np.lexsort((ts, key_idx))
+        return key_idx[order], ts[order], price[order], currency[order]
+
+    def detect_drops(
+        self,
+        booked: Dict[str, float],
+        window_seconds: float = 30 * 24 * 3600,
+        abs_threshold: float = 0.0,
+        rel_threshold: float = 0.0,
+        require_new_low: bool = False,
+        now: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare the latest observed price of every reservation in `booked`
+        ({reservation_key: booked price}) in one batch.
+
+        A reservation is reported when its latest price is lower than the booked
+        price by more than `abs_threshold` and by at least `rel_threshold`
+        (fraction of the booked price). With `require_new_low`, the latest price
+        must also be below the minimum of the earlier observations in the window
+        (the rolling minimum), so the same low price is not reported every run.
+        """
+        if np is None:
+            raise RuntimeError("NumPy is not installed. Install 'numpy' package.")
+        keys = [k for k, v in booked.items() if v and v > 0]
+        if not keys:
+            return []
+        key_idx, _, price, currency = self.load_window(keys, window_seconds, now)
+        if key_idx.size == 0:
+            return []
+
+        # Group boundaries in the (key, ts)-sorted arrays
+        starts = np.flatnonzero(np.r_[True, key_idx[1:] != key_idx[:-1]])
+        ends = np.r_[starts[1:], key_idx.size] - 1
+        group_key = key_idx[starts]
+        latest = price[ends]
+
+        # Rolling minimum of the observations before the latest one (inf if none)
+        earlier = price.copy()
+        earlier[ends] = np.inf
+        prev_min = np.minimum.reduceat(earlier, starts)
+
+        booked_arr = np.array([booked[keys[i]] for i in group_key], dtype=np.float64)
+        abs_drop = booked_arr - latest
+        rel_drop = abs_drop / booked_arr
+
+        mask = (latest > 0) & (abs_drop > max(0.0, abs_threshold) + 1e-6) & (rel_drop >= max(0.0, rel_threshold))
+        if require_new_low:
+            mask &= latest < prev_min
+
+        return [
+            {
+                'reservation_key': keys[group_key[i]],
+                'booked_price': float(booked_arr[i]),
+                'latest_price': float(latest[i]),
+                'currency': currency[ends[i]],
+                'abs_drop': float(abs_drop[i]),
+                'rel_drop': float(rel_drop[i]),
+                'previous_min': None if np.isinf(prev_min[i]) else float(prev_min[i]),
+            }
+            for i in np.flatnonzero(mask)
+        ]
+
+
+def price_history_from_config(config: Any) -> PriceHistory:
+    path = getattr(config, 'PRICE_HISTORY_PATH', '') or 'price_history.sqlite3'
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return PriceHistory(path)
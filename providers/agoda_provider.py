@@ -1,4 +1,5 @@
 from typing import Any, Dict, List, Optional
+from selenium.webdriver.common.by import By
 from providers.base_provider import OTAProvider, AuthProvider
 
 
@@ -14,7 +15,7 @@ class AgodaAuth(AuthProvider):
                 return True
             # Simple header/account icon heuristic if present
             sel = (getattr(self.config, 'AGODA_SELECTORS', {}) or {}).get('account_menu', '[data-element-name="header-account-menu"]')
-            if self.crawler.driver.find_elements_by_css_selector(sel):
+            if self.crawler.driver.find_elements(By.CSS_SELECTOR, sel):
                 return True
         except Exception:
             pass
@@ -23,11 +24,11 @@ class AgodaAuth(AuthProvider):
     def heavy_check(self) -> bool:
         try:
             url = (getattr(self.config, 'AGODA_SELECTORS', {}) or {}).get('reservations_page_url', 'https://www.agoda.com/account/booking')
-            self.crawler.driver.get(url)
-            self.crawler._handle_popups()
+            self.crawler._navigate(url)
+            self.crawler._handle_popups('agoda')
             # Presence of any reservation list container would indicate login
             sel = (getattr(self.config, 'AGODA_SELECTORS', {}) or {}).get('reservation_card', '.BookingCard')
-            cards = self.crawler.driver.find_elements_by_css_selector(sel)
+            cards = self.crawler.driver.find_elements(By.CSS_SELECTOR, sel)
             return len(cards) >= 0  # if page loads without redirecting to login, treat as logged in
         except Exception:
             return False
@@ -37,7 +38,7 @@ class AgodaAuth(AuthProvider):
             current_url = self.crawler.driver.current_url or ""
             if current_url.startswith('data:') or 'about:blank' in current_url:
                 login_url = (getattr(self.config, 'AGODA_SELECTORS', {}) or {}).get('login_page_url', 'https://www.agoda.com/account/signin')
-                self.crawler.driver.get(login_url)
+                self.crawler._navigate(login_url)
         except Exception:
             pass
 
@@ -45,6 +46,21 @@ class AgodaAuth(AuthProvider):
         # Not implemented for Agoda; manual login expected
         return False
 
+    def restore_session(self) -> bool:
+        if not getattr(self.config, 'SESSION_SNAPSHOT_ENABLED', False):
+            return False
+        if not self.crawler.restore_session_snapshot('agoda'):
+            return False
+        try:
+            self.crawler._navigate('https://www.agoda.com')
+        except Exception:
+            return False
+        return self.light_check()
+
+    def save_session(self) -> None:
+        if getattr(self.config, 'SESSION_SNAPSHOT_ENABLED', False):
+            self.crawler.save_session_snapshot('agoda')
+
 
 class AgodaProvider(OTAProvider):
     name = "agoda"
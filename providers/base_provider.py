@@ -1,5 +1,7 @@
 from typing import Any, Dict, List, Optional, Callable
 
+from hotel_matcher import get_matcher
+
 
 class AuthProvider:
     def light_check(self) -> bool:
@@ -14,6 +16,14 @@ class AuthProvider:
     def auto_login(self) -> bool:
         return False
 
+    # Session snapshots: restore_session() should load a saved session and
+    # validate it cheaply (no heavy navigation); save_session() runs after login.
+    def restore_session(self) -> bool:
+        return False
+
+    def save_session(self) -> None:
+        pass
+
 
 class OTAProvider:
     """Abstract provider for an OTA site."""
@@ -23,6 +33,8 @@ class OTAProvider:
     def __init__(self, crawler: Any, config: Any):
         self.crawler = crawler
         self.config = config
+        # Consult the crawler's search cache before opening a results page
+        self.use_cache = not getattr(config, 'SEARCH_CACHE_BYPASS', False)
 
     # Auth
     def get_auth(self) -> AuthProvider:
@@ -36,15 +48,13 @@ class OTAProvider:
     def search_comparable(self, reservation: Dict[str, Any]) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
-    # Match the same hotel/room if possible; otherwise pick the best comparable item
+    # Match the same hotel/room by fuzzy name/address/room-type score; None when not confident
     def pick_match(self, reservation: Dict[str, Any], search_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         if not search_results:
             return None
-        # Default: try name equality else first item
-        hotel = reservation.get('hotel_name', '').strip().lower()
-        for item in search_results:
-            if item.get('name', '').strip().lower() == hotel:
-                return item
-        return search_results[0]
-
-
+        item, confidence = get_matcher(search_results).match(reservation)
+        if item is None or confidence < getattr(self.config, 'MATCH_MIN_CONFIDENCE', 0.6):
+            return None
+        matched = dict(item)
+        matched['match_confidence'] = round(confidence, 3)
+        return matched
@@ -1,5 +1,6 @@
 from typing import Any, Dict, List, Optional
 from providers.base_provider import OTAProvider, AuthProvider
+from hotel_matcher import name_similarity
 
 
 class BookingAuth(AuthProvider):
@@ -17,7 +18,7 @@ class BookingAuth(AuthProvider):
         try:
             current_url = self.crawler.driver.current_url or ""
             if current_url.startswith('data:') or 'about:blank' in current_url:
-                self.crawler.driver.get(self.config.BOOKING_SELECTORS.get('login_page_url', 'https://account.booking.com/sign-in'))
+                self.crawler._navigate(self.config.BOOKING_SELECTORS.get('login_page_url', 'https://account.booking.com/sign-in'))
         except Exception:
             pass
 
@@ -26,6 +27,23 @@ class BookingAuth(AuthProvider):
             return False
         return self.crawler.login_booking(self.config.BOOKING_EMAIL, self.config.BOOKING_PASSWORD, self.config.BOOKING_SELECTORS)
 
+    def restore_session(self) -> bool:
+        if not getattr(self.config, 'SESSION_SNAPSHOT_ENABLED', False):
+            return False
+        if not self.crawler.restore_session_snapshot('booking'):
+            return False
+        try:
+            # One homepage load applies cookies/localStorage; the header account menu proves the session
+            self.crawler._navigate('https://www.booking.com')
+            self.crawler.waits.element('[data-testid="header-myaccount-menu"]', step='login_step', timeout=3)
+        except Exception:
+            return False
+        return self.light_check()
+
+    def save_session(self) -> None:
+        if getattr(self.config, 'SESSION_SNAPSHOT_ENABLED', False):
+            self.crawler.save_session_snapshot('booking')
+
 
 class BookingProvider(OTAProvider):
     name = "booking"
@@ -46,6 +64,12 @@ class BookingProvider(OTAProvider):
             check_out=check_out,
             adults=self.config.NUM_ADULTS,
             rooms=self.config.NUM_ROOMS,
+            children=getattr(self.config, 'NUM_CHILDREN', 0),
+            use_cache=self.use_cache,
+            # Stop paginating once the reserved hotel itself shows up
+            stop=lambda item: name_similarity(hotel_name, item.get('name', '')) >= 0.95,
+            # Results up to the hotel are cached for the next check of this reservation
+            stop_key=hotel_name,
         )
 
 
@@ -0,0 +1,38 @@
+import importlib
+import threading
+from typing import Dict, List, Optional, Type, Union
+
+from providers.base_provider import OTAProvider
+
+
+# Site name -> "module:Class"; modules are only imported when the provider is used
+_PROVIDERS: Dict[str, Union[str, Type[OTAProvider]]] = {
+    'booking': 'providers.booking_provider:BookingProvider',
+    'agoda': 'providers.agoda_provider:AgodaProvider',
+}
+_LOCK = threading.Lock()
+
+
+def register_provider(name: str, provider: Union[str, Type[OTAProvider]]) -> None:
+    """Register an OTAProvider class, or its "module:Class" path to import it lazily."""
+    with _LOCK:
+        _PROVIDERS[name.lower()] = provider
+
+
+def provider_names() -> List[str]:
+    with _LOCK:
+        return sorted(_PROVIDERS)
+
+
+def get_provider_class(name: str) -> Optional[Type[OTAProvider]]:
+    """The provider class registered for `name`, or None for an unknown site."""
+    key = (name or '').lower()
+    with _LOCK:
+        target = _PROVIDERS.get(key)
+    if target is None or not isinstance(target, str):
+        return target
+    module_name, _, class_name = target.partition(':')
+    provider_cls = getattr(importlib.import_module(module_name), class_name)
+    with _LOCK:
+        _PROVIDERS[key] = provider_cls
+    return provider_cls
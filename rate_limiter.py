@@ -0,0 +1,294 @@
+"""
+Per-domain request scheduling shared by every crawler of a process.
+
+Each domain (booking.com, agoda.com, ...) gets:
+- a token bucket: `rate` requests per second on average, bursts up to `burst`
+- a concurrency cap: at most `max_concurrency` requests in flight
+- jittered exponential backoff: after a failure the next request waits
+  backoff_base * 2^(failures - 1) seconds (capped at backoff_max, 50-100% jitter)
+- adaptive rate: every failure halves the domain's rate (down to min_rate),
+  every success gives back a tenth of the configured rate
+- a circuit breaker: after `failure_threshold` consecutive failures the domain
+  is paused for `cooldown` seconds; requests during the pause raise
+  CircuitOpenError. After the pause one trial request is let through and
+  decides whether the circuit closes again.
+
+Both CircuitOpenError and SlotTimeoutError derive from RateLimitError: callers
+should let it through rather than treat it as an empty or failed result, so
+the search can be retried once the domain accepts requests again.
+
+    with get_limiter().request(url) as slot:
+        driver.get(url)
+        if looks_blocked(driver):
+            slot.fail()          # soft failure (e.g. CAPTCHA page), no exception
+
+Subdomains share their parent's state (secure.booking.com -> booking.com).
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from metrics import incr
+
+
+DEFAULT_POLICY = {
+    'rate': 0.5,              # requests per second (sustained)
+    'burst': 3,               # requests allowed back to back
+    'max_concurrency': 2,     # requests in flight per domain
+    'min_rate': 0.05,         # floor for the adaptive rate
+    'backoff_base': 2.0,      # seconds after the first failure
+    'backoff_max': 60.0,
+    'failure_threshold': 5,   # consecutive failures that open the circuit
+    'cooldown': 300.0,        # seconds a domain stays paused
+}
+
+DEFAULT_EXEMPT_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+class RateLimitError(Exception):
+    """No request slot was granted for a domain."""
+
+
+class CircuitOpenError(RateLimitError):
+    def __init__(self, domain: str, retry_after: float):
+        super().__init__(f"{domain} paused for {retry_after:.0f}s after repeated failures")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+class SlotTimeoutError(RateLimitError, TimeoutError):
+    pass
+
+
+class _DomainState:
+    def __init__(self, policy: Dict[str, float], now: float):
+        self.policy = policy
+        self.rate = float(policy['rate'])
+        self.tokens = float(policy['burst'])
+        self.updated = now
+        self.active = 0
+        self.failures = 0
+        self.backoff_until = 0.0
+        self.open_until = 0.0
+        self.trial = False  # half-open: one trial request in flight
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(float(self.policy['burst']), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class _Slot:
+    __slots__ = ('limiter', 'domain', 'failed')
+
+    def __init__(self, limiter: 'RateLimiter', domain: Optional[str]):
+        self.limiter = limiter
+        self.domain = domain
+        self.failed = False
+
+    def fail(self) -> None:
+        """Count this request as failed (throttled, blocked, ...) without raising."""
+        self.failed = True
+
+    def __enter__(self) -> '_Slot':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.domain is not None:
+            self.limiter.release(self.domain, ok=not (self.failed or exc_type is not None))
+        return False
+
+
+class RateLimiter:
+    """
+    - `policies`: {domain: policy overrides}; other domains use `default`
+    - `share`: fraction of every rate this process may use (e.g. 1/N for N worker processes)
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, Dict[str, float]]] = None,
+        default: Optional[Dict[str, float]] = None,
+        share: float = 1.0,
+        exempt_hosts=DEFAULT_EXEMPT_HOSTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.default = dict(DEFAULT_POLICY)
+        self.default.update(default or {})
+        self.policies = {domain.lower(): policy for domain, policy in (policies or {}).items()}
+        self.share = max(0.01, float(share))
+        self.exempt_hosts = {host.lower() for host in exempt_hosts or ()}
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._states: Dict[str, _DomainState] = {}
+
+    def domain_of(self, url: str) -> Optional[str]:
+        """Domain key for `url`, or None when it is not rate limited (local or non-HTTP URLs)."""
+        parsed = urlparse(url or '')
+        host = (parsed.hostname or '').lower()
+        if parsed.scheme not in ('http', 'https') or not host or host in self.exempt_hosts:
+            return None
+        for domain in self.policies:
+            if host == domain or host.endswith('.' + domain):
+                return domain
+        labels = host.split('.')
+        if labels[-1].isdigit():
+            return host
+        # booking.com, agoda.com; keep three labels for e.g. booking.co.uk
+        keep = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in ('co', 'com', 'ac', 'or', 'ne') else 2
+        return '.'.join(labels[-keep:])
+
+    def _policy(self, domain: str) -> Dict[str, float]:
+        policy = dict(self.default)
+        policy.update(self.policies.get(domain) or {})
+        for key in ('rate', 'min_rate'):
+            policy[key] = float(policy[key]) * self.share
+        policy['burst'] = max(1.0, float(policy['burst']))
+        policy['max_concurrency'] = max(1, int(policy['max_concurrency']))
+        return policy
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._states.get(domain)
+        if state is None:
+            state = self._states[domain] = _DomainState(self._policy(domain), self.clock())
+        return state
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Block until a request to `url` may start; returns its domain key (pass it
+        to release()) or None for URLs that are not rate limited.
+        Raises CircuitOpenError while the domain is paused, SlotTimeoutError after `timeout`.
+        """
+        domain = self.domain_of(url)
+        if domain is None:
+            return None
+        deadline = None if timeout is None else self.clock() + timeout
+        waited = False
+        with self._cond:
+            while True:
+                state = self._state(domain)
+                now = self.clock()
+                if state.open_until:
+                    if now < state.open_until:
+                        incr(f"ratelimit.{domain}.rejected")
+                        raise CircuitOpenError(domain, state.open_until - now)
+                    if state.trial:
+                        # Half-open: wait for the trial request to decide
+                        delay = 1.0
+                    else:
+                        state.trial = True
+                        state.active += 1
+                        return domain
+                else:
+                    state.refill(now)
+                    if state.active >= state.policy['max_concurrency']:
+                        delay = None  # woken by release()
+                    elif now < state.backoff_until:
+                        delay = state.backoff_until - now
+                    elif state.tokens < 1:
+                        delay = (1 - state.tokens) / state.rate
+                    else:
+                        state.tokens -= 1
+                        state.active += 1
+                        if waited:
+                            incr(f"ratelimit.{domain}.delayed")
+                        return domain
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise SlotTimeoutError(f"No request slot for {domain} within {timeout}s")
+                    delay = remaining if delay is None else min(delay, remaining)
+                waited = True
+                self._cond.wait(delay)
+
+    def release(self, domain: Optional[str], ok: bool = True) -> None:
+        if domain is None:
+            return
+        with self._cond:
+            state = self._state(domain)
+            state.active = max(0, state.active - 1)
+            policy = state.policy
+            now = self.clock()
+            if ok:
+                state.failures = 0
+                state.backoff_until = 0.0
+                state.rate = min(policy['rate'], state.rate + policy['rate'] * 0.1)
+                if state.open_until:
+                    print(f"{domain}: requests succeed again, resuming")
+                state.open_until = 0.0
+                state.trial = False
+            else:
+                state.failures += 1
+                state.rate = max(policy['min_rate'], state.rate * 0.5)
+                backoff = min(policy['backoff_max'], policy['backoff_base'] * 2 ** (state.failures - 1))
+                state.backoff_until = now + backoff * random.uniform(0.5, 1.0)
+                incr(f"ratelimit.{domain}.failures")
+                if state.trial or state.failures >= policy['failure_threshold']:
+                    state.open_until = now + policy['cooldown']
+                    state.trial = False
+                    incr(f"ratelimit.{domain}.circuit_open")
+                    print(f"{domain}: {state.failures} consecutive failures, pausing for {policy['cooldown']:g}s")
+            self._cond.notify_all()
+
+    def request(self, url: str, timeout: Optional[float] = None) -> _Slot:
+        """Context manager around acquire()/release(); exceptions count as failures."""
+        return _Slot(self, self.acquire(url, timeout))
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            now = self.clock()
+            return {
+                domain: {
+                    'rate': round(state.rate, 4),
+                    'active': state.active,
+                    'failures': state.failures,
+                    'paused_for': round(max(0.0, state.open_until - now), 1),
+                }
+                for domain, state in sorted(self._states.items())
+            }
+
+
+def limiter_from_config(config: Any, share: float = 1.0) -> RateLimiter:
+    return RateLimiter(
+        policies=getattr(config, 'RATE_LIMIT_DOMAINS', None),
+        default=getattr(config, 'RATE_LIMIT_DEFAULT', None),
+        share=share,
+        exempt_hosts=getattr(config, 'RATE_LIMIT_EXEMPT_HOSTS', DEFAULT_EXEMPT_HOSTS),
+    )
+
+
+class _Unlimited:
+    def request(self, url: str, timeout: Optional[float] = None) -> _Slot:
+        return _Slot(self, None)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+
+_LIMITER: Any = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_limiter() -> Any:
+    """The process-wide limiter (RATE_LIMIT_* config; a no-op one when RATE_LIMIT_ENABLED is False)."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            try:
+                import config as _cfg
+            except Exception:
+                _cfg = None
+            if getattr(_cfg, 'RATE_LIMIT_ENABLED', True):
+                _LIMITER = limiter_from_config(_cfg)
+            else:
+                _LIMITER = _Unlimited()
+        return _LIMITER
+
+
+def set_limiter(limiter: Any) -> None:
+    """Replace the process-wide limiter (e.g. with a smaller share in worker processes)."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        _LIMITER = limiter
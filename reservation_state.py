@@ -0,0 +1,118 @@
+"""
+Local state store for incremental reservation monitoring.
+
+Each reservation is keyed by a stable fingerprint (provider, hotel, dates,
+room type). The store remembers a digest of the card content, the last known
+booked price, when it was last checked and the last comparable price seen,
+so a monitor run only re-searches reservations that are new, changed or stale.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservation_state (
+    fingerprint TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    hotel_name TEXT,
+    check_in TEXT,
+    check_out TEXT,
+    content_hash TEXT NOT NULL,
+    last_price_text TEXT,
+    last_checked REAL NOT NULL,
+    last_comparable_price REAL
+);
+"""
+
+# Fields that identify a reservation vs. fields whose change triggers a re-check
+_IDENTITY_FIELDS = ('hotel_name', 'check_in', 'check_out', 'room_type')
+_CONTENT_FIELDS = ('price_total', 'status', 'cancellation_policy', 'is_cancellable')
+
+
+def _digest(values) -> str:
+    joined = "\x1f".join(str(v or '').strip().lower() for v in values)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+
+def reservation_fingerprint(provider: str, reservation: Dict[str, Any]) -> str:
+    return _digest([provider] + [reservation.get(f, '') for f in _IDENTITY_FIELDS])
+
+
+def reservation_content_hash(reservation: Dict[str, Any]) -> str:
+    return _digest([reservation.get(f, '') for f in _CONTENT_FIELDS])
+
+
+class ReservationStateStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # `with closing(conn), conn:` commits, then closes the connection
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, provider: str) -> Dict[str, Dict[str, Any]]:
+        """Return all stored rows for a provider keyed by fingerprint."""
+        with closing(self._connect()) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM reservation_state WHERE provider = ?", (provider,)).fetchall()
+        return {row['fingerprint']: dict(row) for row in rows}
+
+    def check_reason(self, row: Optional[Dict[str, Any]], reservation: Dict[str, Any], stale_seconds: float, now: float) -> Optional[str]:
+        """'new', 'changed', 'stale' or None when the reservation can be skipped."""
+        if row is None:
+            return 'new'
+        if row['content_hash'] != reservation_content_hash(reservation):
+            return 'changed'
+        if now - row['last_checked'] >= stale_seconds:
+            return 'stale'
+        return None
+
+    def select_due(self, provider: str, reservations: List[Dict[str, Any]], stale_seconds: float) -> List[Tuple[Dict[str, Any], str]]:
+        """Return (reservation, reason) for every reservation that needs a new search."""
+        rows = self.load(provider)
+        now = time.time()
+        due = []
+        for res in reservations:
+            reason = self.check_reason(rows.get(reservation_fingerprint(provider, res)), res, stale_seconds, now)
+            if reason:
+                due.append((res, reason))
+        return due
+
+    def record_checks(self, provider: str, checked: List[Tuple[Dict[str, Any], Optional[float]]]) -> None:
+        """Store (reservation, comparable price or None) pairs after a search."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO reservation_state"
+                " (fingerprint, provider, hotel_name, check_in, check_out, content_hash, last_price_text, last_checked, last_comparable_price)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        reservation_fingerprint(provider, res),
+                        provider,
+                        res.get('hotel_name', ''),
+                        res.get('check_in', ''),
+                        res.get('check_out', ''),
+                        reservation_content_hash(res),
+                        res.get('price_total', ''),
+                        now,
+                        comparable_price,
+                    )
+                    for res, comparable_price in checked
+                ],
+            )
+
+
+def state_store_from_config(config: Any) -> ReservationStateStore:
+    path = getattr(config, 'MONITOR_STATE_PATH', '') or 'monitor_state.sqlite3'
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return ReservationStateStore(path)
@@ -0,0 +1,172 @@
+"""
+Streaming NDJSON result files with rotation and optional gzip.
+
+NDJSONSink appends one JSON record per line as results are produced, so a
+long sweep never holds its results in memory. The file being written is
+named *.part; when it is rotated (by size or age) or the sink is closed it
+is fsynced and atomically renamed to its final name. Readers therefore only
+ever see complete files, and every run keeps its own timestamped files.
+
+    with sink_from_config(config, 'search') as sink:
+        sink.write_many(crawler.iter_booking_results())
+
+    for record in read_records('results/'):
+        ...
+"""
+
+import glob
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+PART_SUFFIX = '.part'
+
+
+class NDJSONSink:
+    """
+    - `max_bytes`: start a new file once this many (uncompressed) bytes were written
+    - `max_age_seconds`: start a new file once the current one is this old
+    - `compress`: gzip files (.ndjson.gz)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = 'results',
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        compress: bool = False,
+    ):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.max_age_seconds = float(max_age_seconds) if max_age_seconds else None
+        self.compress = compress
+        self.files: List[str] = []  # finalized files, in order
+        self.records_written = 0
+        self._file = None
+        self._part_path: Optional[str] = None
+        self._final_path: Optional[str] = None
+        self._bytes = 0
+        self._opened_at = 0.0
+        self._seq = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self) -> None:
+        self._seq += 1
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        name = f"{self.prefix}_{stamp}_{os.getpid()}_{self._seq:04d}.ndjson" + ('.gz' if self.compress else '')
+        self._final_path = os.path.join(self.directory, name)
+        self._part_path = self._final_path + PART_SUFFIX
+        raw = open(self._part_path, 'wb')
+        self._file = gzip.GzipFile(fileobj=raw, mode='wb') if self.compress else raw
+        self._bytes = 0
+        self._opened_at = time.monotonic()
+
+    def _finalize(self) -> None:
+        if self._file is None:
+            return
+        if self.compress:
+            raw = self._file.fileobj
+            self._file.close()
+        else:
+            raw = self._file
+        raw.flush()
+        os.fsync(raw.fileno())
+        raw.close()
+        self._file = None
+        if self._bytes:
+            os.replace(self._part_path, self._final_path)
+            self.files.append(self._final_path)
+        else:
+            os.remove(self._part_path)
+
+    def _due_for_rotation(self) -> bool:
+        if self.max_bytes is not None and self._bytes >= self.max_bytes:
+            return True
+        return self.max_age_seconds is not None and time.monotonic() - self._opened_at >= self.max_age_seconds
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._file is not None and self._due_for_rotation():
+            self._finalize()
+        if self._file is None:
+            self._open()
+        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+        self._file.write(line)
+        if not self.compress:
+            self._file.flush()
+        self._bytes += len(line)
+        self.records_written += 1
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def rotate(self) -> None:
+        """Finalize the current file now; the next record starts a new one."""
+        self._finalize()
+
+    def close(self) -> None:
+        self._finalize()
+
+    def __enter__(self) -> 'NDJSONSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _record_files(path: str, prefix: Optional[str], include_partial: bool) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    pattern = f"{prefix or ''}*.ndjson*"
+    files = []
+    for name in sorted(glob.glob(os.path.join(path, pattern))):
+        if name.endswith(PART_SUFFIX) and not include_partial:
+            continue
+        files.append(name)
+    return files
+
+
+def read_records(path: str, prefix: Optional[str] = None, include_partial: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from an NDJSON file or from every result file in a directory
+    (oldest first). `.part` files of a running or crashed writer are skipped
+    unless `include_partial`; a truncated last line is ignored.
+    """
+    for file_path in _record_files(path, prefix, include_partial):
+        base = file_path[:-len(PART_SUFFIX)] if file_path.endswith(PART_SUFFIX) else file_path
+        opener = gzip.open if base.endswith('.gz') else open
+        try:
+            with opener(file_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError):
+            # Unfinished gzip stream of a partial file
+            continue
+
+
+def sink_from_config(config: Any, prefix: str = 'results') -> NDJSONSink:
+    directory = getattr(config, 'RESULTS_DIR', '') or 'results'
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+    return NDJSONSink(
+        directory,
+        prefix=prefix,
+        max_bytes=getattr(config, 'RESULTS_ROTATE_BYTES', None),
+        max_age_seconds=getattr(config, 'RESULTS_ROTATE_SECONDS', None),
+        compress=bool(getattr(config, 'RESULTS_COMPRESS', False)),
+    )
@@ -1,186 +1,390 @@
 #!/usr/bin/env python3
+import argparse
 from datetime import datetime
+import signal
+import threading
 import time
-from ota_crawler import OTACrawler
+from typing import Any, Dict, Optional
+from crawler_pool import CrawlerPool
+from reservation_state import state_store_from_config, reservation_fingerprint
+import metrics
 import config
 from notifier import send_email, send_sms
-import re
+from normalization import parse_date, parse_price
 from auth_flow import wait_for_login
-from providers.booking_provider import BookingProvider
 from providers.base_provider import OTAProvider
-from providers.agoda_provider import AgodaProvider
+from providers.registry import get_provider_class, provider_names
 
 
 def normalize_price(price_text: str) -> float:
-    if not price_text:
-        return 0.0
-    nums = re.findall(r"[\d,.]+", price_text.replace("\u00a0", " "))
-    if not nums:
-        return 0.0
-    value = nums[-1].replace(",", "")
-    try:
-        return float(value)
-    except Exception:
-        return 0.0
+    return parse_price(price_text, getattr(config, 'PARSE_LOCALE', None))[0]
 
 
 def is_future(check_in_text: str) -> bool:
-    try:
-        # Try several common formats; Booking varies by locale
-        for fmt in ("%d %B %Y", "%Y-%m-%d", "%d %b %Y"):
-            try:
-                dt = datetime.strptime(check_in_text, fmt)
-                return dt.date() >= datetime.today().date()
-            except Exception:
-                continue
-    except Exception:
-        pass
-    return True
+    # Booking date formats vary by locale; unparseable dates are kept
+    dt = parse_date(check_in_text, getattr(config, 'PARSE_LOCALE', None))
+    return dt is None or dt >= datetime.today().date()
 
 
-def main():
-    crawler = OTACrawler(headless=config.HEADLESS_MODE, timeout=config.TIMEOUT)
-    try:
-        site = config.RESERVATION_SITE.lower()
-        provider: OTAProvider
-        if site == 'booking':
-            provider = BookingProvider(crawler, config)
-        elif site == 'agoda':
-            provider = AgodaProvider(crawler, config)
-        else:
-            print(f"Site '{site}' not yet implemented. Supported: booking, agoda (skeleton)")
-            return
+def find_offer(provider: OTAProvider, res) -> Optional[Dict[str, Any]]:
+    """
+    Search comparable offers for one reservation; return the matched offer with
+    its parsed 'price_value' and 'currency' ({} if the hotel is not listed,
+    None if the search failed).
+    """
+    # Provider search for comparable offers
+    search_results = provider.search_comparable(res)
+    if getattr(provider.crawler, 'last_search_error', None):
+        return None
+
+    # Pick the best match per provider strategy
+    matched = provider.pick_match(res, search_results)
+    if not matched:
+        return {}
+    price, currency = parse_price(matched.get('price', ''), getattr(config, 'PARSE_LOCALE', None))
+    return dict(matched, price_value=price, currency=currency)
 
-        light_mode = bool(getattr(config, 'MONITOR_LIGHT_LOGIN_CHECK', True))
-        auth = provider.get_auth()
 
-        def light_check():
-            return auth.light_check()
+def same_currency(res) -> bool:
+    """False when the offer ('offer_currency') was seen in another currency than the booking."""
+    booked = parse_price(res.get('price_total', ''), getattr(config, 'PARSE_LOCALE', None))[1]
+    offered = res.get('offer_currency', '')
+    return not booked or not offered or booked == offered
 
-        def heavy_check():
-            return auth.heavy_check()
 
-        def navigate_login_once():
-            return auth.navigate_login_once()
+def make_notification(res, new_price: float):
+    original_price = normalize_price(res.get('price_total', ''))
+    return {
+        'hotel_name': res.get('hotel_name', ''),
+        'source': res.get('offer_source', ''),
+        'room_type': res.get('room_type', ''),
+        'check_in': res.get('check_in', ''),
+        'check_out': res.get('check_out', ''),
+        'old_price': original_price,
+        'new_price': new_price,
+        'delta': original_price - new_price,
+    }
+
+
+def find_price_drops(site: str, checked, history=None):
+    """
+    Turn (reservation, comparable price) pairs into notifications.
+
+    Without a price history each pair is compared to its booked price with
+    PRICE_DROP_THRESHOLD. With one, the observations are appended to the history
+    (under the offer's own source and currency) and all reservations are
+    evaluated in one batch, which adds the relative and rolling-minimum thresholds.
+    Offers in another currency than the booking never count as a drop.
+    """
+    for res, new_price in checked:
+        if new_price > 0 and not same_currency(res):
+            print(f"{res.get('hotel_name', '')}: offer in {res['offer_currency']} cannot be compared "
+                  f"with the booked {res.get('price_total', '')}")
+
+    if history is None:
+        notifications = []
+        for res, new_price in checked:
+            if not same_currency(res):
+                continue
+            original_price = normalize_price(res.get('price_total', ''))
+            if new_price > 0 and original_price > 0 and new_price + 1e-6 < original_price - max(0.0, config.PRICE_DROP_THRESHOLD):
+                notifications.append(make_notification(res, new_price))
+        return notifications
 
-        def try_auto_login():
-            return auth.auto_login()
+    # Only reservations observed in this run, so an old observation never triggers an alert
+    by_key = {reservation_fingerprint(site, res): (res, new_price) for res, new_price in checked if new_price > 0}
+    history.append(
+        (key, res.get('offer_source') or site, new_price, res.get('offer_currency', ''))
+        for key, (res, new_price) in by_key.items()
+    )
+    drops = history.detect_drops(
+        booked={key: normalize_price(res.get('price_total', '')) for key, (res, _) in by_key.items() if same_currency(res)},
+        window_seconds=getattr(config, 'PRICE_HISTORY_WINDOW_SECONDS', 30 * 24 * 3600),
+        abs_threshold=config.PRICE_DROP_THRESHOLD,
+        rel_threshold=getattr(config, 'PRICE_DROP_RELATIVE_THRESHOLD', 0.0),
+        require_new_low=getattr(config, 'PRICE_DROP_REQUIRE_NEW_LOW', False),
+    )
+    return [make_notification(by_key[d['reservation_key']][0], d['latest_price']) for d in drops]
 
-        def on_progress(remaining: int):
-            print(f"Waiting for manual login... ~{remaining}s left")
 
-        logged_in = wait_for_login(
-            light_check=light_check,
-            heavy_check=heavy_check,
-            navigate_login_once=navigate_login_once,
-            auto_login=try_auto_login,
-            wait_seconds=getattr(config, 'MONITOR_LOGIN_WAIT_SECONDS', 300),
-            poll_seconds=getattr(config, 'MONITOR_LOGIN_POLL_SECONDS', 5),
-            use_light_mode=light_mode,
-            on_progress=on_progress,
+def login(auth) -> bool:
+    """Run the generic login flow for a provider's AuthProvider."""
+    light_mode = bool(getattr(config, 'MONITOR_LIGHT_LOGIN_CHECK', True))
+
+    def on_progress(remaining: int):
+        print(f"Waiting for manual login... ~{remaining}s left")
+
+    logged_in = wait_for_login(
+        light_check=auth.light_check,
+        heavy_check=auth.heavy_check,
+        navigate_login_once=auth.navigate_login_once,
+        auto_login=auth.auto_login,
+        wait_seconds=getattr(config, 'MONITOR_LOGIN_WAIT_SECONDS', 300),
+        poll_seconds=getattr(config, 'MONITOR_LOGIN_POLL_SECONDS', 5),
+        use_light_mode=light_mode,
+        on_progress=on_progress,
+        restore_session=auth.restore_session,
+    )
+    if logged_in:
+        auth.save_session()
+    return logged_in
+
+
+def send_notifications(site: str, notifications) -> None:
+    # Prepare notification content
+    subject = f"{site.capitalize()} price drop alerts ({len(notifications)})"
+    html_lines = ["<h3>Price Drop Found</h3>"]
+    text_sms_lines = []
+    for n in notifications:
+        source = f" on {n['source']}" if n.get('source') else ""
+        html_lines.append(
+            f"<p><b>{n['hotel_name']}</b> ({n['room_type']})<br/>"
+            f"{n['check_in']} → {n['check_out']}<br/>"
+            f"Old: {n['old_price']} | New: {n['new_price']}{source} | ↓ {n['delta']:.2f}</p>"
         )
+        text_sms_lines.append(
+            f"{n['hotel_name']} {n['check_in']}→{n['check_out']} drop {n['old_price']}→{n['new_price']}{source} (-{n['delta']:.2f})"
+        )
+    html_body = "\n".join(html_lines)
+    sms_body = ("; ".join(text_sms_lines))[:1300]
 
-        if not logged_in:
-            print("Login not completed within the allowed time.")
-            return
+    if config.ENABLE_EMAIL and config.EMAIL_TO and config.EMAIL_FROM and config.SMTP_HOST:
+        try:
+            send_email(
+                smtp_host=config.SMTP_HOST,
+                smtp_port=config.SMTP_PORT,
+                username=config.SMTP_USERNAME,
+                password=config.SMTP_PASSWORD,
+                sender=config.EMAIL_FROM,
+                recipients=config.EMAIL_TO,
+                subject=subject,
+                html_body=html_body,
+            )
+            print("Email sent.")
+        except Exception as e:
+            print(f"Failed to send email: {str(e)}")
 
-        reservations = provider.fetch_reservations()
-        if not reservations:
-            print("No reservations found.")
-            return
+    if config.ENABLE_SMS and config.TWILIO_ACCOUNT_SID and config.TWILIO_AUTH_TOKEN and config.TWILIO_FROM_NUMBER and config.TWILIO_TO_NUMBERS:
+        try:
+            send_sms(
+                account_sid=config.TWILIO_ACCOUNT_SID,
+                auth_token=config.TWILIO_AUTH_TOKEN,
+                from_number=config.TWILIO_FROM_NUMBER,
+                to_numbers=config.TWILIO_TO_NUMBERS,
+                body=sms_body,
+            )
+            print("SMS sent.")
+        except Exception as e:
+            print(f"Failed to send SMS: {str(e)}")
 
-        notifications = []
 
-        for res in reservations:
-            if config.ONLY_CHECK_CANCELLABLE and not res.get('is_cancellable'):
-                continue
-            if not is_future(res.get('check_in', '')):
+def compare_reservations(comparison, candidates):
+    """
+    Search every candidate on all comparison providers; return (reservation, cheapest price)
+    pairs. The reservation copy carries the cheapest offer's provider as 'offer_source'
+    and its currency as 'offer_currency'.
+    Reservations for which every provider failed are left out so they are retried next run.
+    """
+    checked = []
+    for res, outcome in zip(candidates, comparison.compare_many(candidates)):
+        cheapest = outcome['cheapest']
+        if cheapest is None:
+            if outcome['errors'] and not outcome['offers']:
                 continue
+            checked.append((res, 0.0))
+            continue
+        others = ", ".join(f"{o['source']} {o['price_value']:.2f}" for o in outcome['offers'] if o is not cheapest)
+        print(f"{res.get('hotel_name', '')}: cheapest {cheapest['price_value']:.2f} {cheapest.get('currency', '')} "
+              f"on {cheapest['source']}" + (f" (also {others})" if others else ""))
+        checked.append((dict(res, offer_source=cheapest['source'], offer_currency=cheapest.get('currency', '')),
+                        cheapest['price_value']))
+    return checked
 
-            hotel_name = res.get('hotel_name', '')
-            room_type = res.get('room_type', '')
-            check_in = res.get('check_in', '')
-            check_out = res.get('check_out', '')
-            original_price = normalize_price(res.get('price_total', ''))
 
-            if not hotel_name or not check_in or not check_out:
-                continue
+def build_comparison(site: str, provider_cls, pool: CrawlerPool, lean_for, capture_for):
+    """
+    ProviderComparison over the reservation site's pool plus one new pool per other
+    provider in COMPARE_PROVIDERS (own browsers; saved sessions are restored if enabled).
+    Returns (comparison, extra pools to close), or (None, []) when there is nothing to compare with.
+    """
+    from price_comparison import ProviderComparison
 
-            # Provider search for comparable offers
-            search_results = provider.search_comparable(res)
+    providers = {site: (provider_cls, pool)}
+    extra_pools = []
+    for name in getattr(config, 'COMPARE_PROVIDERS', []) or []:
+        name = name.lower()
+        if name in providers:
+            continue
+        cls = get_provider_class(name)
+        if cls is None:
+            print(f"Unknown comparison provider '{name}' skipped. Registered: {', '.join(provider_names())}")
+            continue
 
-            # Pick the best match per provider strategy
-            matched = provider.pick_match(res, search_results)
+        def factory(worker_id, name=name):
+            from ota_crawler import OTACrawler
+            return OTACrawler(headless=config.HEADLESS_MODE, timeout=config.TIMEOUT, worker_id=f"{name}{worker_id}",
+                              lean=lean_for(name), capture=capture_for(name))
 
-            new_price = normalize_price((matched or {}).get('price', ''))
-            if new_price > 0 and original_price > 0 and new_price + 1e-6 < original_price - max(0.0, config.PRICE_DROP_THRESHOLD):
-                delta = original_price - new_price
-                notifications.append({
-                    'hotel_name': hotel_name,
-                    'room_type': room_type,
-                    'check_in': check_in,
-                    'check_out': check_out,
-                    'old_price': original_price,
-                    'new_price': new_price,
-                    'delta': delta,
-                })
-
-        if not notifications:
-            print("No price drops found. Current reservations:")
-            for idx, r in enumerate(reservations, 1):
-                print(f"{idx}. {r.get('hotel_name','N/A')} | {r.get('check_in','?')} → {r.get('check_out','?')} | cancellable={bool(r.get('is_cancellable'))} | total={r.get('price_total','N/A')}")
+        def restore_session(worker, cls=cls):
+            cls(worker, config).get_auth().restore_session()
+
+        extra_pool = CrawlerPool(factory=factory, size=getattr(config, 'MONITOR_WORKERS', 1), on_create=restore_session)
+        extra_pools.append(extra_pool)
+        providers[name] = (cls, extra_pool)
+    if len(providers) < 2:
+        return None, extra_pools
+    print(f"Comparing prices on: {', '.join(providers)}")
+    comparison = ProviderComparison(
+        providers, config,
+        timeouts=getattr(config, 'COMPARE_PROVIDER_TIMEOUTS', {}),
+        default_timeout=getattr(config, 'COMPARE_TIMEOUT_SECONDS', 120),
+    )
+    return comparison, extra_pools
+
+
+def run_cycle(site: str, provider: OTAProvider, provider_cls, pool: CrawlerPool, state_store=None, history=None,
+              comparison=None) -> None:
+    """One monitoring pass: fetch reservations, search comparable offers, notify."""
+    with metrics.span('monitor.cycle'):
+        _run_cycle(site, provider, provider_cls, pool, state_store, history, comparison)
+
+
+def _run_cycle(site: str, provider: OTAProvider, provider_cls, pool: CrawlerPool, state_store=None, history=None,
+               comparison=None) -> None:
+    reservations = provider.fetch_reservations()
+    if not reservations:
+        print("No reservations found.")
+        return
+
+    candidates = []
+    for res in reservations:
+        if config.ONLY_CHECK_CANCELLABLE and not res.get('is_cancellable'):
+            continue
+        if not is_future(res.get('check_in', '')):
+            continue
+        if not res.get('hotel_name', '') or not res.get('check_in', '') or not res.get('check_out', ''):
+            continue
+        candidates.append(res)
+
+    # Incremental mode: only re-search reservations that are new, changed or stale
+    if state_store is not None:
+        due = state_store.select_due(site, candidates, getattr(config, 'MONITOR_STALE_SECONDS', 3600))
+        print(f"{len(due)} of {len(candidates)} reservations need a new search "
+              f"({', '.join(sorted(set(reason for _, reason in due))) or 'none'})")
+        candidates = [res for res, _ in due]
+
+    if comparison is not None:
+        checked = compare_reservations(comparison, candidates)
+    else:
+        # Spread comparable searches over the pool of browsers sharing the logged-in session
+        offers = pool.map(lambda worker, res: find_offer(provider_cls(worker, config), res), candidates)
+        # Failed searches (None) are left out so they are retried next run
+        checked = [
+            (dict(res, offer_source=site, offer_currency=offer.get('currency', '')), offer.get('price_value', 0.0))
+            for res, offer in zip(candidates, offers) if offer is not None
+        ]
+
+    if state_store is not None:
+        state_store.record_checks(site, [(res, price or None) for res, price in checked])
+
+    notifications = find_price_drops(site, checked, history)
+
+    if not notifications:
+        print("No price drops found. Current reservations:")
+        for idx, r in enumerate(reservations, 1):
+            print(f"{idx}. {r.get('hotel_name','N/A')} | {r.get('check_in','?')} → {r.get('check_out','?')} | cancellable={bool(r.get('is_cancellable'))} | total={r.get('price_total','N/A')}")
+        return
+
+    send_notifications(site, notifications)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitor OTA reservations for price drops.")
+    parser.add_argument('--daemon', action='store_true', default=getattr(config, 'MONITOR_DAEMON', False),
+                        help="Keep the browser and session alive and run cycles on a schedule")
+    parser.add_argument('--interval', type=int, default=getattr(config, 'MONITOR_INTERVAL_SECONDS', 1800),
+                        help="Seconds between cycle starts in daemon mode")
+    args = parser.parse_args(argv)
+
+    # Selenium, NumPy and the provider modules are only loaded once monitoring starts
+    from ota_crawler import OTACrawler, lean_mode_enabled, capture_mode_enabled
+    from price_history import price_history_from_config
+
+    metrics.configure_from_config(config)
+    site = config.RESERVATION_SITE.lower()
+    provider_cls = get_provider_class(site)
+    if provider_cls is None:
+        print(f"Site '{site}' not yet implemented. Supported: {', '.join(provider_names())}")
+        return
+    lean = lean_mode_enabled(site)
+    capture = capture_mode_enabled(site)
+    crawler = OTACrawler(headless=config.HEADLESS_MODE, timeout=config.TIMEOUT, lean=lean, capture=capture)
+    pool = None
+    comparison = None
+    extra_pools = []
+    stop = threading.Event()
+    try:
+        provider: OTAProvider = provider_cls(crawler, config)
+        auth = provider.get_auth()
+
+        if not login(auth):
+            print("Login not completed within the allowed time.")
             return
 
-        # Prepare notification content
-        subject = f"{site.capitalize()} price drop alerts ({len(notifications)})"
-        html_lines = ["<h3>Price Drop Found</h3>"]
-        text_sms_lines = []
-        for n in notifications:
-            html_lines.append(
-                f"<p><b>{n['hotel_name']}</b> ({n['room_type']})<br/>"
-                f"{n['check_in']} → {n['check_out']}<br/>"
-                f"Old: {n['old_price']} | New: {n['new_price']} | ↓ {n['delta']:.2f}</p>"
-            )
-            text_sms_lines.append(
-                f"{n['hotel_name']} {n['check_in']}→{n['check_out']} drop {n['old_price']}→{n['new_price']} (-{n['delta']:.2f})"
-            )
-        html_body = "\n".join(html_lines)
-        sms_body = ("; ".join(text_sms_lines))[:1300]
+        # Workers created later pick up the most recent session cookies
+        session = {'cookies': crawler.export_cookies()}
+        pool = CrawlerPool(
+            factory=lambda worker_id: OTACrawler(headless=config.HEADLESS_MODE, timeout=config.TIMEOUT, worker_id=worker_id,
+                                                 lean=lean, capture=capture),
+            size=getattr(config, 'MONITOR_WORKERS', 1),
+            seed=[crawler],
+            on_create=lambda worker: worker.import_cookies(session['cookies']),
+        )
+        state_store = state_store_from_config(config) if getattr(config, 'MONITOR_INCREMENTAL', False) else None
+        history = price_history_from_config(config) if getattr(config, 'PRICE_HISTORY_ENABLED', False) else None
+        comparison, extra_pools = build_comparison(site, provider_cls, pool, lean_mode_enabled, capture_mode_enabled)
 
-        if config.ENABLE_EMAIL and config.EMAIL_TO and config.EMAIL_FROM and config.SMTP_HOST:
-            try:
-                send_email(
-                    smtp_host=config.SMTP_HOST,
-                    smtp_port=config.SMTP_PORT,
-                    username=config.SMTP_USERNAME,
-                    password=config.SMTP_PASSWORD,
-                    sender=config.EMAIL_FROM,
-                    recipients=config.EMAIL_TO,
-                    subject=subject,
-                    html_body=html_body,
-                )
-                print("Email sent.")
-            except Exception as e:
-                print(f"Failed to send email: {str(e)}")
+        if not args.daemon:
+            run_cycle(site, provider, provider_cls, pool, state_store, history, comparison)
+            return
+
+        def request_stop(signum, frame):
+            print(f"Received signal {signum}, stopping after the current cycle...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
 
-        if config.ENABLE_SMS and config.TWILIO_ACCOUNT_SID and config.TWILIO_AUTH_TOKEN and config.TWILIO_FROM_NUMBER and config.TWILIO_TO_NUMBERS:
+        print(f"Daemon mode: running a cycle every {args.interval}s (Ctrl+C to stop)")
+        while not stop.is_set():
+            started = time.time()
+            print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Monitoring cycle started")
             try:
-                send_sms(
-                    account_sid=config.TWILIO_ACCOUNT_SID,
-                    auth_token=config.TWILIO_AUTH_TOKEN,
-                    from_number=config.TWILIO_FROM_NUMBER,
-                    to_numbers=config.TWILIO_TO_NUMBERS,
-                    body=sms_body,
-                )
-                print("SMS sent.")
+                run_cycle(site, provider, provider_cls, pool, state_store, history, comparison)
             except Exception as e:
-                print(f"Failed to send SMS: {str(e)}")
+                print(f"Monitoring cycle failed: {str(e)}")
+            metrics.export_run(config, 'monitor')
+            if stop.wait(max(0.0, args.interval - (time.time() - started))):
+                break
+
+            # Cheap session check on the warm browser; full login flow only if it fails
+            if not auth.light_check():
+                print("Session looks logged out, re-running login...")
+                if not login(auth):
+                    print("Login not completed within the allowed time.")
+                    break
+            session['cookies'] = crawler.export_cookies()
 
     finally:
+        if comparison is not None:
+            comparison.close()
+        for extra_pool in extra_pools:
+            extra_pool.close()
+        if pool is not None:
+            pool.close()
         crawler.close()
+        metrics.export_run(config, 'monitor')
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -2,14 +2,64 @@
 """
 Simple runner script for OTA Crawler
 Edit config.py to customize your search parameters
+
+Grid mode (several destinations x date ranges x occupancies on a process pool):
+    python run_search.py --grid grid.json
+    python run_search.py --destinations Paris,Rome --dates 2026-03-10:2026-03-12,2026-04-01:2026-04-05 --occupancies 2:1,2:1:1
 """
 
-from ota_crawler import OTACrawler
+import argparse
+import json
+import os
+from normalization import normalize_result, normalize_results
 import config
+import metrics
+
+
+def stream_search(crawler):
+    """
+    Run the configured search and write every result to rotating NDJSON files
+    as soon as its card batch is read; nothing is collected in memory.
+    """
+    from result_sink import sink_from_config
+    
+    locale = getattr(config, 'PARSE_LOCALE', None)
+    if config.OTA_SITE.lower() == "booking":
+        items = crawler.iter_booking_search(
+            destination=config.DESTINATION,
+            check_in=config.CHECK_IN_DATE,
+            check_out=config.CHECK_OUT_DATE,
+            adults=config.NUM_ADULTS,
+            rooms=config.NUM_ROOMS,
+            children=getattr(config, 'NUM_CHILDREN', 0)
+        )
+    elif config.OTA_SITE.lower() == "custom":
+        items = crawler.iter_generic_search(
+            url=config.CUSTOM_OTA_URL,
+            selectors=config.CUSTOM_SELECTORS,
+            destination=config.DESTINATION,
+            check_in=config.CHECK_IN_DATE,
+            check_out=config.CHECK_OUT_DATE
+        )
+    else:
+        print(f"Unknown OTA site: {config.OTA_SITE}")
+        print("Please set OTA_SITE to 'booking' or 'custom' in config.py")
+        return
+    
+    with sink_from_config(config, 'search') as sink:
+        count = sink.write_many(normalize_result(item, locale) for item in items)
+    if count:
+        print(f"\n✓ {count} results saved to {', '.join(sink.files)}")
+    else:
+        print("\n⚠ No results found. Please check your search parameters.")
 
 
-def run_search():
-    """Run OTA search based on config.py settings"""
+def run_search(record=None, replay=None, results_format=None):
+    """
+    Run OTA search based on config.py settings (optionally recording or replaying the session).
+    `results_format` 'ndjson' streams results to RESULTS_DIR (default: config.RESULTS_FORMAT).
+    """
+    from ota_crawler import OTACrawler, lean_mode_enabled, capture_mode_enabled
     
     print("="*60)
     print("OTA CRAWLER - Starting Search")
@@ -24,12 +74,22 @@ def run_search():
     # Initialize crawler
     crawler = OTACrawler(
         headless=config.HEADLESS_MODE,
-        timeout=config.TIMEOUT
+        timeout=config.TIMEOUT,
+        lean=lean_mode_enabled(config.OTA_SITE),
+        capture=capture_mode_enabled(config.OTA_SITE),
+        record=record,
+        replay=replay,
     )
     
     results = []
+    results_format = results_format or getattr(config, 'RESULTS_FORMAT', 'json')
     
     try:
+        if results_format == 'ndjson':
+            # Results go to the sink batch by batch instead of being collected here
+            stream_search(crawler)
+            return
+        
         if config.OTA_SITE.lower() == "booking":
             # Search Booking.com
             results = crawler.search_booking_com(
@@ -37,7 +97,8 @@ def run_search():
                 check_in=config.CHECK_IN_DATE,
                 check_out=config.CHECK_OUT_DATE,
                 adults=config.NUM_ADULTS,
-                rooms=config.NUM_ROOMS
+                rooms=config.NUM_ROOMS,
+                children=getattr(config, 'NUM_CHILDREN', 0)
             )
         
         elif config.OTA_SITE.lower() == "custom":
@@ -54,6 +115,9 @@ def run_search():
             print(f"Unknown OTA site: {config.OTA_SITE}")
             print("Please set OTA_SITE to 'booking' or 'custom' in config.py")
         
+        # Add parsed price/currency/rating/review count next to the raw text
+        results = normalize_results(results, getattr(config, 'PARSE_LOCALE', None))
+        
         # Display results
         if results:
             print("\n" + "="*60)
@@ -81,10 +145,128 @@ def run_search():
     finally:
         # Clean up
         crawler.close()
+        metrics_path = metrics.export_run(config, 'search')
+        if metrics_path:
+            print(f"Step timings saved to {metrics_path}")
         print("\n" + "="*60)
         print("Search completed!")
         print("="*60)
 
 
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def build_grid_spec(args):
+    """Grid spec from --grid (file) and/or --destinations/--dates/--occupancies (CLI wins)."""
+    import search_grid
+    spec = search_grid.load_grid_spec(args.grid) if args.grid else {}
+    if args.destinations:
+        spec['destinations'] = _split(args.destinations)
+    if args.dates:
+        spec['date_ranges'] = [pair.split(':', 1) for pair in _split(args.dates)]
+    if args.occupancies:
+        spec['occupancies'] = []
+        for occ in _split(args.occupancies):
+            values = [int(v) for v in occ.split(':')]
+            spec['occupancies'].append(dict(zip(('adults', 'rooms', 'children'), values)))
+    if args.max_results is not None:
+        spec['max_results'] = args.max_results
+    spec.setdefault('destinations', [config.DESTINATION])
+    spec.setdefault('date_ranges', [[config.CHECK_IN_DATE, config.CHECK_OUT_DATE]])
+    return spec
+
+
+def run_grid_search(args):
+    """Run a search grid on a process pool with checkpointing and merge the results."""
+    import search_grid
+    jobs = search_grid.expand_grid(build_grid_spec(args), config)
+    if not jobs:
+        print("Grid is empty: give at least one destination and date range")
+        return
+    site = jobs[0]['site']
+    settings = {
+        'headless': config.HEADLESS_MODE,
+        'timeout': config.TIMEOUT,
+        'site': site,
+        'custom_url': getattr(config, 'CUSTOM_OTA_URL', ''),
+        'custom_selectors': getattr(config, 'CUSTOM_SELECTORS', {}),
+        'record': args.record,
+        'replay': args.replay,
+    }
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    checkpoint = os.path.join(base_dir, args.checkpoint)
+
+    print("="*60)
+    print(f"OTA CRAWLER - Search grid: {len(jobs)} searches, {args.workers} workers")
+    print(f"Checkpoint: {checkpoint}")
+    print("="*60 + "\n")
+
+    locale = getattr(config, 'PARSE_LOCALE', None)
+    if args.format == 'ndjson':
+        # Stream every finished search to rotating NDJSON files; nothing is kept in memory
+        from result_sink import sink_from_config
+        sink = sink_from_config(config, 'grid')
+        try:
+            records = search_grid.run_grid(
+                jobs, args.workers, settings, checkpoint, resume=not args.fresh,
+                on_record=lambda record: sink.write_many(search_grid.merge_results([record], locale)),
+                keep_results=False,
+            )
+        finally:
+            sink.close()
+        saved = f"{sink.records_written} new results saved to {sink.directory}"
+    else:
+        records = search_grid.run_grid(jobs, args.workers, settings, checkpoint, resume=not args.fresh)
+        streamed = [rec for rec in records.values() if rec.get('result_count') and not rec.get('results')]
+        if streamed:
+            print(f"{len(streamed)} resumed searches were streamed by an --format ndjson run; "
+                  f"their results are in the NDJSON files, not in {args.output}")
+        results = search_grid.merge_results([records[job['id']] for job in jobs if job['id'] in records], locale)
+        output = os.path.join(base_dir, args.output)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        saved = f"{len(results)} results saved to {output}"
+    ordered = [records[job['id']] for job in jobs if job['id'] in records]
+    failed = [rec for rec in ordered if rec.get('status') != 'ok']
+
+    print("\n" + "="*60)
+    print(f"{len(ordered) - len(failed)}/{len(jobs)} searches succeeded, {saved}")
+    if failed:
+        print(f"{len(failed)} failed (re-run the same command to retry them):")
+        for rec in failed:
+            print(f"  - {rec['id']}: {rec.get('error')}")
+    print("="*60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search OTA sites (single search from config.py, or a search grid).")
+    parser.add_argument('--grid', help="JSON grid spec file (destinations, date_ranges, occupancies, site, max_results)")
+    parser.add_argument('--destinations', help="Comma-separated destinations")
+    parser.add_argument('--dates', help="Comma-separated CHECKIN:CHECKOUT pairs")
+    parser.add_argument('--occupancies', help="Comma-separated ADULTS:ROOMS[:CHILDREN] entries")
+    parser.add_argument('--max-results', type=int, default=None, help="Results per search")
+    parser.add_argument('--workers', type=int, default=getattr(config, 'GRID_WORKERS', 2),
+                        help="Worker processes (one browser each)")
+    parser.add_argument('--checkpoint', default=getattr(config, 'GRID_CHECKPOINT_FILE', 'grid_checkpoint.jsonl'),
+                        help="JSONL checkpoint used to resume an interrupted grid")
+    parser.add_argument('--fresh', action='store_true', help="Ignore and replace an existing checkpoint")
+    parser.add_argument('--output', default=getattr(config, 'GRID_OUTPUT_FILE', 'grid_results.json'),
+                        help="Merged grid results file (json format)")
+    parser.add_argument('--format', choices=['json', 'ndjson'], default=getattr(config, 'RESULTS_FORMAT', 'json'),
+                        help="json: one merged file; ndjson: stream results to rotating files in RESULTS_DIR")
+    parser.add_argument('--record', metavar='DIR', help="Record pages, responses and step timings into a bundle under DIR")
+    parser.add_argument('--replay', metavar='BUNDLE', help="Run against a recorded session bundle instead of the live site")
+    args = parser.parse_args(argv)
+    metrics.configure_from_config(config)
+    args.record = os.path.abspath(args.record) if args.record else None
+    args.replay = os.path.abspath(args.replay) if args.replay else None
+
+    if args.grid or args.destinations or args.dates or args.occupancies:
+        run_grid_search(args)
+    else:
+        run_search(record=args.record, replay=args.replay, results_format=args.format)
+
+
 if __name__ == "__main__":
-    run_search()
+    main()
@@ -0,0 +1,131 @@
+"""
+Persistent TTL cache for comparable-offer searches.
+
+Entries are keyed on (provider, destination, check_in, check_out, adults, rooms)
+and stored in SQLite so that repeated monitor runs, pooled workers and
+separate processes can share them.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    cache_key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    results TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_access ON search_cache(last_access);
+"""
+
+
+def make_cache_key(provider: str, destination: str, check_in: str, check_out: str, adults: int, rooms: int) -> str:
+    parts = [provider, (destination or '').strip().lower(), check_in or '', check_out or '', str(int(adults)), str(int(rooms))]
+    return "|".join(parts)
+
+
+class SearchCache:
+    """
+    - `ttl_seconds`: entries older than this are ignored and purged.
+    - `max_entries`: least recently used entries are evicted beyond this size.
+    - `enabled=False` turns every lookup into a miss and every store into a no-op.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 3600, max_entries: int = 5000, enabled: bool = True):
+        self.path = path
+        self.ttl_seconds = int(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self.enabled = enabled
+        if self.enabled:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the cache safe to use
+        # from pooled worker threads and from several processes at once.
+        # `with closing(conn), conn:` commits, then closes the connection.
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT results, created_at FROM search_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                return None
+            conn.execute("UPDATE search_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, provider: str, results: List[Dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (cache_key, provider, results, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(results, ensure_ascii=False), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM search_cache WHERE cache_key IN ("
+            " SELECT cache_key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def purge_expired(self) -> int:
+        if not self.enabled:
+            return 0
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute("DELETE FROM search_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            return cur.rowcount
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM search_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {'enabled': False}
+        with closing(self._connect()) as conn, conn:
+            total, oldest = conn.execute("SELECT COUNT(*), MIN(created_at) FROM search_cache").fetchone()
+        return {
+            'enabled': True,
+            'path': self.path,
+            'entries': total,
+            'oldest_age_seconds': (time.time() - oldest) if oldest else 0,
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries,
+        }
+
+
+def cache_from_config(config: Any) -> SearchCache:
+    """Build the search cache from SEARCH_CACHE_* settings in config.py."""
+    path = getattr(config, 'SEARCH_CACHE_PATH', '') or 'search_cache.sqlite3'
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return SearchCache(
+        path=path,
+        ttl_seconds=getattr(config, 'SEARCH_CACHE_TTL_SECONDS', 3600),
+        max_entries=getattr(config, 'SEARCH_CACHE_MAX_ENTRIES', 5000),
+        enabled=bool(getattr(config, 'SEARCH_CACHE_ENABLED', True)),
+    )
@@ -0,0 +1,299 @@
+"""
+Multi-process search grid: destinations x date ranges x occupancies.
+
+Jobs are sharded across a process pool where every worker process owns one
+OTACrawler (started on its first job and closed when the process exits).
+Each finished job is appended to a JSONL checkpoint, so an interrupted run
+resumes with the jobs that have not succeeded yet. A failed search is
+recorded and does not stop the rest of the grid.
+
+Grid spec (JSON file or built from CLI arguments):
+
+    {
+      "site": "booking",
+      "destinations": ["Paris", "Rome"],
+      "date_ranges": [["2026-03-10", "2026-03-12"], ["2026-04-01", "2026-04-05"]],
+      "occupancies": [{"adults": 2, "rooms": 1}, {"adults": 2, "rooms": 1, "children": 1}],
+      "max_results": 25
+    }
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+def load_grid_spec(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def job_id(job: Dict[str, Any]) -> str:
+    return "|".join([
+        job['site'], job['destination'].strip().lower(), job['check_in'], job['check_out'],
+        str(job['adults']), str(job['rooms']), str(job['children']),
+    ])
+
+
+def expand_grid(spec: Dict[str, Any], config: Any = None) -> List[Dict[str, Any]]:
+    """Expand a grid spec into unique job dicts; missing occupancy values come from config."""
+    site = (spec.get('site') or getattr(config, 'OTA_SITE', 'booking')).lower()
+    default_occupancy = {
+        'adults': getattr(config, 'NUM_ADULTS', 2),
+        'rooms': getattr(config, 'NUM_ROOMS', 1),
+        'children': getattr(config, 'NUM_CHILDREN', 0),
+    }
+    occupancies = spec.get('occupancies') or [default_occupancy]
+    jobs, seen = [], set()
+    for destination, (check_in, check_out), occupancy in product(spec.get('destinations', []), spec.get('date_ranges', []), occupancies):
+        job = {
+            'site': site,
+            'destination': destination,
+            'check_in': check_in,
+            'check_out': check_out,
+            'adults': int(occupancy.get('adults', default_occupancy['adults'])),
+            'rooms': int(occupancy.get('rooms', default_occupancy['rooms'])),
+            'children': int(occupancy.get('children', default_occupancy['children'])),
+            'max_results': spec.get('max_results'),
+        }
+        job['id'] = job_id(job)
+        if job['id'] not in seen:
+            seen.add(job['id'])
+            jobs.append(job)
+    return jobs
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """Return {job id: record} of the latest record per job in a checkpoint file."""
+    records: Dict[str, Dict[str, Any]] = {}
+    if not path or not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written last line of an interrupted run
+            records[record['id']] = record
+    return records
+
+
+def _append_checkpoint(path: str, record: Dict[str, Any]) -> None:
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Worker process state: one crawler per process
+_worker_crawler = None
+_worker_settings: Dict[str, Any] = {}
+
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    global _worker_settings
+    _worker_settings = settings
+    # atexit handlers do not run in forked pool workers; multiprocessing finalizers do
+    from multiprocessing.util import Finalize
+    Finalize(None, _close_worker, exitpriority=10)
+    # Every process has its own rate limiter: together they stay within the configured rates
+    import config
+    if getattr(config, 'RATE_LIMIT_ENABLED', True):
+        from rate_limiter import limiter_from_config, set_limiter
+        set_limiter(limiter_from_config(config, share=1.0 / max(1, int(settings.get('workers', 1)))))
+
+
+def _close_worker() -> None:
+    global _worker_crawler
+    if _worker_crawler is not None:
+        try:
+            _worker_crawler.close()
+        except Exception:
+            pass
+        _worker_crawler = None
+
+
+def _get_worker_crawler():
+    global _worker_crawler
+    if _worker_crawler is None:
+        from ota_crawler import OTACrawler, lean_mode_enabled, capture_mode_enabled
+        lean = _worker_settings.get('lean')
+        if lean is None:
+            lean = lean_mode_enabled(_worker_settings.get('site', ''))
+        capture = _worker_settings.get('capture')
+        if capture is None:
+            capture = capture_mode_enabled(_worker_settings.get('site', ''))
+        _worker_crawler = OTACrawler(
+            headless=_worker_settings.get('headless', True),
+            timeout=_worker_settings.get('timeout', 10),
+            worker_id=os.getpid(),
+            lean=lean,
+            capture=capture,
+            record=_worker_settings.get('record'),
+            replay=_worker_settings.get('replay'),
+        )
+    return _worker_crawler
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one search in the worker process; never raises."""
+    started = time.time()
+    record = {'id': job['id'], 'job': job, 'status': 'ok', 'results': [], 'error': None}
+    try:
+        crawler = _get_worker_crawler()
+        if job['site'] == 'booking':
+            results = crawler.search_booking_com(
+                destination=job['destination'],
+                check_in=job['check_in'],
+                check_out=job['check_out'],
+                adults=job['adults'],
+                rooms=job['rooms'],
+                children=job['children'],
+                max_results=job.get('max_results'),
+            )
+        elif job['site'] == 'custom':
+            results = crawler.search_generic_ota(
+                url=_worker_settings['custom_url'],
+                selectors=_worker_settings['custom_selectors'],
+                destination=job['destination'],
+                check_in=job['check_in'],
+                check_out=job['check_out'],
+                max_results=job.get('max_results'),
+            )
+        else:
+            raise ValueError(f"Unknown OTA site: {job['site']}")
+        if crawler.last_search_error:
+            # Searches return [] on errors: record the job as failed so a resume retries it
+            record['status'] = 'error'
+            record['error'] = crawler.last_search_error
+        else:
+            record['results'] = results
+    except Exception as e:
+        from rate_limiter import RateLimitError
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        # A broken browser would fail every later job in this process (a paused
+        # domain says nothing about the browser)
+        if not isinstance(e, RateLimitError):
+            _close_worker()
+    record['elapsed'] = round(time.time() - started, 2)
+    return record
+
+
+def merge_results(records: Iterable[Dict[str, Any]], locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Flatten successful job records into one list tagged with the job's search parameters."""
+    from normalization import normalize_results
+    merged = []
+    for record in records:
+        if record.get('status') != 'ok':
+            continue
+        job = record['job']
+        for item in normalize_results(record.get('results') or [], locale):
+            item.update({
+                'destination': job['destination'],
+                'check_in': job['check_in'],
+                'check_out': job['check_out'],
+                'adults': job['adults'],
+                'rooms': job['rooms'],
+                'children': job['children'],
+            })
+            merged.append(item)
+    return merged
+
+
+def run_grid(
+    jobs: List[Dict[str, Any]],
+    workers: int,
+    settings: Dict[str, Any],
+    checkpoint_path: Optional[str] = None,
+    resume: bool = True,
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+    keep_results: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run `jobs` on `workers` processes and return {job id: record} for every job
+    (including the ones restored from the checkpoint). Jobs already recorded
+    as 'ok' in the checkpoint are skipped when `resume` is set.
+
+    `on_record(record)` is called for every job finished in this run (e.g. to
+    stream its results to a file). With `keep_results=False` the returned
+    records and the checkpoint carry only 'result_count' (the results are
+    expected to be in on_record's sink), so neither memory nor the checkpoint
+    file grows with the number of results.
+    """
+    records = load_checkpoint(checkpoint_path) if (checkpoint_path and resume) else {}
+    if checkpoint_path and not resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    for record in records.values():
+        # Records checkpointed with keep_results=False have no 'results'
+        record.setdefault('results', [])
+        if 'result_count' not in record:
+            record['result_count'] = len(record['results'])
+        if not keep_results:
+            record['results'] = []
+    done: Set[str] = {jid for jid, rec in records.items() if rec.get('status') == 'ok'}
+    pending = [job for job in jobs if job['id'] not in done]
+    total = len(jobs)
+    finished = total - len(pending)
+    if finished:
+        print(f"Resuming: {finished}/{total} jobs already done")
+    if not pending:
+        return records
+
+    print(f"Running {len(pending)} searches on {min(int(workers), len(pending))} worker processes...")
+    started = time.time()
+
+    def finish(record):
+        nonlocal finished
+        finished += 1
+        record['result_count'] = len(record['results'])
+        _report(record, finished, total, started)
+        # Results reach the sink before the job is checkpointed as done
+        if on_record is not None:
+            on_record(record)
+        if not keep_results:
+            record = dict(record, results=[])
+        if checkpoint_path:
+            if keep_results:
+                _append_checkpoint(checkpoint_path, record)
+            else:
+                _append_checkpoint(checkpoint_path, {k: v for k, v in record.items() if k != 'results'})
+        records[record['id']] = record
+
+    while pending:
+        # A worker process that dies (e.g. Chrome crash) breaks the whole pool:
+        # the jobs it took down are retried on a fresh pool as long as progress is made
+        broken = []
+        pool_size = max(1, min(int(workers), len(pending)))
+        with ProcessPoolExecutor(max_workers=pool_size, initializer=_init_worker,
+                                 initargs=(dict(settings, workers=pool_size),)) as executor:
+            futures = {executor.submit(_run_job, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    broken.append(job)
+                    continue
+                finish(record)
+        if len(broken) == len(pending):
+            for job in broken:
+                finish({'id': job['id'], 'job': job, 'status': 'error', 'results': [], 'error': 'worker process died'})
+            break
+        pending = broken
+    return records
+
+
+def _report(record: Dict[str, Any], finished: int, total: int, started: float) -> None:
+    job = record['job']
+    status = f"{len(record['results'])} results" if record['status'] == 'ok' else f"failed ({record['error']})"
+    print(f"[{finished}/{total}] {job['destination']} {job['check_in']}→{job['check_out']} "
+          f"{job['adults']}a/{job['rooms']}r/{job['children']}c: {status} in {record.get('elapsed', 0)}s "
+          f"(total {time.time() - started:.0f}s)")
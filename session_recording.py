@@ -0,0 +1,229 @@
+"""
+Record and replay crawler sessions.
+
+Record mode (OTACrawler(record=directory) or RECORD_SESSION_DIR) writes one
+session bundle per crawler:
+
+    <bundle>/manifest.json          visited pages and responses with their original URLs
+    <bundle>/pages/0001.html        rendered DOM of each page capture (scripts removed)
+    <bundle>/responses/0001.json    JSON XHR/fetch responses seen by the browser
+    <bundle>/timeline.jsonl         navigations, captures, responses and step timings
+
+Pages are captured after every navigation, once results or reservations are
+loaded, and whenever the crawler takes an error screenshot. Step timings are
+those of the recording crawler's own operations (see SessionRecorder.active),
+even when several crawlers record at once.
+
+Replay mode (OTACrawler(replay=bundle) or REPLAY_SESSION_DIR) serves a bundle
+from a local FixtureServer. Every navigation is rewritten to it
+(https://www.booking.com/a?b -> http://127.0.0.1:<port>/www.booking.com/a?b),
+so the same crawler code runs offline against the recorded pages.
+
+Recorded pages are the rendered DOM with their scripts removed, so a replayed
+page issues no XHR/fetch requests. The recorded responses are kept for
+inspection but are not requested again, and network capture is turned off
+during replay (extraction reads the rendered cards). For the same reason,
+flows that need page scripts cannot be replayed, such as the Booking.com
+search form with its autocomplete and calendar. Replay covers direct
+results-URL searches (BOOKING_SEARCH_MODE='url'), pagination links,
+reservations pages and the HTTP backend.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import metrics
+from fixture_server import FixtureServer, Response
+
+
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+# Rendered DOM, final URL and title of the current page in one round trip
+CAPTURE_PAGE_JS = "return [document.documentElement.outerHTML, location.href, document.title || ''];"
+
+# Recorder of the crawler operation running in each thread (SessionRecorder.active)
+_ACTIVE = threading.local()
+
+
+def new_bundle_dir(directory: str, worker_id: Any = None) -> str:
+    """A fresh bundle directory under `directory` for one crawler."""
+    name = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+    if worker_id is not None:
+        name += f"_w{worker_id}"
+    return os.path.join(directory, name)
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class SessionRecorder:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'pages'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'responses'), exist_ok=True)
+        self.pages: List[Dict[str, Any]] = []
+        self.responses: List[Dict[str, Any]] = []
+        self.created_at = datetime.now().isoformat(timespec='seconds')
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._timeline = open(os.path.join(directory, 'timeline.jsonl'), 'a', encoding='utf-8')
+        metrics.REGISTRY.add_listener(self._on_step)
+        print(f"Recording session to {directory}")
+
+    def event(self, kind: str, **fields: Any) -> None:
+        entry = {'t': round(time.monotonic() - self._started, 4), 'type': kind}
+        entry.update(fields)
+        with self._lock:
+            if not self._timeline.closed:
+                self._timeline.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._timeline.flush()
+
+    @contextmanager
+    def active(self):
+        """
+        Attribute the steps this thread finishes inside the block to this
+        recording. metrics.REGISTRY is shared by every crawler of the process,
+        so steps of other crawlers (pooled workers, other threads) are ignored.
+        """
+        previous = getattr(_ACTIVE, 'recorder', None)
+        _ACTIVE.recorder = self
+        try:
+            yield self
+        finally:
+            _ACTIVE.recorder = previous
+
+    def _on_step(self, name: str, seconds: float, error: bool) -> None:
+        if getattr(_ACTIVE, 'recorder', None) is not self:
+            return
+        self.event('step', name=name, seconds=round(seconds, 4), error=error,
+                   thread=threading.current_thread().name)
+
+    def page(self, url: str, html: str, title: str = '', step: str = '', requested_url: Optional[str] = None) -> int:
+        """Save a page capture; returns its sequence number."""
+        with self._lock:
+            seq = len(self.pages) + 1
+            file_name = f"pages/{seq:04d}.html"
+            self.pages.append({
+                'seq': seq,
+                'url': url,
+                'requested_url': requested_url or url,
+                'title': title,
+                'step': step,
+                'file': file_name,
+            })
+        with open(os.path.join(self.directory, file_name), 'w', encoding='utf-8') as f:
+            f.write(_SCRIPT_RE.sub('', html or ''))
+        self.event('page', seq=seq, url=url, step=step)
+        self._write_manifest()
+        return seq
+
+    def response(self, url: str, status: int, payload: Any) -> None:
+        with self._lock:
+            seq = len(self.responses) + 1
+            file_name = f"responses/{seq:04d}.json"
+            self.responses.append({'seq': seq, 'url': url, 'status': status, 'file': file_name})
+        _write_json(os.path.join(self.directory, file_name), payload)
+        self.event('response', seq=seq, url=url, status=status)
+
+    def _write_manifest(self) -> None:
+        with self._lock:
+            manifest = {'created_at': self.created_at, 'pages': list(self.pages), 'responses': list(self.responses)}
+        _write_json(os.path.join(self.directory, 'manifest.json'), manifest)
+
+    def close(self) -> None:
+        metrics.REGISTRY.remove_listener(self._on_step)
+        self._write_manifest()
+        with self._lock:
+            self._timeline.close()
+
+
+def _url_key(url: str) -> Tuple[str, str, str]:
+    """(host, path, query with sorted parameters)"""
+    parts = urlsplit(url)
+    return (parts.hostname or '').lower(), parts.path or '/', urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+class SessionReplay:
+    """
+    Serves a recorded bundle. The latest capture of a URL is served for it
+    (e.g. the page with all results loaded rather than the first paint).
+    URLs match exactly (query parameters in any order); anything that was not
+    recorded is a 404 and listed in `misses`, so replays stay deterministic.
+    """
+
+    def __init__(self, directory: str, host: str = '127.0.0.1', port: int = 0):
+        self.directory = directory
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self._exact: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+        for page in manifest.get('pages', []):
+            for url in (page['requested_url'], page['url']):
+                self._index(url, page['file'], 'text/html; charset=utf-8')
+        for response in manifest.get('responses', []):
+            self._index(response['url'], response['file'], 'application/json')
+        self._hosts = sorted({host for host, _, _ in self._exact}, key=len, reverse=True)
+        self._host_re = re.compile(
+            r"(?:https?:)?//(" + "|".join(re.escape(h) for h in self._hosts) + r")(?=[/?#\"'\s]|$)"
+        ) if self._hosts else None
+        self.server = FixtureServer(resolver=self._resolve, host=host, port=port)
+        self.misses: List[str] = []
+
+    def _index(self, url: str, file_name: str, content_type: str) -> None:
+        host, path, query = _url_key(url)
+        if not host:
+            return
+        self._exact[(host, path, query)] = (file_name, content_type)
+
+    def start(self) -> 'SessionReplay':
+        self.server.start()
+        print(f"Replaying session {self.directory} on {self.server.url('/')}")
+        return self
+
+    def stop(self) -> None:
+        self.server.stop()
+
+    def __enter__(self) -> 'SessionReplay':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _base(self) -> str:
+        return self.server.url('/').rstrip('/')
+
+    def rewrite(self, url: str) -> str:
+        """Map a live URL to the replay server (non-HTTP URLs are returned unchanged)."""
+        parts = urlsplit(url or '')
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return url
+        if url.startswith(self._base() + '/'):
+            return url
+        rewritten = f"{self._base()}/{parts.hostname.lower()}{parts.path or '/'}"
+        return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+    def _resolve(self, raw_path: str) -> Optional[Response]:
+        host, _, rest = raw_path.lstrip('/').partition('/')
+        found = self._exact.get(_url_key(f"https://{host}/{rest}"))
+        if found is None:
+            self.misses.append(f"https://{host}/{rest}")
+            print(f"Replay: no recording for https://{host}/{rest}")
+            return None
+        file_name, content_type = found
+        with open(os.path.join(self.directory, file_name), 'rb') as f:
+            body = f.read()
+        if content_type.startswith('text/html') and self._host_re is not None:
+            # Keep links and form targets of recorded sites on the replay server
+            base = self._base()
+            body = self._host_re.sub(lambda m: f"{base}/{m.group(1)}", body.decode('utf-8')).encode('utf-8')
+        return 200, {'Content-Type': content_type}, body
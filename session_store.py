@@ -0,0 +1,61 @@
+"""
+Per-provider browser session snapshots (cookies + localStorage).
+
+Snapshots are written after a successful login and restored on the next
+start so the crawler can skip heavy login detection. They contain live
+session cookies: keep SESSION_DIR private.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+def _snapshot_path(directory: str, provider: str) -> str:
+    return os.path.join(directory, f"{provider}_session.json")
+
+
+def session_dir_from_config(config: Any) -> str:
+    directory = getattr(config, 'SESSION_DIR', '') or 'sessions'
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+    return directory
+
+
+def save_snapshot(directory: str, provider: str, snapshot: Dict[str, Any]) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = _snapshot_path(directory, provider)
+    data = dict(snapshot)
+    data['saved_at'] = time.time()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    try:
+        os.chmod(tmp_path, 0o600)
+    except Exception:
+        pass
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(directory: str, provider: str, max_age_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Return the snapshot with expired cookies removed, or None if missing/too old."""
+    path = _snapshot_path(directory, provider)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    if max_age_seconds is not None and now - data.get('saved_at', 0) > max_age_seconds:
+        return None
+
+    def alive(cookie):
+        expires = cookie.get('expires', cookie.get('expiry'))
+        return not expires or expires < 0 or expires > now
+
+    data['cookies'] = [c for c in data.get('cookies', []) if alive(c)]
+    if not data['cookies']:
+        return None
+    return data
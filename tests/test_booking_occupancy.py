@@ -0,0 +1,86 @@
+"""Occupancy in the Booking.com search form and the URL-to-form fallback (fake driver, no browser)."""
+
+import pytest
+
+from ota_crawler import BOOKING_OCCUPANCY_INPUTS, OTACrawler
+from search_cache import SearchCache
+
+
+class Stepper:
+    """An occupancy input with its -/+ buttons, bounded like Booking's."""
+
+    def __init__(self, value, low, high):
+        self.value, self.low, self.high = value, low, high
+
+    def get_attribute(self, name):
+        return str(self.value) if name == 'value' else None
+
+    def find_element(self, by, value):
+        return self  # the parent holding the buttons
+
+    def find_elements(self, by, value):
+        return [Button(self, -1), Button(self, +1)]
+
+
+class Button:
+    def __init__(self, stepper, step):
+        self.stepper, self.step = stepper, step
+
+    def click(self):
+        s = self.stepper
+        s.value = min(s.high, max(s.low, s.value + self.step))
+
+
+class FakeDriver:
+    def __init__(self, steppers):
+        self.steppers = steppers
+        self.clicked = []
+
+    def find_element(self, by, value):
+        if value in self.steppers:
+            return self.steppers[value]
+        toggle = Button(Stepper(0, 0, 0), 0)
+        toggle.click = lambda: self.clicked.append(value)
+        return toggle
+
+
+@pytest.fixture
+def crawler():
+    crawler = OTACrawler(backend='http', cache=SearchCache(':memory:', enabled=False), record='', replay='')
+    yield crawler
+    crawler._driver = None
+    crawler.close()
+
+
+def test_form_sets_adults_and_rooms(crawler):
+    steppers = {BOOKING_OCCUPANCY_INPUTS['adults']: Stepper(2, 1, 30), BOOKING_OCCUPANCY_INPUTS['rooms']: Stepper(1, 1, 30)}
+    crawler._driver = FakeDriver(steppers)
+
+    crawler._configure_occupancy_booking(adults=1, rooms=3)
+
+    assert steppers[BOOKING_OCCUPANCY_INPUTS['adults']].value == 1
+    assert steppers[BOOKING_OCCUPANCY_INPUTS['rooms']].value == 3
+
+
+def test_form_raises_when_a_count_cannot_be_set(crawler):
+    steppers = {BOOKING_OCCUPANCY_INPUTS['adults']: Stepper(2, 1, 4), BOOKING_OCCUPANCY_INPUTS['rooms']: Stepper(1, 1, 30)}
+    crawler._driver = FakeDriver(steppers)
+
+    with pytest.raises(ValueError):
+        crawler._configure_occupancy_booking(adults=6, rooms=1)
+
+
+def test_search_with_children_does_not_fall_back_to_the_form(crawler, monkeypatch):
+    monkeypatch.setattr(crawler, '_search_booking_http', lambda *args: [])
+    monkeypatch.setattr(crawler, '_search_booking_by_url', lambda *args: [])
+    monkeypatch.setattr(crawler, '_iter_http_search', lambda *args: iter([]))
+    monkeypatch.setattr(crawler, '_navigate', lambda url: None)
+    monkeypatch.setattr(crawler, '_handle_popups', lambda site: None)
+    monkeypatch.setattr(crawler, 'iter_booking_results', lambda max_results: iter([]))
+    monkeypatch.setattr(crawler, '_submit_booking_form', lambda *args: pytest.fail("form used with children"))
+    monkeypatch.setattr(crawler, '_search_booking_by_form', lambda *args: pytest.fail("form used with children"))
+
+    for mode in ('url', 'form'):
+        assert crawler.search_booking_com('Prague', '2026-03-10', '2026-03-12', children=1, mode=mode, use_cache=False) == []
+        assert list(crawler.iter_booking_search('Prague', '2026-03-10', '2026-03-12', children=1, mode=mode)) == []
+        assert crawler.last_search_error is None
@@ -0,0 +1,46 @@
+"""CrawlerPool leasing and discarding with fake crawlers."""
+
+from crawler_pool import CrawlerPool
+
+
+class FakeCrawler:
+    def __init__(self, worker_id=None):
+        self.worker_id = worker_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_discard_closes_a_created_crawler_and_frees_its_slot():
+    pool = CrawlerPool(FakeCrawler, size=1)
+    with pool.lease() as crawler:
+        pool.discard(crawler)
+
+    assert crawler.closed
+    with pool.lease() as replacement:
+        assert replacement is not crawler
+
+
+def test_discard_keeps_a_seed_open_and_returns_it_when_released():
+    seed = FakeCrawler()
+    pool = CrawlerPool(FakeCrawler, size=1, seed=[seed])
+    with pool.lease() as crawler:
+        assert crawler is seed
+        pool.discard(crawler)
+        assert not seed.closed
+
+    assert not seed.closed
+    with pool.lease() as crawler:
+        assert crawler is seed
+
+
+def test_worker_ids_are_not_reused_after_a_discard():
+    pool = CrawlerPool(FakeCrawler, size=2)
+    with pool.lease() as first, pool.lease() as second:
+        pool.discard(first)
+    with pool.lease() as a, pool.lease() as b:
+        ids = {a.worker_id, b.worker_id}
+
+    assert {first.worker_id, second.worker_id} == {0, 1}
+    assert ids == {1, 2}
@@ -0,0 +1,42 @@
+"""Fuzzy reservation-to-result matching on name, location and room type."""
+
+from hotel_matcher import HotelMatcher, get_matcher, name_similarity
+
+
+RESULTS = [
+    {'name': 'Hotel Lisboa Plaza', 'location': 'Baixa, Lisbon', 'room_type': 'Deluxe King Room', 'price': '€ 180'},
+    {'name': 'Lisboa Plaza Suites', 'location': 'Belem, Lisbon', 'room_type': 'Standard Double Room', 'price': '€ 120'},
+    {'name': 'Casa do Porto', 'location': 'Ribeira, Porto', 'room_type': 'Studio', 'price': '€ 90'},
+]
+
+
+def test_name_similarity_ignores_case_accents_and_stopwords():
+    assert name_similarity('The Hôtel Lisboa Plaza', 'LISBOA PLAZA') == 1.0
+    assert name_similarity('Casa do Porto', 'Lisboa Plaza') < 0.2
+
+
+def test_location_and_room_type_decide_between_similar_names():
+    reservation = {'hotel_name': 'Lisboa Plaza', 'location': 'Belem, Lisbon', 'room_type': 'Standard Double Room'}
+    item, confidence = HotelMatcher(RESULTS).match(reservation)
+    assert item is RESULTS[1]
+    assert confidence > 0.5
+
+    reservation = dict(reservation, location='Baixa, Lisbon', room_type='Deluxe King Room')
+    item, _ = HotelMatcher(RESULTS).match(reservation)
+    assert item is RESULTS[0]
+
+
+def test_missing_fields_are_left_out_of_the_score():
+    reservation = {'hotel_name': 'Casa do Porto', 'location': 'N/A', 'room_type': ''}
+    item, confidence = HotelMatcher(RESULTS).match(reservation)
+    assert item is RESULTS[2]
+    assert confidence == 1.0
+
+
+def test_no_shared_trigrams_means_no_match():
+    assert HotelMatcher(RESULTS).match({'hotel_name': 'Xyz'}) == (None, 0.0)
+    assert HotelMatcher(RESULTS).match({'hotel_name': ''}) == (None, 0.0)
+
+
+def test_get_matcher_reuses_the_index_for_identical_results():
+    assert get_matcher(RESULTS) is get_matcher([dict(item) for item in RESULTS])
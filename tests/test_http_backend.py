@@ -0,0 +1,146 @@
+"""HTTP search backend against a local fixture server (no browser, no network)."""
+
+import pytest
+
+pytest.importorskip('requests')
+pytest.importorskip('lxml')
+pytest.importorskip('cssselect')
+
+from fixture_server import FixtureServer
+from http_backend import HttpSearchBackend
+from ota_crawler import BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS, OTACrawler
+from search_cache import SearchCache
+
+
+BOOKING_CARD = """
+<div data-testid="property-card">
+  <div data-testid="title">{name}</div>
+  <span data-testid="address">Old Town, Prague</span>
+  <div data-testid="review-score"><div>Scored 8.6</div><div>Fabulous</div></div>
+  <span data-testid="recommended-units">Double Room</span>
+  <span data-testid="price-and-discounted-price">€ {price}</span>
+</div>
+"""
+
+GENERIC_CARD = """
+<div class="hotel-card">
+  <h3 class="hotel-name">{name}</h3>
+  <span class="price">US${price}</span>
+  <span class="rating">9.1</span>
+</div>
+"""
+
+GENERIC_SELECTORS = {
+    'result_card': 'div.hotel-card',
+    'name': 'h3.hotel-name',
+    'price': 'span.price',
+    'rating': 'span.rating',
+}
+
+
+def page(card, names, start_price=100):
+    cards = "".join(card.format(name=name, price=start_price + i) for i, name in enumerate(names))
+    return f"<html><body><div id='results'>{cards}</div></body></html>"
+
+
+@pytest.fixture
+def crawler():
+    crawler = OTACrawler(backend='http', cache=SearchCache(':memory:', enabled=False), record='', replay='')
+    yield crawler
+    crawler.close()
+
+
+def test_fetch_and_extract_with_booking_selectors():
+    backend = HttpSearchBackend(timeout=5)
+    with FixtureServer({'/searchresults.html': page(BOOKING_CARD, ['Hotel Adria', 'Hotel Paris'])}) as server:
+        html = backend.fetch(server.url('/searchresults.html'))
+        total, records = backend.extract(html, BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS)
+        assert backend.fetch(server.url('/missing.html')) is None
+    backend.close()
+
+    assert total == 2
+    assert [r['name'] for r in records] == ['Hotel Adria', 'Hotel Paris']
+    assert records[0]['price'] == '€ 100'
+    assert records[0]['location'] == 'Old Town, Prague'
+    assert records[0]['room_type'] == 'Double Room'
+
+
+def test_offset_pagination_follows_pages_until_empty(crawler):
+    routes = {
+        '/searchresults.html?ss=prague': page(BOOKING_CARD, ['A', 'B']),
+        '/searchresults.html?ss=prague&offset=2': page(BOOKING_CARD, ['C', 'D']),
+        '/searchresults.html?ss=prague&offset=4': page(BOOKING_CARD, []),
+    }
+    with FixtureServer(routes) as server:
+        items = list(crawler._iter_http_pages(server.url('/searchresults.html?ss=prague'),
+                                              BOOKING_RESULT_CARD, BOOKING_RESULT_FIELDS, 'offset'))
+
+    assert [item['name'] for item in items] == ['A', 'B', 'C', 'D']
+    # Missing fields are normalized like the Selenium extractors do
+    assert items[0]['rating'].startswith('Scored 8.6')
+    assert all(value is not None for item in items for value in item.values())
+
+
+def test_generic_search_runs_without_a_browser(crawler):
+    with FixtureServer({'/search': page(GENERIC_CARD, ['Casa Lisboa', 'Lisbon Inn', 'Alfama Suites'])}) as server:
+        results = crawler.search_generic_ota(
+            server.url('/search?q={destination}&in={check_in}&out={check_out}'), GENERIC_SELECTORS,
+            'Lisbon', '2026-03-10', '2026-03-12', use_cache=False, max_results=2)
+
+    assert [r['name'] for r in results] == ['Casa Lisboa', 'Lisbon Inn']
+    assert results[0]['price'] == 'US$100'
+    assert crawler._driver is None
+
+
+def test_streaming_search_yields_results_as_they_are_read(crawler):
+    with FixtureServer({'/search': page(GENERIC_CARD, ['Casa Lisboa', 'Lisbon Inn', 'Alfama Suites'])}) as server:
+        items = crawler.iter_generic_search(
+            server.url('/search?q={destination}&in={check_in}&out={check_out}'), GENERIC_SELECTORS,
+            'Lisbon', '2026-03-10', '2026-03-12')
+        first = next(items)
+        rest = list(items)
+
+    assert first['name'] == 'Casa Lisboa'
+    assert [item['name'] for item in rest] == ['Lisbon Inn', 'Alfama Suites']
+    assert crawler.last_search_error is None
+    assert crawler._driver is None
+
+
+def test_generic_search_stops_at_matching_result(crawler):
+    with FixtureServer({'/search': page(GENERIC_CARD, ['Casa Lisboa', 'Lisbon Inn', 'Alfama Suites'])}) as server:
+        results = crawler.search_generic_ota(
+            server.url('/search?q={destination}&in={check_in}&out={check_out}'), GENERIC_SELECTORS,
+            'Lisbon', '2026-03-10', '2026-03-12', use_cache=False,
+            stop=lambda item: item['name'] == 'Lisbon Inn')
+
+    assert [r['name'] for r in results] == ['Casa Lisboa', 'Lisbon Inn']
+
+
+def test_page_without_cards_falls_back_to_the_browser(crawler, monkeypatch):
+    opened = []
+
+    def navigate(url):
+        opened.append(url)
+        raise RuntimeError("no browser in tests")
+
+    monkeypatch.setattr(crawler, '_navigate', navigate)
+    with FixtureServer({'/search': "<html><body><div id='app'></div></body></html>"}) as server:
+        url = server.url('/search?q={destination}&in={check_in}&out={check_out}')
+        crawler.search_generic_ota(url, GENERIC_SELECTORS, 'Lisbon', '2026-03-10', '2026-03-12', use_cache=False)
+
+    assert opened == [url.format(destination='Lisbon', check_in='2026-03-10', check_out='2026-03-12')]
+
+
+def test_paused_domain_raises_instead_of_falling_back(crawler, monkeypatch):
+    import rate_limiter
+
+    limiter = rate_limiter.RateLimiter(default={'failure_threshold': 1}, exempt_hosts=())
+    limiter.release(limiter.acquire('http://127.0.0.1/'), ok=False)
+    monkeypatch.setattr(rate_limiter, '_LIMITER', limiter)
+    monkeypatch.setattr(crawler, '_navigate', lambda url: pytest.fail("browser started for a paused domain"))
+
+    with FixtureServer({'/search': BOOKING_CARD.format(name='Hotel Alpha', price=120)}) as server:
+        url = server.url('/search?q={destination}&in={check_in}&out={check_out}')
+        with pytest.raises(rate_limiter.CircuitOpenError):
+            crawler.search_generic_ota(url, GENERIC_SELECTORS, 'Lisbon', '2026-03-10', '2026-03-12', use_cache=False)
+    assert crawler.last_search_error
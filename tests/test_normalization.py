@@ -0,0 +1,66 @@
+import pytest
+
+from normalization import parse_date, parse_number, parse_price, parse_rating, parse_stay_dates
+
+
+@pytest.mark.parametrize('text', [
+    "12 Dec 2025 – 14 Dec 2025 · 2 nights",
+    "12 December 2025 to 14 December 2025 (2 nights)",
+    "Check-in: 12 Dec 2025, Check-out: 14 Dec 2025",
+    "Fri 12 Dec 2025 — Sun 14 Dec 2025",
+    "12–14 December 2025",
+    "Dec 12 – 14, 2025",
+    "Dec 12 – Dec 14, 2025",
+    "2025-12-12 to 2025-12-14",
+])
+def test_parse_stay_dates(text):
+    assert parse_stay_dates(text, 'en-gb') == ('2025-12-12', '2025-12-14')
+
+
+def test_parse_stay_dates_without_dates():
+    assert parse_stay_dates("2 nights, 2 adults") == ('', '')
+    assert parse_stay_dates("N/A") == ('', '')
+
+
+def test_numeric_dates_follow_the_locale():
+    # Alternate locales so a format remembered for one cannot leak into the other
+    assert parse_date('01/02/2026', 'en-us').isoformat() == '2026-01-02'
+    assert parse_date('01/02/2026', 'en-gb').isoformat() == '2026-02-01'
+    assert parse_date('01/02/2026', 'en-us').isoformat() == '2026-01-02'
+    assert parse_stay_dates('12/01/2026 - 12/03/2026', 'en-us') == ('2026-12-01', '2026-12-03')
+    assert parse_stay_dates('12/01/2026 - 12/03/2026', 'de') == ('2026-01-12', '2026-03-12')
+
+
+def test_ambiguous_date_after_an_unambiguous_one_in_the_same_locale():
+    # 01/13/2026 can only be month-first; that must not flip the order for the locale
+    assert parse_date('01/13/2026', 'en-gb').isoformat() == '2026-01-13'
+    assert parse_date('01/02/2026', 'en-gb').isoformat() == '2026-02-01'
+    assert parse_date('13/01/2026', 'en-us').isoformat() == '2026-01-13'
+    assert parse_date('01/02/2026', 'en-us').isoformat() == '2026-01-02'
+
+
+@pytest.mark.parametrize('text, locale, expected', [
+    ("US$1,234.50", 'en-us', (1234.5, 'USD')),
+    ("€ 1.234,50", 'de', (1234.5, 'EUR')),
+    ("€ 1.234", 'de', (1234.0, 'EUR')),
+    ("1 234,5 zł", 'pl', (1234.5, 'PLN')),
+    ("CHF 1'234.50", 'de-ch', (1234.5, 'CHF')),
+    ("€ 1.234,50", None, (1234.5, 'EUR')),
+    ("US$1,500\nUS$1,234", 'en-us', (1234.0, 'USD')),
+    ("N/A", 'en-gb', (0.0, '')),
+])
+def test_parse_price(text, locale, expected):
+    assert parse_price(text, locale) == expected
+
+
+def test_parse_number_uses_the_locale_decimal_separator():
+    assert parse_number("1,234", ',') == 1.234
+    assert parse_number("1,234", '.') == 1234.0
+    assert parse_number("1,234") == 1234.0
+    # Text that contradicts the locale falls back to the heuristics
+    assert parse_number("1.234.567", '.') == 1234567.0
+
+
+def test_parse_rating():
+    assert parse_rating("Scored 7.4\n7.4\nGood\n2,906 reviews", 'en-gb') == (7.4, 'Good', 2906)
+    assert parse_rating("Scored 8,6\n8,6\nFabulous\n2.906 Bewertungen", 'de') == (8.6, 'Fabulous', 2906)
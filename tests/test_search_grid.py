@@ -0,0 +1,38 @@
+"""Search grid worker lifecycle with a fake crawler (no browser)."""
+
+import os
+
+import search_grid
+
+
+class FakeCrawler:
+    last_search_error = None
+
+    def __init__(self, marker_dir):
+        self.marker_dir = marker_dir
+
+    def search_booking_com(self, **kwargs):
+        return [{'name': f"Hotel {kwargs['destination']}", 'price': '€ 100'}]
+
+    def close(self):
+        with open(os.path.join(self.marker_dir, f"closed-{os.getpid()}"), 'w') as f:
+            f.write('closed')
+
+
+def test_worker_crawlers_are_closed_when_the_pool_shuts_down(tmp_path, monkeypatch):
+    def get_worker_crawler():
+        if search_grid._worker_crawler is None:
+            search_grid._worker_crawler = FakeCrawler(str(tmp_path))
+        return search_grid._worker_crawler
+
+    monkeypatch.setattr(search_grid, '_get_worker_crawler', get_worker_crawler)
+    jobs = search_grid.expand_grid({
+        'site': 'booking',
+        'destinations': ['Paris', 'Rome', 'Oslo'],
+        'date_ranges': [['2026-03-10', '2026-03-12']],
+    })
+
+    records = search_grid.run_grid(jobs, workers=2, settings={'site': 'booking'})
+
+    assert sorted(r['status'] for r in records.values()) == ['ok', 'ok', 'ok']
+    assert [name for name in os.listdir(tmp_path) if name.startswith('closed-')]